@@ -0,0 +1,207 @@
+import numpy as np
+from probability import Table
+from probability.columnar import lookup_codes
+from information_theory.measures import codes_mutual_information_matrix
+from information_theory.measures import encode_columns
+
+
+def maximum_spanning_tree(weights, root=0):
+    """Finds the maximum spanning tree of a complete graph by
+       Prim's algorithm, O(k^2) on the dense weights matrix.
+
+    Args:
+        weights (numpy.ndarray): The (k x k) symmetric weights.
+        root (int, optional): The root of the tree. Defaults to 0.
+
+    Returns:
+        list: The (parent, child) edges in the order they are
+              added, so each parent is added before its children.
+    """
+    k = len(weights)
+    in_tree = np.zeros(k, dtype=bool)
+    in_tree[root] = True
+    # The best weight (and its node) that connects each node to the tree
+    best = np.array(weights[root], dtype=np.float64)
+    parents = np.full(k, root)
+    edges = []
+    for _ in range(k - 1):
+        candidates = np.where(in_tree, -np.inf, best)
+        child = int(np.argmax(candidates))
+        edges.append((int(parents[child]), child))
+        in_tree[child] = True
+        closer = weights[child] > best
+        best = np.where(closer, weights[child], best)
+        parents = np.where(closer, child, parents)
+    return edges
+
+
+class ChowLiuTree:
+    """A tree-factored approximation of a joint distribution,
+    P(X1, ..., Xk) = P(root) * prod P(child | parent), where the tree
+    is the maximum spanning tree of the pairwise mutual information
+    (Chow-Liu). The factors are kept as dense arrays, so the memory
+    is O(k * levels^2) instead of O(prod levels).
+
+    Members:
+        names (list): The names of the variables.
+        edges (list): The (parent, child) indices of the tree.
+        root (int): The index of the root variable.
+    """
+
+    def __init__(self, data, names=None, root=None, processes=1):
+        """Learns the tree from samples or joint counts.
+
+        Args:
+            data (numpy.ndarray, Table or DiscreteDistribution):
+                A 2D array of samples, a Table or a
+                DiscreteDistribution of the joint counts.
+            names (list, optional): The names of the columns of the
+                samples. Defaults to None, which is 'Xn'.
+            root (str, optional): The name of the root variable.
+                Defaults to None, which is the first one.
+            processes (int, optional): Number of worker processes of
+                the mutual information. Defaults to 1.
+
+        Raises:
+            ValueError: Raises when the names are not consistent
+                        with the data or the root is not defined.
+        """
+        codes, levels, weights, data_names = encode_columns(data)
+        if data_names is None:
+            data_names = (
+                [f"X{i + 1}" for i in range(len(codes))] if names is None else names
+            )
+        self.names = list(data_names)
+        if len(self.names) != len(codes):
+            raise ValueError(
+                f"The length of names ({len(self.names)}) is not "
+                f"the same as the columns ({len(codes)})."
+            )
+        if root is not None and root not in self.names:
+            raise ValueError(f"'{root}' is not defined.")
+        self.root = 0 if root is None else self.names.index(root)
+        self.levels = [np.asarray(column_levels) for column_levels in levels]
+        self._lookups_ = [
+            {level: code for code, level in enumerate(column_levels.tolist())}
+            for column_levels in self.levels
+        ]
+        sizes = [len(column_levels) for column_levels in self.levels]
+        information = codes_mutual_information_matrix(
+            codes, sizes, weights, 2, processes
+        )
+        self.edges = maximum_spanning_tree(information, self.root)
+
+        # P(root) and P(child | parent), as the arrays of
+        # (root levels) and (parent levels x child levels)
+        root_counts = np.bincount(
+            codes[self.root], weights=weights, minlength=sizes[self.root]
+        )
+        self._root_probabilities_ = root_counts / root_counts.sum()
+        self._conditionals_ = {}
+        for parent, child in self.edges:
+            ids = codes[parent].astype(np.int64) * sizes[child] + codes[child]
+            counts = np.bincount(
+                ids, weights=weights, minlength=sizes[parent] * sizes[child]
+            ).reshape(sizes[parent], sizes[child])
+            totals = counts.sum(axis=1, keepdims=True)
+            # The parent levels that are not observed have zero probabilities
+            self._conditionals_[child] = np.divide(
+                counts, totals, out=np.zeros(counts.shape), where=totals != 0
+            )
+
+    def parent(self, name):
+        """The name of the parent of a variable, or None for the root."""
+        child = self.names.index(name)
+        for parent, other in self.edges:
+            if other == child:
+                return self.names[parent]
+        return None
+
+    def factors(self):
+        """The factors of the tree: a Table of P(root) followed by
+           a MultiTable of P(child | parent) for each edge. They can
+           be used as the factors of VariableElimination.
+
+        Returns:
+            list: List of Table and MultiTables.
+        """
+        root_levels = self.levels[self.root].tolist()
+        factors = [
+            Table(
+                dict(zip(root_levels, self._root_probabilities_.tolist())),
+                [self.names[self.root]],
+            )
+        ]
+        for parent, child in self.edges:
+            conditional = self._conditionals_[child]
+            parent_codes, child_codes = np.nonzero(conditional)
+            joint = Table(
+                {
+                    (self.levels[parent][i], self.levels[child][j]): conditional[i, j]
+                    for i, j in zip(parent_codes.tolist(), child_codes.tolist())
+                },
+                [self.names[parent], self.names[child]],
+            )
+            factors.append(joint.condition_on(self.names[parent], normalise=False))
+        return factors
+
+    def _encode_(self, samples):
+        # The codes of the columns of samples, where -1
+        # is a level that is not observed in learning. The rows of
+        # mixed types are kept as objects, since a numpy array of them
+        # would turn all the levels to strings.
+        if not isinstance(samples, np.ndarray):
+            samples = np.asarray(samples, dtype=object)
+        if samples.ndim == 1:
+            samples = samples.reshape(1, -1)
+        if samples.ndim != 2 or samples.shape[1] != len(self.names):
+            raise ValueError(
+                f"The samples must be a 2D array with {len(self.names)} columns."
+            )
+        return [
+            lookup_codes(samples[:, i], lookup) for i, lookup in enumerate(self._lookups_)
+        ]
+
+    def log_likelihood(self, samples):
+        """The log-likelihood of each row of the samples under
+           the tree, which is vectorized over the rows.
+
+        Args:
+            samples (numpy.ndarray or list):
+                A 2D array of rows (or one row), with the
+                columns in the order of names.
+
+        Raises:
+            ValueError: Raises when the number of columns is wrong.
+
+        Returns:
+            numpy.ndarray: The log-likelihoods, where the rows of
+                           zero probability are -inf.
+        """
+        codes = self._encode_(samples)
+        found = np.all([column >= 0 for column in codes], axis=0)
+        probabilities = np.where(
+            found, self._root_probabilities_[codes[self.root]], 0.0
+        )
+        with np.errstate(divide="ignore"):
+            log_likelihoods = np.log(probabilities)
+            for parent, child in self.edges:
+                conditional = self._conditionals_[child]
+                log_likelihoods += np.log(
+                    np.where(found, conditional[codes[parent], codes[child]], 0.0)
+                )
+        return log_likelihoods
+
+    def probability(self, key):
+        """Gets the probability of a row (a tuple of the levels
+           in the order of names) under the tree.
+        """
+        return float(np.exp(self.log_likelihood([list(key)])[0]))
+
+    def __str__(self):
+        edges = ", ".join(
+            f"{self.names[parent]}->{self.names[child]}" for parent, child in self.edges
+        )
+        return f"Chow-Liu tree ({edges})"
+
+    __repr__ = __str__
@@ -1,22 +1,561 @@
+from math import ceil
+from multiprocessing import Pool
+from multiprocessing import shared_memory
+import os
 import numpy as np
+from probability import Table
+from probability.columnar import ColumnStore
+from probability.columnar import code_dtype
+from probability.columnar import group_codes
+from probability.columnar import group_sum
+from probability2 import Key
 
+# The least (pairs x rows) that the mutual information
+# matrix spreads over a pool when 'processes' is None
+_PARALLEL_MIN_CELLS_ = 1 << 24
 
-def entropy(distribution, unit=2):
-    """Finds the entropy of a distribution.
+
+def _entropy_(probabilities, unit):
+    # Zero probabilities have no contribution (0 log 0 = 0)
+    probabilities = probabilities[probabilities > 0]
+    # (+ 0.0 turns -0.0 of the deterministic cases to 0.0)
+    return float(-np.sum(probabilities * np.log(probabilities)) / np.log(unit)) + 0.0
+
+
+def _to_store_(distribution):
+    """Converts a Table or a probability2 distribution to
+    a ColumnStore of its (not normalised) joint values.
+
+    Returns:
+        tuple: (store, names)
+    """
+    if isinstance(distribution, Table):
+        if distribution.columns.is_multitable():
+            raise ValueError("The measures of a conditional Table are not defined.")
+        store = distribution._as_store_()
+        if distribution.log_space:
+            store = ColumnStore(store.codes, store.levels, np.exp(store.values))
+        return store, list(distribution.names)
+    if hasattr(distribution, "names"):
+        names = list(distribution.names)
+    else:
+        names = [distribution.name]
+    # The keys of one random variable are wrapped to tuples
+    store = ColumnStore.from_items(
+        ((Key(k), v) for k, v in distribution.items()), len(names)
+    )
+    return store, names
+
+
+def _as_list_(names):
+    if isinstance(names, str):
+        return [names]
+    return list(names)
+
+
+def _indices_(all_names, names):
+    indices = []
+    for name in _as_list_(names):
+        if name not in all_names:
+            raise ValueError(f"'{name}' is not defined.")
+        indices.append(all_names.index(name))
+    return indices
+
+
+def _group_(store, indices):
+    # The codes and sums of the groups of the columns at 'indices'
+    shape = tuple(len(store.levels[i]) for i in indices)
+    groups_codes, sums = group_sum(
+        [store.codes[i] for i in indices], shape, store.values.astype(np.float64)
+    )
+    return groups_codes, shape, sums
+
+
+def _joint_totals_(distribution, names, given):
+    # The group totals of (names, given), names and given, where
+    # the last two are grouped from the (smaller) first one
+    store, all_names = _to_store_(distribution)
+    x_indices = _indices_(all_names, names)
+    y_indices = _indices_(all_names, given)
+    if set(x_indices) & set(y_indices):
+        raise ValueError("The two sets of names are not disjoint.")
+    xy_codes, xy_shape, xy_sums = _group_(store, x_indices + y_indices)
+    x_size = len(x_indices)
+    _, x_sums = group_sum(xy_codes[:x_size], xy_shape[:x_size], xy_sums)
+    _, y_sums = group_sum(xy_codes[x_size:], xy_shape[x_size:], xy_sums)
+    return xy_sums, x_sums, y_sums
+
+
+def _normalise_rows_(values):
+    # Normalises each row of a 2D array (rows with zero totals are kept)
+    values = np.asarray(values, dtype=np.float64)
+    totals = values.sum(axis=-1, keepdims=True)
+    return np.divide(values, totals, out=np.zeros_like(values), where=totals != 0)
+
+
+def entropy(distribution, unit=2, names=None):
+    """Finds the entropy of a distribution, H(X).
         Its default unit is 'bit'.
 
     Args:
-        distribution ([FrequencyTable]): A FrequencyTable or any of
-                                         its sub-classes
+        distribution (Table or FrequencyTable):
+            A probability Table, or a probability2 FrequencyTable
+            or any of its sub-classes.
         unit (int, optional): Unit of the entropy. Defaults to 2 (bits).
+        names (list, optional): The names of the variables of the
+            marginal entropy. Defaults to None, which is all of them.
 
     Returns:
         [float]: Entropy of the distribution
     """
-    frequencies = distribution.frequencies(normalised=True)
-    # check to see if it is a deterministic case (all but one are zero)
-    zeros_size = frequencies[frequencies == 0].size
-    if zeros_size + 1 == frequencies.size:
-        return 0
+    if names is None and not isinstance(distribution, Table):
+        frequencies = distribution.frequencies(normalised=True)
+        return _entropy_(np.asarray(frequencies, dtype=np.float64), unit)
+    store, all_names = _to_store_(distribution)
+    if names is None:
+        values = store.values.astype(np.float64)
+    else:
+        _, _, values = _group_(store, _indices_(all_names, names))
+    if len(values) == 0 or values.sum() == 0:
+        return 0.0
+    return _entropy_(values / values.sum(), unit)
+
+
+def conditional_entropy(distribution, names, given, unit=2):
+    """Finds the conditional entropy H(X|Y) = H(X, Y) - H(Y)
+       from the joint distribution.
+
+    Args:
+        distribution (Table or DiscreteDistribution): The joint distribution.
+        names (str or list): The name(s) of X.
+        given (str or list): The name(s) of Y.
+        unit (int, optional): Unit of the entropy. Defaults to 2 (bits).
+
+    Raises:
+        ValueError: Raises when a name is not defined or X and Y overlap.
+
+    Returns:
+        float: The conditional entropy.
+    """
+    xy_sums, _, y_sums = _joint_totals_(distribution, names, given)
+    total = xy_sums.sum()
+    if total == 0:
+        return 0.0
+    return _entropy_(xy_sums / total, unit) - _entropy_(y_sums / total, unit)
+
+
+def mutual_information(distribution, names, others, unit=2):
+    """Finds the mutual information I(X;Y) = H(X) + H(Y) - H(X, Y)
+       from the joint distribution.
+
+    Args:
+        distribution (Table or DiscreteDistribution): The joint distribution.
+        names (str or list): The name(s) of X.
+        others (str or list): The name(s) of Y.
+        unit (int, optional): Unit of the entropy. Defaults to 2 (bits).
+
+    Raises:
+        ValueError: Raises when a name is not defined or X and Y overlap.
+
+    Returns:
+        float: The mutual information.
+    """
+    xy_sums, x_sums, y_sums = _joint_totals_(distribution, names, others)
+    total = xy_sums.sum()
+    if total == 0:
+        return 0.0
+    return (
+        _entropy_(x_sums / total, unit)
+        + _entropy_(y_sums / total, unit)
+        - _entropy_(xy_sums / total, unit)
+    )
+
+
+def _align_(p, q):
+    """Aligns two distributions of the same variables over the
+    union of their keys, where a missing key is zero.
+
+    Returns:
+        tuple: (p_values, q_values) normalised arrays.
+    """
+    p_store, p_names = _to_store_(p)
+    q_store, q_names = _to_store_(q)
+    if sorted(p_names) != sorted(q_names):
+        raise ValueError("Two distributions must have the same variables.")
+    codes = []
+    shape = []
+    for i, name in enumerate(p_names):
+        j = q_names.index(name)
+        # The levels of q that are not in p get new codes
+        lookup = {level: code for code, level in enumerate(p_store.levels[i].tolist())}
+        q_levels = q_store.levels[j].tolist()
+        translate = np.array(
+            [lookup.setdefault(level, len(lookup)) for level in q_levels],
+            dtype=np.int64,
+        )
+        codes.append(
+            np.concatenate(
+                [p_store.codes[i].astype(np.int64), translate[q_store.codes[j]]]
+            )
+        )
+        shape.append(len(lookup))
+    size = len(p_store)
+    if len(codes) == 0 or len(codes[0]) == 0:
+        return np.zeros(0), np.zeros(0)
+    group_index, groups_codes = group_codes(codes, tuple(shape))
+    groups_size = len(groups_codes[0])
+    p_values = np.bincount(
+        group_index[:size], weights=p_store.values, minlength=groups_size
+    )
+    q_values = np.bincount(
+        group_index[size:], weights=q_store.values, minlength=groups_size
+    )
+    return _normalise_rows_(p_values), _normalise_rows_(q_values)
+
+
+def kl_divergence(p, q, unit=2):
+    """Finds the Kullback-Leibler divergence KL(P||Q) of two
+       distributions of the same variables.
+
+    Args:
+        p (Table or DiscreteDistribution): The distribution P.
+        q (Table or DiscreteDistribution): The distribution Q.
+        unit (int, optional): Unit of the divergence. Defaults to 2 (bits).
+
+    Raises:
+        ValueError: Raises when the variables are not the same.
+
+    Returns:
+        float: The divergence, which is infinite when Q is zero
+               for a key that P is not.
+    """
+    p_values, q_values = _align_(p, q)
+    return float(kl_divergence_batch(p_values[None, :], q_values[None, :], unit)[0])
+
+
+def js_divergence(p, q, unit=2):
+    """Finds the Jensen-Shannon divergence of two distributions
+       of the same variables, JS(P||Q) = H(M) - (H(P) + H(Q)) / 2
+       where M = (P + Q) / 2.
+
+    Args:
+        p (Table or DiscreteDistribution): The distribution P.
+        q (Table or DiscreteDistribution): The distribution Q.
+        unit (int, optional): Unit of the divergence. Defaults to 2 (bits).
+
+    Raises:
+        ValueError: Raises when the variables are not the same.
+
+    Returns:
+        float: The divergence.
+    """
+    p_values, q_values = _align_(p, q)
+    return float(js_divergence_batch(p_values[None, :], q_values[None, :], unit)[0])
+
+
+def entropy_batch(distributions, unit=2):
+    """Finds the entropies of many distributions at once.
+
+    Args:
+        distributions (numpy.ndarray): A 2D array, where each row is
+            a distribution (counts or probabilities) over the same levels.
+        unit (int, optional): Unit of the entropy. Defaults to 2 (bits).
+
+    Returns:
+        numpy.ndarray: The entropy of each row.
+    """
+    probabilities = _normalise_rows_(distributions)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(probabilities > 0, probabilities * np.log(probabilities), 0)
+    return -terms.sum(axis=-1) / np.log(unit)
+
+
+def conditional_entropy_batch(joints, unit=2):
+    """Finds H(X|Y) of many joint distributions at once.
+
+    Args:
+        joints (numpy.ndarray): A 3D array of (batch x |X| x |Y|)
+            of the joint counts or probabilities.
+        unit (int, optional): Unit of the entropy. Defaults to 2 (bits).
+
+    Returns:
+        numpy.ndarray: The conditional entropy of each joint.
+    """
+    joints = np.asarray(joints, dtype=np.float64)
+    flat = joints.reshape(len(joints), -1)
+    return entropy_batch(flat, unit) - entropy_batch(joints.sum(axis=1), unit)
+
+
+def mutual_information_batch(joints, unit=2):
+    """Finds I(X;Y) of many joint distributions at once.
+
+    Args:
+        joints (numpy.ndarray): A 3D array of (batch x |X| x |Y|)
+            of the joint counts or probabilities.
+        unit (int, optional): Unit of the entropy. Defaults to 2 (bits).
+
+    Returns:
+        numpy.ndarray: The mutual information of each joint.
+    """
+    joints = np.asarray(joints, dtype=np.float64)
+    flat = joints.reshape(len(joints), -1)
+    return (
+        entropy_batch(joints.sum(axis=2), unit)
+        + entropy_batch(joints.sum(axis=1), unit)
+        - entropy_batch(flat, unit)
+    )
+
+
+def kl_divergence_batch(p, q, unit=2):
+    """Finds KL(P||Q) of many pairs of distributions at once.
+
+    Args:
+        p (numpy.ndarray): A 2D array, where each row is a distribution.
+        q (numpy.ndarray): A 2D array of the same shape.
+        unit (int, optional): Unit of the divergence. Defaults to 2 (bits).
+
+    Returns:
+        numpy.ndarray: The divergence of each pair of rows.
+    """
+    p = _normalise_rows_(p)
+    q = _normalise_rows_(q)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(p > 0, p * (np.log(p) - np.log(q)), 0)
+    return terms.sum(axis=-1) / np.log(unit)
+
+
+def js_divergence_batch(p, q, unit=2):
+    """Finds the Jensen-Shannon divergence of many pairs
+       of distributions at once.
+
+    Args:
+        p (numpy.ndarray): A 2D array, where each row is a distribution.
+        q (numpy.ndarray): A 2D array of the same shape.
+        unit (int, optional): Unit of the divergence. Defaults to 2 (bits).
+
+    Returns:
+        numpy.ndarray: The divergence of each pair of rows.
+    """
+    p = _normalise_rows_(p)
+    q = _normalise_rows_(q)
+    return entropy_batch((p + q) / 2, unit) - (
+        entropy_batch(p, unit) + entropy_batch(q, unit)
+    ) / 2
+
+
+def _pairs_mutual_information_(codes, sizes, weights, pairs, unit):
+    # The mutual information of the pairs of columns (rows of
+    # codes) from their contingency counts of combined codes
+    values = []
+    for i, j in pairs:
+        ids = codes[i].astype(np.int64) * sizes[j] + codes[j]
+        if sizes[i] * sizes[j] <= len(ids):
+            counts = np.bincount(ids, weights=weights, minlength=sizes[i] * sizes[j])
+            joint = counts.reshape(1, sizes[i], sizes[j])
+            values.append(mutual_information_batch(joint, unit)[0])
+            continue
+        # The high cardinality pairs are counted over the observed
+        # combinations only, so the memory is bounded by the rows
+        _, index = np.unique(ids, return_inverse=True)
+        xy_counts = np.bincount(index.reshape(-1), weights=weights)
+        total = xy_counts.sum()
+        if total == 0:
+            values.append(0.0)
+            continue
+        x_counts = np.bincount(codes[i], weights=weights, minlength=sizes[i])
+        y_counts = np.bincount(codes[j], weights=weights, minlength=sizes[j])
+        values.append(
+            _entropy_(x_counts / total, unit)
+            + _entropy_(y_counts / total, unit)
+            - _entropy_(xy_counts / total, unit)
+        )
+    return values
+
+
+def _shared_pairs_mutual_information_(
+    shm_name, shape, dtype, weights_name, sizes, pairs, unit
+):
+    # The same as _pairs_mutual_information_ for the codes
+    # (and weights) in the shared memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    weights_shm = None
+    try:
+        codes = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        weights = None
+        if weights_name is not None:
+            weights_shm = shared_memory.SharedMemory(name=weights_name)
+            weights = np.ndarray(shape[1], dtype=np.float64, buffer=weights_shm.buf)
+        values = _pairs_mutual_information_(codes, sizes, weights, pairs, unit)
+        del codes, weights
+        return values
+    finally:
+        shm.close()
+        if weights_shm is not None:
+            weights_shm.close()
+
+
+def encode_columns(data):
+    """Converts a 2D samples array, a Table or a probability2
+    distribution to a (columns x rows) array of codes.
+
+    Args:
+        data (numpy.ndarray, Table or DiscreteDistribution):
+            A 2D array of samples (e.g. integer codes), a Table or
+            a DiscreteDistribution of the joint counts.
+
+    Raises:
+        ValueError: Raises when the samples are not a 2D array.
+
+    Returns:
+        tuple: (codes, levels, weights, names) where 'levels' is the
+               levels of each column, 'weights' is the counts of rows
+               or None for samples and 'names' is None for samples.
+    """
+    if isinstance(data, np.ndarray):
+        if data.ndim != 2:
+            raise ValueError("The samples must be a 2D numpy array.")
+        integers = data.dtype.kind in "iub"
+        columns = []
+        levels = []
+        for column in data.T:
+            high = int(column.max()) if integers and len(column) else -1
+            if (
+                integers
+                and (len(column) == 0 or column.min() >= 0)
+                and high < 2 * len(column) + 1024
+            ):
+                # Small integer codes are used as they are, while the
+                # large ones (e.g. IDs) would make sparse levels
+                columns.append(column.astype(np.int64))
+                levels.append(np.arange(high + 1))
+            else:
+                column_levels, codes = np.unique(column, return_inverse=True)
+                columns.append(codes)
+                levels.append(column_levels)
+        weights = None
+        names = None
+    else:
+        store, names = _to_store_(data)
+        columns = store.codes
+        levels = store.levels
+        weights = store.values.astype(np.float64)
+    rows_size = len(columns[0]) if len(columns) > 0 else 0
+    sizes = [len(column_levels) for column_levels in levels]
+    codes = np.empty((len(columns), rows_size), dtype=code_dtype(max(sizes, default=0)))
+    for i, column in enumerate(columns):
+        codes[i] = column
+    return codes, levels, weights, names
+
+
+def mutual_information_matrix(data, unit=2, processes=None):
+    """Finds the mutual information I(Xi;Xj) of all the pairs
+       of columns, where the diagonal is the entropy H(Xi).
+
+       The contingency counts of each pair are the bincount of
+       the combined codes, or of the observed combinations when the
+       product of the two columns' levels is more than the rows, so
+       the memory of each pair is bounded by the rows. The pairs
+       are spread over a process pool, which reads the codes from a
+       shared memory.
+
+    Args:
+        data (numpy.ndarray, Table or DiscreteDistribution):
+            A 2D array of samples (e.g. integer codes), a Table or
+            a DiscreteDistribution of the joint counts.
+        unit (int, optional): Unit of the entropy. Defaults to 2 (bits).
+        processes (int, optional): Number of worker processes.
+            Defaults to None, which is the number of CPUs for the
+            large inputs and one for the small ones. When it is
+            one, the pairs are computed in this process.
+
+    Raises:
+        ValueError: Raises when the samples are not a 2D array.
+
+    Returns:
+        numpy.ndarray: The (k x k) symmetric matrix.
+    """
+    codes, levels, weights, _ = encode_columns(data)
+    return codes_mutual_information_matrix(
+        codes, [len(column_levels) for column_levels in levels], weights, unit, processes
+    )
+
+
+def codes_mutual_information_matrix(codes, sizes, weights=None, unit=2, processes=None):
+    """The same as mutual_information_matrix, for the columns
+       that are already encoded, e.g. by encode_columns.
+
+    Args:
+        codes (numpy.ndarray): The (columns x rows) array of codes.
+        sizes (list): The number of levels of each column.
+        weights (numpy.ndarray, optional): The counts of the rows.
+            Defaults to None, which is one for each row.
+        unit (int, optional): Unit of the entropy. Defaults to 2 (bits).
+        processes (int, optional): Number of worker processes.
+            Defaults to None, which is the number of CPUs for the
+            large inputs and one for the small ones.
+
+    Returns:
+        numpy.ndarray: The (k x k) symmetric matrix.
+    """
+    k = len(codes)
+    pairs = [(i, j) for i in range(k) for j in range(i + 1, k)]
+    if processes is None:
+        # The small inputs are not worth starting a pool
+        rows_size = codes.shape[1] if codes.ndim == 2 else 0
+        if len(pairs) * rows_size < _PARALLEL_MIN_CELLS_:
+            processes = 1
+        else:
+            processes = os.cpu_count() or 1
+
+    if processes == 1 or len(pairs) <= 1:
+        values = _pairs_mutual_information_(codes, sizes, weights, pairs, unit)
     else:
-        return np.sum(-frequencies * np.log2(frequencies) / np.log2(unit))
+        chunk_size = ceil(len(pairs) / (4 * processes))
+        shm = shared_memory.SharedMemory(create=True, size=max(codes.nbytes, 1))
+        weights_shm = None
+        try:
+            shared = np.ndarray(codes.shape, dtype=codes.dtype, buffer=shm.buf)
+            shared[:] = codes
+            weights_name = None
+            if weights is not None:
+                weights_shm = shared_memory.SharedMemory(
+                    create=True, size=max(weights.nbytes, 1)
+                )
+                shared_weights = np.ndarray(
+                    weights.shape, dtype=np.float64, buffer=weights_shm.buf
+                )
+                shared_weights[:] = weights
+                weights_name = weights_shm.name
+                del shared_weights
+            chunks = [
+                (
+                    shm.name,
+                    codes.shape,
+                    codes.dtype,
+                    weights_name,
+                    sizes,
+                    pairs[start : start + chunk_size],
+                    unit,
+                )
+                for start in range(0, len(pairs), chunk_size)
+            ]
+            with Pool(processes) as pool:
+                partials = pool.starmap(_shared_pairs_mutual_information_, chunks)
+            del shared
+        finally:
+            shm.close()
+            shm.unlink()
+            if weights_shm is not None:
+                weights_shm.close()
+                weights_shm.unlink()
+        values = [value for partial in partials for value in partial]
+
+    matrix = np.zeros((k, k))
+    if len(pairs) > 0:
+        rows, columns = zip(*pairs)
+        matrix[rows, columns] = values
+        matrix[columns, rows] = values
+    for i in range(k):
+        counts = np.bincount(codes[i], weights=weights, minlength=sizes[i])
+        matrix[i, i] = entropy_batch(counts[None, :], unit)[0]
+    return matrix
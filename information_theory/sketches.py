@@ -0,0 +1,193 @@
+from collections import Counter
+from collections.abc import Mapping
+from hashlib import blake2b
+import numpy as np
+
+_MASK_ = (1 << 64) - 1
+_GOLDEN_ = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64_(values):
+    # The SplitMix64 finaliser, a fast and well mixed hash of uint64
+    values = values + _GOLDEN_
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _open_uniform_(values):
+    # The top 53 bits of hashes as uniforms in the open interval (0, 1)
+    return ((values >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0**-53
+
+
+def _hash_key_(key):
+    # Integers are hashed by their values, so a key and its numpy
+    # scalar have the same hash. Other keys are hashed by their
+    # repr, which does not depend on the process (unlike hash()).
+    if isinstance(key, (int, np.integer)) and not isinstance(key, bool):
+        return int(key) & _MASK_
+    return int.from_bytes(
+        blake2b(repr(key).encode(), digest_size=8).digest(), "little"
+    )
+
+
+def _hash_keys_(keys):
+    if isinstance(keys, np.ndarray) and keys.dtype.kind in "iu":
+        return keys.astype(np.int64).view(np.uint64)
+    return np.array([_hash_key_(key) for key in keys], dtype=np.uint64)
+
+
+class EntropySketch:
+    """A streaming and mergeable estimator of the Shannon entropy of
+    the keys of a stream, in constant memory (Clifford and Cosma's
+    stable sketch).
+
+    Each key has 'size' pseudo random variates (made from its hash) of
+    the maximally skewed 1-stable distribution, and the sketch keeps
+    the sums of counts times variates. For the stream frequencies p,
+    the sums over the total are samples of a stable distribution
+    with location -(2/pi) H(p), so E[exp(y / total)] = exp(-(2/pi) H)
+    gives the estimate. The standard error is about 1.5 / sqrt(size)
+    nats and does not depend on the number of distinct keys.
+
+    The sketch is linear, so the sketches of the shards of a stream
+    (with the same size and seed) merge by adding their sums.
+
+    Members:
+        size (int): Number of the variates of each key.
+        seed (int): Seed of the variates.
+        total (float): Total counts of the observed keys.
+    """
+
+    def __init__(self, size=1024, seed=0, samples=None):
+        """
+        Args:
+            size (int, optional): Number of the variates of each key. The
+                update cost is O(size) per key and the error is
+                O(1/sqrt(size)). Defaults to 1024.
+            seed (int, optional): Seed of the variates. The sketches that
+                are merged must have the same seed. Defaults to 0.
+            samples (Mapping, Iterable or numpy.ndarray, optional):
+                The initial samples. Defaults to None.
+
+        Raises:
+            ValueError: Raises when the size is less than one.
+        """
+        if size < 1:
+            raise ValueError("The size of the sketch must be at least one.")
+        self.size = int(size)
+        self.seed = int(seed)
+        self.total = 0.0
+        self._sums_ = np.zeros(self.size, dtype=np.float64)
+        # The hash of each variate is mixed with the seed and its index
+        self._offsets_ = _splitmix64_(
+            np.uint64(_hash_key_(self.seed))
+            + np.arange(self.size, dtype=np.uint64) * np.uint64(2)
+        )
+        if samples is not None:
+            self.update(samples)
+
+    def _variates_(self, hashes):
+        # The (keys x size) maximally skewed 1-stable variates,
+        # by the Chambers-Mallows-Stuck method for alpha=1, beta=-1
+        with np.errstate(over="ignore"):
+            mixed = hashes[:, np.newaxis] ^ self._offsets_
+            u_hashes = _splitmix64_(mixed)
+            w_hashes = _splitmix64_(u_hashes)
+        u = np.pi * (_open_uniform_(u_hashes) - 0.5)
+        w = -np.log(_open_uniform_(w_hashes))
+        half_pi = np.pi / 2
+        return (2 / np.pi) * (
+            (half_pi - u) * np.tan(u)
+            + np.log(half_pi * w * np.cos(u) / (half_pi - u))
+        )
+
+    def add(self, key, count=1):
+        """Adds 'count' observations of a key, in O(size)."""
+        self._add_hashes_(np.array([_hash_key_(key)], dtype=np.uint64), [count])
+
+    def _add_hashes_(self, hashes, counts, chunk_size=4096):
+        counts = np.asarray(counts, dtype=np.float64)
+        # The variates of the keys are made in chunks, so the
+        # memory is bounded by (chunk_size x size)
+        step = max(1, chunk_size * 256 // self.size)
+        for i in range(0, len(hashes), step):
+            self._sums_ += counts[i : i + step] @ self._variates_(hashes[i : i + step])
+        self.total += float(counts.sum())
+
+    def update(self, samples):
+        """Adds the new observations to the sketch in place. The
+           samples are counted first, so each distinct key of the
+           batch costs O(size).
+
+        Args:
+            samples (Mapping, Iterable or numpy.ndarray):
+                A dictionary of (key:count), like a Counter,
+                an iterable of the observed keys or a 1D
+                numpy array of the keys.
+        """
+        if isinstance(samples, Mapping):
+            keys = list(samples.keys())
+            counts = list(samples.values())
+            hashes = _hash_keys_(keys)
+        else:
+            if not isinstance(samples, np.ndarray):
+                samples = np.asarray(list(samples), dtype=object)
+            if len(samples) == 0:
+                return
+            if samples.dtype == object:
+                # np.unique of objects needs the keys to be comparable
+                counter = Counter(samples.tolist())
+                counts = list(counter.values())
+                hashes = _hash_keys_(counter.keys())
+            else:
+                keys, counts = np.unique(samples, return_counts=True)
+                hashes = _hash_keys_(keys if keys.dtype.kind in "iu" else keys.tolist())
+        self._add_hashes_(hashes, counts)
+
+    def merge(self, other):
+        """Combines two sketches of the same size and seed, e.g. the
+           ones of different shards of a stream. The merge is
+           associative and commutative.
+
+        Args:
+            other (EntropySketch): The other sketch.
+
+        Raises:
+            ValueError: Raises when the other is not an EntropySketch
+                        or its size or seed are not the same.
+
+        Returns:
+            EntropySketch: A new sketch of all the samples.
+        """
+        if not isinstance(other, EntropySketch):
+            raise ValueError("The 'other' argument must be an EntropySketch.")
+        if (other.size, other.seed) != (self.size, self.seed):
+            raise ValueError("Two sketches have different sizes or seeds.")
+        merged = EntropySketch(self.size, self.seed)
+        merged._sums_ = self._sums_ + other._sums_
+        merged.total = self.total + other.total
+        return merged
+
+    def entropy(self, unit=2):
+        """The estimate of the Shannon entropy of the observed keys.
+
+        Args:
+            unit (int, optional): Unit of the entropy. Defaults to 2 (bits).
+
+        Returns:
+            float: The estimate, which is zero for an empty sketch.
+        """
+        if self.total == 0:
+            return 0.0
+        scaled = self._sums_ / self.total
+        # log(mean(exp(scaled))) by the log-sum-exp
+        largest = scaled.max()
+        log_mean = largest + np.log(np.mean(np.exp(scaled - largest)))
+        # The estimate can be slightly negative for the small entropies
+        return max(0.0, float(-(np.pi / 2) * log_mean / np.log(unit)))
+
+    def __str__(self):
+        return f"Entropy sketch (size={self.size}, total={self.total:g})"
+
+    __repr__ = __str__
@@ -1,6 +1,20 @@
 import numpy as np
 
 
+def _encode_(labels):
+    # The same as np.unique(labels, return_inverse=True), but the
+    # integers of a small range are encoded in O(n) by a bincount
+    # of their offsets instead of sorting
+    if labels.dtype.kind in "iu":
+        low, high = int(labels.min()), int(labels.max())
+        if high - low < 2 * len(labels) + 1024:
+            offsets = (labels - low).astype(np.int64)
+            present = np.bincount(offsets) > 0
+            codes = np.cumsum(present) - 1
+            return np.flatnonzero(present) + low, codes[offsets]
+    return np.unique(labels, return_inverse=True)
+
+
 class ClassificationMatrix:
     """Provides measures of performance for prediction against targets.
 
@@ -32,12 +46,39 @@ class ClassificationMatrix:
                                 Whenever it is 'None', the first item of
                                 targets takes as the symbol.
 
+        The numpy arrays of the same dtype are encoded by np.unique
+        and counted by one np.bincount (the integers of a small range
+        by their offsets), where the classes are sorted.
+
+        Raises:
+            ValueError: Raises when the targets or predictions are
+                        empty, or the numpy arrays' lengths are not
+                        the same.
         """
         # Empty target or prediction
         if len(targets) == 0:
             raise ValueError("'targets' cannot be empty.")
         if len(predictions) == 0:
             raise ValueError("'predictions' cannot be empty.")
+        # The arrays of different dtypes (e.g. strings and integers)
+        # are compared in the loop, since np.concatenate would cast
+        # them to a common dtype and match '1' and 1
+        if (
+            isinstance(predictions, np.ndarray)
+            and isinstance(targets, np.ndarray)
+            and predictions.dtype == targets.dtype
+        ):
+            if len(predictions) != len(targets):
+                raise ValueError(
+                    "'predictions' and 'targets' must have the same length."
+                )
+            # One pass of encoding for both, where the first
+            # len(targets) codes are the targets' codes
+            classes, codes = _encode_(np.concatenate([targets, predictions]))
+            self._set_matrix_(
+                codes[len(targets) :], codes[: len(targets)], classes, class_symbol
+            )
+            return
         # In case, store the first element of the targets
         # to use as the symbol for the true cases, anytime
         # that the caller does not provide it
@@ -59,6 +100,64 @@ class ClassificationMatrix:
             # the comparision of target against output
             self.conf_matrix[i, j] += 1
 
+    @classmethod
+    def from_codes(cls, predictions, targets, classes, class_symbol=None):
+        """Construct a classification matrix from the integer labels
+           of predictions and targets, which skips the encoding.
+
+        Args:
+            predictions (numpy.ndarray): The indices of predictions
+                                         in 'classes'.
+            targets (numpy.ndarray): The indices of targets in 'classes'.
+            classes (list or numpy.ndarray): The class symbols.
+            class_symbol (object, optional): The symbol that takes as true
+                                to find true-positives. Defaults to None,
+                                which is the class of the first target.
+
+        Raises:
+            ValueError: Raises when the labels are empty, their lengths
+                        are not the same or they are not in the range
+                        of classes.
+
+        Returns:
+            ClassificationMatrix: The classification matrix.
+        """
+        predictions = np.asarray(predictions)
+        targets = np.asarray(targets)
+        if len(targets) == 0:
+            raise ValueError("'targets' cannot be empty.")
+        if len(predictions) == 0:
+            raise ValueError("'predictions' cannot be empty.")
+        if len(predictions) != len(targets):
+            raise ValueError("'predictions' and 'targets' must have the same length.")
+        if predictions.dtype.kind not in "iu" or targets.dtype.kind not in "iu":
+            raise ValueError("The labels must be integers.")
+        n_classes = len(classes)
+        for labels in (predictions, targets):
+            if labels.min() < 0 or labels.max() >= n_classes:
+                raise ValueError(f"The labels must be in the range [0, {n_classes}).")
+        matrix = cls.__new__(cls)
+        matrix._set_matrix_(predictions, targets, classes, class_symbol)
+        return matrix
+
+    def _set_matrix_(self, predictions, targets, classes, class_symbol):
+        # 'predictions' and 'targets' are the indices of 'classes'
+        classes = classes.tolist() if isinstance(classes, np.ndarray) else list(classes)
+        n_classes = len(classes)
+        self.class_symbol = class_symbol
+        if self.class_symbol is None:
+            self.class_symbol = classes[targets[0]]
+        self.classes = set(classes)
+        self.classes_lookup = {c: i for i, c in enumerate(classes)}
+        # Each (target, prediction) pair is a cell of the
+        # flatten matrix, so one bincount counts all of them
+        cells = targets.astype(np.int64) * n_classes + predictions
+        self.conf_matrix = (
+            np.bincount(cells, minlength=n_classes * n_classes)
+            .reshape(n_classes, n_classes)
+            .astype(np.float64)
+        )
+
     def _get_class_symbole_index(self, class_symbol):
         if class_symbol is None:
             return self.classes_lookup[self.class_symbol]
@@ -3,4 +3,6 @@ from probability.core_1 import Column
 from probability.core_1 import TableColumns
 from probability.core_2 import Table
 from probability.core_2 import MultiTable
+from probability.dense import DenseTable
 from probability.empirical import FrequencyTable
+from probability.elimination import VariableElimination
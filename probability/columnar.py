@@ -0,0 +1,772 @@
+from math import prod
+from operator import itemgetter
+import numpy as np
+from probability.core_1 import RowKey
+
+
+def code_dtype(levels_size):
+    """The smallest signed integer type that can hold the codes
+       of a column with 'levels_size' number of levels.
+
+    Args:
+        levels_size (int): Number of levels of the column.
+
+    Returns:
+        numpy dtype: int8, int16, int32 or int64.
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if levels_size <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def to_object_array(items):
+    """Convert a list to 1D numpy array of objects.
+       Unlike np.array, tuples are kept as elements.
+    """
+    arr = np.empty(len(items), dtype=object)
+    for i, item in enumerate(items):
+        arr[i] = item
+    return arr
+
+
+def encode_column(column):
+    """Dictionary-encodes a column to an array of integer codes
+       and an array of levels, where levels[codes] == column.
+
+       The levels are sorted when they are comparable, so the
+       order of codes is the same as the order of levels.
+
+    Args:
+        column (list or numpy.ndarray): The values of the column.
+
+    Returns:
+        tuple: (codes, levels)
+    """
+    if not isinstance(column, np.ndarray):
+        # Homogeneous python columns are encoded by numpy too
+        types = set(map(type, column))
+        if len(types) == 1 and types.pop() in (int, float, str):
+            column = np.array(column)
+    if isinstance(column, np.ndarray) and column.dtype != object:
+        levels, codes = np.unique(column, return_inverse=True)
+        return (
+            codes.astype(code_dtype(len(levels))),
+            to_object_array(levels.tolist()),
+        )
+    # For objects, the encoding happens by a dictionary
+    # lookup (level:code) in the order of appearance
+    lookup = {}
+    codes = np.fromiter(
+        (lookup.setdefault(level, len(lookup)) for level in column),
+        dtype=np.int64,
+        count=len(column),
+    )
+    levels = list(lookup.keys())
+    try:
+        order = sorted(range(len(levels)), key=levels.__getitem__)
+    except TypeError:  # e.g. mixed types that are not comparable
+        return codes.astype(code_dtype(len(levels))), to_object_array(levels)
+    # rank of each old code in the sorted levels
+    rank = np.empty(len(levels), dtype=np.int64)
+    rank[order] = np.arange(len(levels))
+    return (
+        rank[codes].astype(code_dtype(len(levels))),
+        to_object_array([levels[i] for i in order]),
+    )
+
+
+def combine_codes(codes, shape):
+    """Combines the codes of several columns to one integer id
+       per row (mixed radix). The ids have the same order as
+       the lexicographic order of codes.
+
+    Args:
+        codes (list): List of 1D codes arrays.
+        shape (tuple): Number of levels of each column.
+
+    Returns:
+        numpy.ndarray or None:
+            The combined ids or None when the product of
+            the levels sizes does not fit in int64.
+    """
+    if len(codes) == 0:
+        return None
+    if prod(shape) >= np.iinfo(np.int64).max:
+        return None
+    if len(codes) == 1:
+        return codes[0].astype(np.int64)
+    return np.ravel_multi_index(codes, shape)
+
+
+def group_codes(codes, shape):
+    """Groups the rows by their codes.
+
+       When the number of all possible combinations of the
+       levels is small compared to the rows, the groups are
+       found by counting the combined ids (O(n)); otherwise
+       by np.unique. In both cases the groups are sorted in
+       the lexicographic order of the codes.
+
+    Args:
+        codes (list): List of 1D codes arrays (one per column).
+        shape (tuple): Number of levels of each column.
+
+    Returns:
+        tuple: (group_index, groups_codes) where 'group_index' is
+               the group of each row and 'groups_codes' is the list
+               of codes arrays (one per column) of the groups.
+    """
+    rows_size = len(codes[0])
+    ids = combine_codes(codes, shape)
+    if ids is None:
+        uniques, group_index = np.unique(
+            np.stack(codes, axis=1), axis=0, return_inverse=True
+        )
+        return group_index, [uniques[:, i] for i in range(len(codes))]
+
+    cells_size = prod(shape)
+    if cells_size <= 2 * rows_size:
+        present = np.bincount(ids, minlength=cells_size) > 0
+        uniques = np.flatnonzero(present)
+        # rank of each cell among the present ones
+        rank = np.cumsum(present) - 1
+        group_index = rank[ids]
+    else:
+        uniques, group_index = np.unique(ids, return_inverse=True)
+
+    if len(codes) == 1:
+        return group_index, [uniques]
+    return group_index, list(np.unravel_index(uniques, shape))
+
+
+def group_sum(codes, shape, values):
+    """Groups the rows by their codes and sums the values
+       of each group.
+
+    Args:
+        codes (list): List of 1D codes arrays (one per column).
+        shape (tuple): Number of levels of each column.
+        values (numpy.ndarray): The values of rows.
+
+    Returns:
+        tuple: (groups_codes, sums)
+    """
+    group_index, groups_codes = group_codes(codes, shape)
+    sums = np.bincount(group_index, weights=values, minlength=len(groups_codes[0]))
+    if values.dtype.kind in "biu":
+        sums = sums.astype(np.int64)
+    return groups_codes, sums
+
+
+def group_logsumexp(group_index, groups_size, values):
+    """Computes log(sum(exp(values))) of each group. Each group
+       is shifted by its maximum, so the exponents do not underflow.
+
+    Args:
+        group_index (numpy.ndarray): The group of each row.
+        groups_size (int): Number of groups.
+        values (numpy.ndarray): The log values of rows.
+
+    Returns:
+        numpy.ndarray: The log of sums of the groups.
+    """
+    values = values.astype(np.float64)
+    maxes = np.full(groups_size, -np.inf)
+    np.maximum.at(maxes, group_index, values)
+    # The groups that all their values are log(0) are not shifted
+    maxes[~np.isfinite(maxes)] = 0
+    sums = np.bincount(
+        group_index, weights=np.exp(values - maxes[group_index]), minlength=groups_size
+    )
+    with np.errstate(divide="ignore"):
+        return np.log(sums) + maxes
+
+
+def lookup_codes(keys, lookup):
+    """Finds the code of each key in 'lookup', where -1 is
+    a key that does not exist (or is not hashable).
+
+    The numpy arrays are encoded by their unique values (or rows
+    for 2D arrays), so there is one dictionary lookup per unique key.
+
+    Args:
+        keys (list or numpy.ndarray): List of keys, or a 1D array
+                                      of keys or a 2D array of rows.
+        lookup (dict): A dictionary of (key:code).
+
+    Returns:
+        numpy.ndarray: The codes of the keys.
+    """
+    if isinstance(keys, np.ndarray) and keys.dtype != object and len(keys) > 0:
+        if keys.ndim == 1:
+            uniques, inverse = np.unique(keys, return_inverse=True)
+            uniques = uniques.tolist()
+        else:
+            levels, codes = zip(
+                *[np.unique(column, return_inverse=True) for column in keys.T]
+            )
+            inverse, groups_codes = group_codes(
+                list(codes), tuple(len(level) for level in levels)
+            )
+            uniques = zip(
+                *[
+                    level[group].tolist()
+                    for level, group in zip(levels, groups_codes)
+                ]
+            )
+        uniques_codes = np.array(
+            [lookup.get(key, -1) for key in uniques], dtype=np.int64
+        )
+        return uniques_codes[inverse]
+
+    if isinstance(keys, np.ndarray) and keys.ndim == 2:
+        keys = map(tuple, keys.tolist())
+    return np.fromiter((_lookup_code_(lookup, key) for key in keys), dtype=np.int64)
+
+
+def _lookup_code_(lookup, key):
+    try:
+        return lookup.get(key, -1)
+    except TypeError:
+        # Unhashable keys (e.g. lists) do not exist in the lookup
+        return -1
+
+
+def merge_join(left_ids, right_ids):
+    """Finds the matching pairs of rows of two sides of an inner
+       join by sorting both sides and searching the match range
+       of each left row in the sorted right side (sort-merge join).
+
+    Args:
+        left_ids (numpy.ndarray): The integer join key of left rows.
+        right_ids (numpy.ndarray): The integer join key of right rows.
+
+    Returns:
+        tuple: (left_positions, right_positions) of the matching
+               pairs, which are sorted by the join key, and then
+               by the positions of left and right rows.
+    """
+    left_order = np.argsort(left_ids, kind="stable")
+    right_order = np.argsort(right_ids, kind="stable")
+    left_sorted = left_ids[left_order]
+    right_sorted = right_ids[right_order]
+    # The match range of each left row in the sorted right side
+    lo = np.searchsorted(right_sorted, left_sorted, side="left")
+    hi = np.searchsorted(right_sorted, left_sorted, side="right")
+    counts = hi - lo
+    total = int(counts.sum())
+    # Each left row is repeated by its number of matches, and
+    # the right rows are the consecutive ranges lo:hi
+    left_positions = np.repeat(left_order, counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    right_positions = right_order[np.repeat(lo, counts) + offsets]
+    return left_positions, right_positions
+
+
+class ColumnStore:
+    """Dictionary-encoded (columnar) storage of a Table rows.
+
+    Each column is kept as an array of small integer codes
+    plus the array of its levels, and the values of rows are
+    kept in a contiguous numpy array.
+
+    Members:
+        codes (list): List of 1D integer arrays, one per column.
+        levels (list): List of 1D object arrays, one per column.
+        values (numpy.ndarray): Values of the rows.
+    """
+
+    def __init__(self, codes, levels, values):
+        self.codes = codes
+        self.levels = levels
+        self.values = values
+        # lazily built lookups
+        self._level_lookups_ = None
+        self._row_lookup_ = None
+        self._column_indices_ = [None] * len(codes)
+
+    @classmethod
+    def from_items(cls, items, size):
+        """Construct a store from (key, value) pairs.
+
+        Args:
+            items (iterable): (RowKey, value) pairs.
+            size (int): Number of columns.
+
+        Raises:
+            ValueError: Raises when the values are not numeric.
+        """
+        items = list(items)
+        keys = list(map(itemgetter(0), items))
+        values = list(map(itemgetter(1), items))
+        columns = [list(map(itemgetter(i), keys)) for i in range(size)]
+        # The keys of a dictionary are unique, so there is
+        # no need to check the repeated rows
+        return cls._encode_(columns, values)
+
+    @classmethod
+    def from_columns(cls, columns, values):
+        """Construct a store from a list of columns and values.
+
+        Args:
+            columns (list): List of columns (lists or 1D numpy arrays).
+            values (list or numpy.ndarray): the values of rows.
+
+        Raises:
+            ValueError:
+                Raises when the values are not numeric or
+                the lengths of columns and values are not the same.
+        """
+        store = cls._encode_(columns, values)
+        if store.has_repeated_rows():
+            raise ValueError("Columnar Table does not accept repeated rows.")
+        return store
+
+    @classmethod
+    def _encode_(cls, columns, values):
+        values = np.asarray(values)
+        if len(values) == 0:
+            values = values.astype(np.float64)
+        if values.dtype.kind not in "biuf":
+            raise ValueError("Columnar Table only accepts numeric values.")
+        for column in columns:
+            if len(column) != len(values):
+                raise ValueError("The length of columns and values are not the same.")
+        encoded = [encode_column(column) for column in columns]
+        return cls(
+            [codes for codes, _ in encoded],
+            [levels for _, levels in encoded],
+            values,
+        )
+
+    @property
+    def shape(self):
+        return tuple(len(levels) for levels in self.levels)
+
+    def __len__(self):
+        return len(self.values)
+
+    def column(self, index):
+        """Decodes the column at 'index' to an object array."""
+        return self.levels[index][self.codes[index]]
+
+    def keys(self):
+        if len(self.codes) == 0:
+            return (RowKey(()) for _ in range(len(self)))
+        return (
+            RowKey(row)
+            for row in zip(*[self.column(i) for i in range(len(self.codes))])
+        )
+
+    def key_at(self, position):
+        return RowKey(
+            [self.levels[i][codes[position]] for i, codes in enumerate(self.codes)]
+        )
+
+    def values_list(self):
+        return self.values.tolist()
+
+    def items(self):
+        return zip(self.keys(), self.values_list())
+
+    def _row_index_(self):
+        """A lazily built index to find the rows' positions.
+
+           When the combined codes fit in int64, it is the pair of
+           (sorted ids, positions) for binary search; otherwise a
+           dictionary of (codes tuple: position).
+        """
+        if self._row_lookup_ is None:
+            ids = combine_codes(self.codes, self.shape)
+            if ids is None:
+                rows = zip(*[codes.tolist() for codes in self.codes])
+                self._row_lookup_ = {row: i for i, row in enumerate(rows)}
+            else:
+                order = np.argsort(ids, kind="stable")
+                self._row_lookup_ = (ids[order], order)
+        return self._row_lookup_
+
+    def has_repeated_rows(self):
+        index = self._row_index_()
+        if isinstance(index, dict):
+            return len(index) != len(self)
+        sorted_ids, _ = index
+        return bool(np.any(sorted_ids[1:] == sorted_ids[:-1]))
+
+    def encode(self, index, level):
+        """Finds the code of the level in column 'index'.
+
+        Returns:
+            int: The code or -1 when the level does not exist.
+        """
+        if self._level_lookups_ is None:
+            self._level_lookups_ = [
+                {level: code for code, level in enumerate(levels.tolist())}
+                for levels in self.levels
+            ]
+        return self._level_lookups_[index].get(level, -1)
+
+    def position(self, key):
+        """Finds the position of the row of 'key'.
+
+        Returns:
+            int: The row position or -1 when the key does not exist.
+        """
+        if len(key) != len(self.codes):
+            return -1
+        codes = [self.encode(i, level) for i, level in enumerate(key)]
+        if -1 in codes:
+            return -1
+        index = self._row_index_()
+        if isinstance(index, dict):
+            return index.get(tuple(codes), -1)
+        sorted_ids, order = index
+        row_id = np.ravel_multi_index(codes, self.shape)
+        i = np.searchsorted(sorted_ids, row_id)
+        if i < len(sorted_ids) and sorted_ids[i] == row_id:
+            return int(order[i])
+        return -1
+
+    def column_index(self, index):
+        """A lazily built inverted index of the column at 'index'.
+
+           The positions of rows with the level code 'c' are
+           order[starts[c]:starts[c + 1]].
+
+        Returns:
+            tuple: (order, starts)
+        """
+        if self._column_indices_[index] is None:
+            codes = self.codes[index]
+            counts = np.bincount(codes, minlength=len(self.levels[index]))
+            starts = np.r_[0, np.cumsum(counts)]
+            order = np.argsort(codes, kind="stable")
+            self._column_indices_[index] = (order, starts)
+        return self._column_indices_[index]
+
+    def positions_of(self, index, level):
+        """The positions of rows that their column at 'index'
+        is equal to 'level'.
+        """
+        code = self.encode(index, level)
+        if code == -1:
+            return np.array([], dtype=np.intp)
+        order, starts = self.column_index(index)
+        return order[starts[code] : starts[code + 1]]
+
+    def reduce(self, indices, levels, compliment_indices):
+        """Selects the rows that their columns at 'indices' are
+           equal to 'levels' and keeps the compliment columns.
+
+           The rows are found from the inverted index of the most
+           selective column, so the cost is proportional to the
+           number of matching rows.
+
+        Args:
+            indices (list): The indices of the reduced columns.
+            levels (list): The levels of the reduced columns.
+            compliment_indices (list): The indices of the kept columns.
+
+        Returns:
+            ColumnStore: A new store of the kept columns, sorted by keys.
+        """
+        if len(indices) == 0:
+            positions = np.arange(len(self))
+        else:
+            candidates = [
+                self.positions_of(index, level) for index, level in zip(indices, levels)
+            ]
+            smallest = int(np.argmin([len(positions) for positions in candidates]))
+            positions = candidates[smallest]
+            for i, (index, level) in enumerate(zip(indices, levels)):
+                if i != smallest:
+                    code = self.encode(index, level)
+                    positions = positions[self.codes[index][positions] == code]
+        # Sort the selected rows by the compliment columns
+        comp_codes = [self.codes[i][positions] for i in compliment_indices]
+        comp_shape = tuple(len(self.levels[i]) for i in compliment_indices)
+        comp_ids = combine_codes(comp_codes, comp_shape)
+        if comp_ids is None:
+            order = np.lexsort(comp_codes[::-1])
+        else:
+            order = np.argsort(comp_ids, kind="stable")
+        return ColumnStore(
+            [codes[order] for codes in comp_codes],
+            [self.levels[i] for i in compliment_indices],
+            self.values[positions][order],
+        )
+
+    def get(self, key):
+        position = self.position(key)
+        if position == -1:
+            return None
+        return self.values[position].item()
+
+    def set(self, key, value):
+        """Sets the value of an existing key.
+
+        Returns:
+            bool: False when the key does not exist.
+        """
+        position = self.position(key)
+        if position == -1:
+            return False
+        if self.values.dtype.kind != "f" and not isinstance(
+            value, (int, np.integer)
+        ):
+            self.values = self.values.astype(np.float64)
+        self.values[position] = value
+        return True
+
+    def marginal(self, indices, log_space=False):
+        """Groups the rows by the columns at 'indices' and sums
+           the values of each group.
+
+        Args:
+            indices (list): The indices of the columns that are kept.
+            log_space (bool, optional):
+                The values are logs and are summed by log-sum-exp.
+                Defaults to False.
+
+        Returns:
+            ColumnStore: A new store of the kept columns.
+        """
+        levels = [self.levels[i] for i in indices]
+        if len(self) == 0:
+            return ColumnStore(
+                [np.array([], dtype=np.int8) for _ in indices], levels, self.values
+            )
+        shape = tuple(len(level) for level in levels)
+        if log_space:
+            group_index, groups_codes = group_codes(
+                [self.codes[i] for i in indices], shape
+            )
+            sums = group_logsumexp(group_index, len(groups_codes[0]), self.values)
+        else:
+            groups_codes, sums = group_sum(
+                [self.codes[i] for i in indices], shape, self.values
+            )
+        return ColumnStore(
+            [codes.astype(code_dtype(size)) for codes, size in zip(groups_codes, shape)],
+            levels,
+            sums,
+        )
+
+    def condition_on(self, indices, compliment_indices, normalise=True, log_space=False):
+        """Splits the rows by the columns at 'indices' in one
+           vectorized pass.
+
+           The rows are sorted by (columns, compliment columns),
+           so each level of the conditioned columns is a contiguous
+           slice of the sorted rows. When 'normalise' is True, each
+           row is divided by the total of its slice.
+
+        Args:
+            indices (list): The indices of the conditioned columns.
+            compliment_indices (list): The indices of the other columns.
+            normalise (bool, optional): Normalise each slice.
+                                        Defaults to True.
+            log_space (bool, optional):
+                The values are logs, so the log of the total
+                is subtracted. Defaults to False.
+
+        Returns:
+            tuple: (groups_store, children_store, starts) where
+                   'groups_store' has the levels of conditioned columns,
+                   'children_store' has the sorted rows of the compliment
+                   columns and the group i is the slice
+                   starts[i]:starts[i + 1] of 'children_store'.
+        """
+        levels = [self.levels[i] for i in indices]
+        shape = tuple(len(level) for level in levels)
+        comp_codes = [self.codes[i] for i in compliment_indices]
+        comp_shape = tuple(len(self.levels[i]) for i in compliment_indices)
+        if len(self) == 0:
+            group_index = np.array([], dtype=np.int64)
+            groups_codes = [np.array([], dtype=np.int64) for _ in indices]
+        else:
+            group_index, groups_codes = group_codes(
+                [self.codes[i] for i in indices], shape
+            )
+        groups_size = len(groups_codes[0])
+        # Sort by the group, and inside each group by the compliment columns
+        comp_ids = combine_codes(comp_codes, comp_shape)
+        if comp_ids is None:
+            order = np.lexsort(comp_codes[::-1] + [group_index])
+        else:
+            order = np.lexsort((comp_ids, group_index))
+        sorted_group_index = group_index[order]
+        starts = np.searchsorted(sorted_group_index, np.arange(groups_size + 1))
+        values = self.values[order]
+        if normalise and log_space:
+            totals = group_logsumexp(group_index, groups_size, self.values)
+            # Like Table.normalise, the zero totals are skipped
+            totals[~np.isfinite(totals)] = 0
+            values = values - totals[sorted_group_index]
+        elif normalise:
+            totals = np.bincount(group_index, weights=self.values, minlength=groups_size)
+            # Like Table.normalise, the zero totals are skipped
+            totals[totals == 0] = 1
+            values = values / totals[sorted_group_index]
+
+        groups_store = ColumnStore(
+            [codes.astype(code_dtype(size)) for codes, size in zip(groups_codes, shape)],
+            levels,
+            np.empty(groups_size, dtype=object),
+        )
+        children_store = ColumnStore(
+            [codes[order] for codes in comp_codes],
+            [self.levels[i] for i in compliment_indices],
+            values,
+        )
+        return groups_store, children_store, starts
+
+    def join(self, right, left_indices, right_indices, compliment_indices, combine):
+        """Inner join of two stores on their common columns, which
+           is vectorized by a sort-merge join of the rows.
+
+        Args:
+            right (ColumnStore): The other store.
+            left_indices (list): The indices of common columns in this store.
+            right_indices (list): The indices of common columns in 'right',
+                                  in the same order as 'left_indices'.
+            compliment_indices (list): The indices of other columns in 'right'.
+            combine (numpy.ufunc): Combines the values of matching rows
+                                   (e.g. np.multiply).
+
+        Returns:
+            ColumnStore: A new store of this store's columns
+                         followed by the compliment columns of 'right'.
+        """
+        shape = tuple(len(self.levels[i]) for i in left_indices)
+        left_codes = [self.codes[i] for i in left_indices]
+        # Translate the right common columns to the left codes,
+        # where -1 is a level that does not exist in the left
+        right_codes = []
+        for i, j in zip(left_indices, right_indices):
+            translate = np.array(
+                [self.encode(i, level) for level in right.levels[j].tolist()],
+                dtype=np.int64,
+            )
+            right_codes.append(translate[right.codes[j]])
+        kept = np.ones(len(right), dtype=bool)
+        for codes in right_codes:
+            kept &= codes >= 0
+        kept = np.flatnonzero(kept)
+        right_codes = [codes[kept] for codes in right_codes]
+
+        left_ids = combine_codes(left_codes, shape)
+        if left_ids is None:
+            # Too many combinations, so the ids are the groups
+            # of the rows of both sides
+            group_index, _ = group_codes(
+                [
+                    np.concatenate([left, right_column])
+                    for left, right_column in zip(left_codes, right_codes)
+                ],
+                shape,
+            )
+            left_ids = group_index[: len(self)]
+            right_ids = group_index[len(self):]
+        else:
+            right_ids = combine_codes(right_codes, shape)
+        left_positions, right_positions = merge_join(left_ids, right_ids)
+        right_positions = kept[right_positions]
+
+        return ColumnStore(
+            [codes[left_positions] for codes in self.codes]
+            + [right.codes[i][right_positions] for i in compliment_indices],
+            self.levels + [right.levels[i] for i in compliment_indices],
+            combine(self.values[left_positions], right.values[right_positions]),
+        ).compact()
+
+    def compact(self):
+        """Drops the levels that no row uses (e.g. after a reduce).
+
+        Returns:
+            ColumnStore: self, when all levels are used, or a new store.
+        """
+        used = [
+            np.bincount(codes, minlength=len(levels)) > 0
+            for codes, levels in zip(self.codes, self.levels)
+        ]
+        if all(np.all(is_used) for is_used in used):
+            return self
+        codes = []
+        levels = []
+        for column_codes, column_levels, is_used in zip(self.codes, self.levels, used):
+            # new code of each used level
+            rank = np.cumsum(is_used) - 1
+            size = int(np.sum(is_used))
+            codes.append(rank[column_codes].astype(code_dtype(size)))
+            levels.append(column_levels[is_used])
+        return ColumnStore(codes, levels, self.values)
+
+    def copy(self):
+        return ColumnStore(self.codes, self.levels, self.values.copy())
+
+
+class ConditionalStore(ColumnStore):
+    """Columnar storage of a MultiTable's rows.
+
+    The keys are the levels of conditioned columns and all the
+    children rows are kept in one flat ColumnStore, sorted by
+    the conditioned levels. The child Tables are only made when
+    they are accessed and are cached in 'values'.
+    """
+
+    def __init__(self, groups_store, children_store, starts, make_child):
+        """Construct a conditional store.
+
+        Args:
+            groups_store (ColumnStore): The conditioned columns.
+            children_store (ColumnStore): The sorted children rows.
+            starts (numpy.ndarray):
+                The slice of the group i is starts[i]:starts[i + 1].
+            make_child (callable):
+                Makes a child Table from a ColumnStore.
+        """
+        super().__init__(groups_store.codes, groups_store.levels, groups_store.values)
+        self.children_store = children_store
+        self.starts = starts
+        self.make_child = make_child
+
+    def child(self, position):
+        if self.values[position] is None:
+            start, stop = self.starts[position], self.starts[position + 1]
+            store = self.children_store
+            self.values[position] = self.make_child(
+                ColumnStore(
+                    [codes[start:stop] for codes in store.codes],
+                    store.levels,
+                    # The child owns its values, so its mutations
+                    # do not change the other copies of the store
+                    store.values[start:stop].copy(),
+                )
+            )
+        return self.values[position]
+
+    def get(self, key):
+        position = self.position(key)
+        if position == -1:
+            return None
+        return self.child(position)
+
+    def set(self, key, value):
+        position = self.position(key)
+        if position == -1:
+            return False
+        self.values[position] = value
+        return True
+
+    def values_list(self):
+        return [self.child(i) for i in range(len(self))]
+
+    def copy(self):
+        return ConditionalStore(
+            ColumnStore(self.codes, self.levels, self.values.copy()),
+            self.children_store,
+            self.starts,
+            self.make_child,
+        )
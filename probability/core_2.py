@@ -1,10 +1,17 @@
-from collections import ChainMap
-from collections.abc import Mapping, Iterable
+from collections import ChainMap, OrderedDict, namedtuple
+from collections.abc import ItemsView, Iterable, KeysView, Mapping, ValuesView
+from functools import partial, wraps
 from itertools import groupby
-from operator import itemgetter
+from operator import add, itemgetter, methodcaller, mul
+import weakref
 import numpy as np
 from probability import RowKey
 from probability import TableColumns
+from probability.columnar import ColumnStore
+from probability.columnar import ConditionalStore
+from probability.columnar import group_logsumexp
+from probability.dense import DenseTable
+from probability.parallel import check_executor, map_ordered
 
 # from probability.core_1 import RowKey
 # from probability.core_1 import TableColumns
@@ -23,8 +30,120 @@ def to_dict(groupby_index, value_index):
     return make_dict
 
 
+class _TableValuesView_(ValuesView):
+    # The live view of values, which reads the columnar store
+    # (or the dictionary) at the time of iteration
+    def __iter__(self):
+        return self._mapping._iter_values_()
+
+
+class _TableItemsView_(ItemsView):
+    def __iter__(self):
+        return self._mapping._iter_items_()
+
+    def __contains__(self, item):
+        key, value = item
+        if key not in self._mapping:
+            return False
+        stored = self._mapping._value_of_(key)
+        return stored is value or stored == value
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def cached(method):
+    """Memoizes the derived Tables of a method (e.g. marginal),
+    keyed by the method and its arguments, when the cache
+    of the Table is enabled.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._cache_ is None:
+            return method(self, *args, **kwargs)
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            result = self._cache_.get(key)
+        except TypeError:  # e.g. unhashable levels
+            return method(self, *args, **kwargs)
+        if result is not None:
+            self._cache_hits_ += 1
+            self._cache_.move_to_end(key)
+            # The cached Table is never given to the caller,
+            # so its mutations do not change the next calls
+            return result._copy_()
+        self._cache_misses_ += 1
+        result = method(self, *args, **kwargs)
+        self._cache_[key] = result
+        if len(self._cache_) > self._cache_maxsize_:
+            # Drops the least recently used one
+            self._cache_.popitem(last=False)
+        return result._copy_()
+
+    return wrapper
+
+
 class Table(dict):
-    def __init__(self, rows, names=None, _internal_=False, _children_names_=None):
+    # The columnar storage of the rows. When it is not None,
+    # the rows are stored in it (instead of the dictionary).
+    _store_ = None
+    # The columnar encoding of the dictionary rows, which is
+    # cached until the rows are mutated
+    _encoded_store_ = None
+    # Two Tables are multiplied as dense factors when both
+    # have at least this fill ratio
+    dense_fill_ratio = 0.5
+    # Two Tables with common columns are joined by sorting
+    # their encoded rows (instead of hashing) when they have
+    # at least this number of rows together
+    sort_merge_min_rows = 64
+    # When True, the values are the logs, so the products are
+    # sums and the marginals are log-sum-exps
+    log_space = False
+    # The LRU cache of derived Tables, which is None until
+    # it is enabled by 'enable_cache'
+    _cache_ = None
+    _cache_maxsize_ = 0
+    _cache_hits_ = 0
+    _cache_misses_ = 0
+    # The weak references to the MultiTables that have this
+    # Table as a child, which are invalidated by its mutations
+    _parents_ = ()
+
+    def __init__(
+        self,
+        rows,
+        names=None,
+        _internal_=False,
+        _children_names_=None,
+        columnar=False,
+        log_space=False,
+    ):
+        """Construct a Table from rows.
+
+        Args:
+            rows (Mapping or Iterable):
+                A dictionary of (key:value) or an iterable
+                of (key, value) pairs.
+            names (list, optional):
+                List of names of the columns.
+                If it is not provided, it creates as 'Xn'.
+                Defaults to None.
+            columnar (bool, optional):
+                If True, the rows are stored dictionary-encoded:
+                each column as an array of integer codes plus
+                its levels, and the values in a numpy array.
+                Only numeric values are accepted.
+                Defaults to False.
+            log_space (bool, optional):
+                If True, the values are the logs of the values.
+                Defaults to False.
+        """
+        self.log_space = log_space
+        if isinstance(rows, ColumnStore):
+            self._init_columnar_(rows, names, _children_names_)
+            return
 
         if _internal_:
             # rows are dictionary for internal calls
@@ -36,6 +155,8 @@ class Table(dict):
                 super().__init__(key_values)
                 self._row_sample_ = None
                 self.names = names
+                if columnar:
+                    self._store_ = ColumnStore.from_items([], len(names))
                 if _children_names_ is None:
                     self.children_names = []
                     self.columns = TableColumns(
@@ -82,9 +203,381 @@ class Table(dict):
                     names=names, children_names=_children_names_, table=self
                 )
 
+        if columnar:
+            if self.columns.is_multitable():
+                raise ValueError("A Table of Tables cannot be columnar.")
+            self._store_ = ColumnStore.from_items(
+                super().items(), self.columns.size
+            )
+            super().clear()
+
+    def _init_columnar_(self, store, names, children_names):
+        super().__init__()
+        self._store_ = store
+        self._row_sample_ = store.key_at(0) if len(store) > 0 else None
+        if names is None:
+            names = [f"X{i+1}" for i in range(len(store.codes))]
+        if len(names) != len(store.codes):
+            raise ValueError("The length of column names and columns are not the same.")
+        self.names = names
+        self.children_names = [] if children_names is None else children_names
+        self.columns = TableColumns(
+            names=names, children_names=self.children_names, table=self
+        )
+
+    @classmethod
+    def from_columns(cls, columns, values, names=None):
+        """Construct a columnar Table from the arrays of columns.
+
+           The rows are never converted to RowKeys, so it is
+           the memory efficient way of making large Tables.
+
+        Args:
+            columns (list):
+                List of columns (lists or 1D numpy arrays).
+                The rows must be unique.
+            values (list or numpy.ndarray):
+                The numeric values of the rows.
+            names (list, optional):
+                List of names of the columns.
+                If it is not provided, it creates as 'Xn'.
+                Defaults to None.
+
+        Raises:
+            ValueError:
+                Raises when the values are not numeric, or the
+                lengths are not the same, or the rows are repeated.
+        """
+        return cls(ColumnStore.from_columns(columns, values), names)
+
+    def _copy_(self):
+        # A Table of the same rows that does not share them
+        if self._store_ is not None:
+            return Table(
+                self._store_.copy(),
+                self.names,
+                _children_names_=self.children_names,
+                log_space=self.log_space,
+            )
+        return Table(
+            dict(super().items()),
+            self.names,
+            _internal_=True,
+            _children_names_=self.children_names,
+            log_space=self.log_space,
+        )
+
+    def is_columnar(self):
+        return self._store_ is not None
+
+    def to_columnar(self):
+        """Returns a columnar copy of the Table."""
+        if self.is_columnar():
+            return Table(
+                self._store_.copy(),
+                self.names,
+                _children_names_=self.children_names,
+                log_space=self.log_space,
+            )
+        return Table(
+            dict(self), self.names, _internal_=True, columnar=True, log_space=self.log_space
+        )
+
+    def to_log(self):
+        """Returns a copy of the Table in log space, where the
+           values are the logs (log(0) is -inf).
+        """
+        if self.log_space:
+            raise ValueError("The Table is already in log space.")
+        return self._map_values_(np.log, log_space=True)
+
+    def to_linear(self):
+        """Returns a copy of the log space Table with the exponent of values."""
+        if not self.log_space:
+            raise ValueError("The Table is not in log space.")
+        return self._map_values_(np.exp, log_space=False)
+
+    def _map_values_(self, func, log_space):
+        if self.columns.is_multitable():
+            return MultiTable(
+                {k: table._map_values_(func, log_space) for k, table in self.items()},
+                self.names,
+                _children_names_=self.children_names,
+                log_space=log_space,
+            )
+        store = self._as_store_()
+        with np.errstate(divide="ignore"):
+            values = func(store.values.astype(np.float64))
+        return Table(
+            ColumnStore(store.codes, store.levels, values),
+            self.names,
+            log_space=log_space,
+        )
+
+    @classmethod
+    def from_dense(cls, dense):
+        """Construct a columnar Table from the present cells of a DenseTable."""
+        return cls(dense.to_store(), dense.names)
+
+    def to_dense(self):
+        """Convert the Table to a DenseTable, an N-dimensional
+           array over the Cartesian product of the columns' levels.
+        """
+        if self.columns.is_multitable():
+            raise ValueError("A Table of Tables cannot be dense.")
+        return DenseTable.from_store(self._as_store_(), self.names)
+
+    def lazy(self):
+        """Returns a lazy expression of the Table. The operators
+           on the expression build a plan that is optimised and
+           evaluated by its 'compute' method.
+        """
+        # The lazy module depends on this one
+        from probability.lazy import Leaf
+
+        return Leaf(self)
+
+    def fill_ratio(self):
+        """The ratio of the rows to all the combinations of the
+        columns' levels.
+        """
+        if self.columns.is_multitable() or len(self) == 0:
+            return 0.0
+        return DenseTable.fill_ratio_of(self._as_store_())
+
+    def _is_dense_product_(self, right):
+        try:
+            return (
+                self.fill_ratio() >= self.dense_fill_ratio
+                and right.fill_ratio() >= right.dense_fill_ratio
+            )
+        except ValueError:  # e.g. the values are not numeric
+            return False
+
+    def _is_sort_merge_product_(self, right):
+        # The sort-merge join pays for encoding the rows, so
+        # it is only used for large enough numeric Tables
+        if len(self) + len(right) < self.sort_merge_min_rows:
+            return False
+        try:
+            self._as_store_()
+            right._as_store_()
+        except ValueError:  # e.g. the values are not numeric
+            return False
+        return True
+
+    def _as_store_(self):
+        # The columnar store of the rows, which is encoded
+        # from the dictionary for dictionary stored Tables
+        if self._store_ is not None:
+            return self._store_
+        if self._encoded_store_ is None:
+            self._encoded_store_ = ColumnStore.from_items(
+                super().items(), self.columns.size
+            )
+        return self._encoded_store_
+
+    def _to_dict_storage_(self):
+        # Moves the rows from the columnar store to the dictionary
+        if self._store_ is not None:
+            super().update(self._store_.items())
+            self._store_ = None
+
+    def _invalidate_(self):
+        # Called on every mutation of the rows
+        self._encoded_store_ = None
+        if self._cache_ is not None:
+            self._cache_.clear()
+        for parent_ref in self._parents_:
+            parent = parent_ref()
+            if parent is not None:
+                parent._invalidate_()
+
+    def _adopt_(self, child):
+        # Registers this Table as a parent of the child
+        if not isinstance(child, Table):
+            return child
+        parents = [ref for ref in child._parents_ if ref() is not None]
+        if not any(ref() is self for ref in parents):
+            parents.append(weakref.ref(self))
+        child._parents_ = tuple(parents)
+        return child
+
+    def __getstate__(self):
+        # The parents are weak references, which cannot be pickled
+        state = self.__dict__.copy()
+        state.pop("_parents_", None)
+        return state
+
+    def enable_cache(self, maxsize=128):
+        """Enables the LRU cache of marginal, condition_on and
+           reduce results. The cache is cleared when the Table (or
+           a child of a MultiTable) is mutated. Each call returns
+           a copy of the cached Table, so it can be mutated.
+
+        Args:
+            maxsize (int, optional):
+                The maximum number of cached Tables.
+                Defaults to 128.
+
+        Raises:
+            ValueError: Raises when maxsize is not positive.
+        """
+        if maxsize < 1:
+            raise ValueError("The cache size must be positive.")
+        if self._cache_ is None:
+            self._cache_ = OrderedDict()
+        self._cache_maxsize_ = maxsize
+        while len(self._cache_) > maxsize:
+            self._cache_.popitem(last=False)
+
+    def disable_cache(self):
+        """Disables the cache and drops the cached Tables."""
+        self._cache_ = None
+        self._cache_maxsize_ = 0
+
+    def cache_info(self):
+        """The statistics of the cache.
+
+        Returns:
+            CacheInfo: (hits, misses, maxsize, currsize)
+        """
+        return CacheInfo(
+            self._cache_hits_,
+            self._cache_misses_,
+            self._cache_maxsize_,
+            0 if self._cache_ is None else len(self._cache_),
+        )
+
     def __missing__(self, key):
         return None
 
+    def __len__(self):
+        if self._store_ is not None:
+            return len(self._store_)
+        return super().__len__()
+
+    def __iter__(self):
+        if self._store_ is not None:
+            return self._store_.keys()
+        return super().__iter__()
+
+    def __contains__(self, key):
+        if self._store_ is not None:
+            return isinstance(key, tuple) and self._store_.position(key) != -1
+        return super().__contains__(key)
+
+    def keys(self):
+        if self._store_ is not None:
+            return KeysView(self)
+        return super().keys()
+
+    def values(self):
+        if self._store_ is not None:
+            return _TableValuesView_(self)
+        return super().values()
+
+    def items(self):
+        if self._store_ is not None:
+            return _TableItemsView_(self)
+        return super().items()
+
+    def _iter_values_(self):
+        if self._store_ is not None:
+            return iter(self._store_.values_list())
+        return iter(super().values())
+
+    def _iter_items_(self):
+        if self._store_ is not None:
+            return iter(self._store_.items())
+        return iter(super().items())
+
+    def __reversed__(self):
+        if self._store_ is not None:
+            return reversed(list(self._store_.keys()))
+        return super().__reversed__()
+
+    def copy(self):
+        if self._store_ is not None:
+            return dict(self._store_.items())
+        return super().copy()
+
+    def __setitem__(self, key, value):
+        self._invalidate_()
+        if self._store_ is not None:
+            if self._store_.set(key, value):
+                return
+            self._to_dict_storage_()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._to_dict_storage_()
+        self._invalidate_()
+        super().__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self._to_dict_storage_()
+        self._invalidate_()
+        super().update(*args, **kwargs)
+
+    def pop(self, *args):
+        self._to_dict_storage_()
+        self._invalidate_()
+        return super().pop(*args)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self._value_of_(key)
+        self[key] = default
+        return default
+
+    def popitem(self):
+        self._to_dict_storage_()
+        self._invalidate_()
+        return super().popitem()
+
+    def clear(self):
+        self._invalidate_()
+        if self._store_ is not None:
+            self._store_ = ColumnStore.from_items([], self.columns.size)
+        super().clear()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __or__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        rows = dict(self.items())
+        rows.update(other)
+        return rows
+
+    def __ror__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        rows = dict(other)
+        rows.update(self.items())
+        return rows
+
+    def __eq__(self, other):
+        if self._store_ is None and getattr(other, "_store_", None) is None:
+            return super().__eq__(other)
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __repr__(self):
+        if self._store_ is not None:
+            return repr(dict(self._store_.items()))
+        return super().__repr__()
+
     def __getitem__(self, args):
         """Override the dict by converting the
         comma separated arguments to RowKey
@@ -93,12 +586,17 @@ class Table(dict):
         # We are sure there is not any inheritance
         # to deal with
         if type(args) is RowKey:
-            return super().__getitem__(args)
+            return self._value_of_(args)
 
         if self.columns.size == 1:
             key = self.columns.to_key(args)
         else:
             key = self.columns.to_key(*args)
+        return self._value_of_(key)
+
+    def _value_of_(self, key):
+        if self._store_ is not None:
+            return self._store_.get(key)
         return super().__getitem__(key)
 
     def _check_keys_consistencies_(self):
@@ -146,6 +644,8 @@ class Table(dict):
         """
         if not isinstance(right, Table):
             raise ValueError("The 'right' argument must be a Table.")
+        # In log space, the values are summed
+        combine = add if self.log_space else mul
 
         # Find common variables
         # reorder commons based on their order in left_common_indices
@@ -157,7 +657,7 @@ class Table(dict):
             names = np.r_[self.names, right.names]
             return (
                 {
-                    k1 + k2: v1 * v2
+                    k1 + k2: combine(v1, v2)
                     for k1, v1 in self.items()
                     for k2, v2 in right.items()
                 },
@@ -181,6 +681,20 @@ class Table(dict):
         right_complement_indices = [
             i for i, name in enumerate(right.names) if name not in commons
         ]
+        # names are the combination of [left_names, right_compelements_names]
+        combined_names = np.r_[
+            self.names,
+            [name for name in right.names if name not in commons],
+        ]
+        if self._is_sort_merge_product_(right):
+            store = self._as_store_().join(
+                right._as_store_(),
+                left_common_indices,
+                right_common_indices,
+                right_complement_indices,
+                np.add if self.log_space else np.multiply,
+            )
+            return (store, combined_names)
         # Methods to split the keys
 
         def l_comm(key):
@@ -219,15 +733,28 @@ class Table(dict):
                 for right_comp, right_value in right_lookup[comm]:
                     # prodcut_dict values must be multiplied.
                     # prodcut_dict keys are the combination: (left, right_compliment).
-                    prodcut_dict[left_key + right_comp] = left_value * right_value
-
-        # names are the combination of [left_names, right_compelements_names]
-        combined_names = np.r_[
-            self.names,
-            [name for name in right.names if name not in commons],
-        ]
+                    prodcut_dict[left_key + right_comp] = combine(
+                        left_value, right_value
+                    )
         return (prodcut_dict, combined_names)
 
+    def _grouped_rows_(self, indices, rows=None):
+        # The dictionary of (columns at indices: sum of values),
+        # for the values that cannot be stored in the columnar
+        # store (e.g. Fraction or Decimal)
+        rows = self.items() if rows is None else rows
+        arr_gen = (
+            (RowKey(tuple(key[i] for i in indices)), value) for key, value in rows
+        )
+        # Before calling the groupby, we have to sort the generator
+        # by the tuple of columns (index zero in itemgetter)
+        sorted_arr = sorted(arr_gen, key=itemgetter(0))
+        return {
+            k: sum([item[1] for item in g])
+            for k, g in groupby(sorted_arr, key=itemgetter(0))
+        }
+
+    @cached
     def marginal(self, *args, normalise=True):
         """Marginal of (group by) the Table over a set of columns.
            P(X, Y, Z) -> P(X, Y) or P(X, Z) or P(Y, Z)
@@ -250,35 +777,57 @@ class Table(dict):
 
         # split columns to indices and comp_indices
         columns_info = self.columns.split_columns(*args)
-        #
-        # Convert the key:values to 2D numpy array
-        # the array rows are (row, value)
-        arr = self.to_2d_array()
-        # filter the compliment columns
-        filtered_arr = np.c_[arr[:, columns_info.complimnet_indices], arr[:, -1]]
-        # split the 2d array's rows to a tuple of
-        # compliment columns (row[comp_indices])
-        # and count row[-1]
-        arr_gen = ((RowKey(row[:-1]), row[-1]) for row in filtered_arr)
-        # Before calling the groupby, we have to sort the generator
-        # by the tuple of compliment columns (index zero in itemgetter)
-        sorted_arr = sorted(arr_gen, key=itemgetter(0))
-        # since the values in each 'group' are
-        # (compliment columns, value)
-        # here we group by 'compliment columns' and apply
-        # the sum on the value. Then the dictionary of
-        # compliment columns:op_of_values
-        # is an acceptable argument for Table
-        grouped_arr = {
-            k: sum([item[1] for item in g])
-            for k, g in groupby(sorted_arr, key=itemgetter(0))
-        }
-        table = Table(grouped_arr, columns_info.complimnet_names, _internal_=True)
+        try:
+            store = self._as_store_()
+        except ValueError:  # e.g. Fraction or Decimal values
+            table = Table(
+                self._grouped_rows_(columns_info.complimnet_indices),
+                columns_info.complimnet_names,
+                _internal_=True,
+            )
+        else:
+            # Group by the compliment columns and sum the values
+            # in one vectorized pass over the columnar store
+            table = Table(
+                store.marginal(columns_info.complimnet_indices, self.log_space),
+                columns_info.complimnet_names,
+                log_space=self.log_space,
+            )
         if normalise:
             table.normalise()
 
         return table
 
+    def _dict_condition_on_(self, columns_info, normalise):
+        # The conditionals of the values that cannot be stored
+        # in the columnar store (e.g. Fraction or Decimal)
+        arr_gen = (
+            (
+                RowKey(tuple(key[i] for i in columns_info.indices)),
+                RowKey(tuple(key[i] for i in columns_info.complimnet_indices)),
+                value,
+            )
+            for key, value in self.items()
+        )
+        # Sort by the tuple of columns and then by the compliment
+        # columns, so the children are in the order of keys
+        sorted_arr = sorted(arr_gen, key=itemgetter(0, 1))
+        table = MultiTable(
+            {
+                key: Table(
+                    {item[1]: item[2] for item in group},
+                    columns_info.complimnet_names,
+                    _internal_=True,
+                )
+                for key, group in groupby(sorted_arr, key=itemgetter(0))
+            },
+            columns_info.indices_names,
+        )
+        if normalise:
+            table.normalise()
+        return table
+
+    @cached
     def condition_on(self, *args, normalise=True):
         """Creates the conditional based on
            the provided names of columns.
@@ -303,57 +852,33 @@ class Table(dict):
             raise ValueError("Cannot condition on all columns.")
         # split columns to indices and comp_indices
         columns_info = self.columns.split_columns(*args)
-        # Convert the key:value to 2D numpy array
-        # the array rows are (rows, value)
-        arr = self.to_2d_array()
-        # divide the 2d array's rows to a tuple of columns,
-        # (row[indices]), compliment columns (row[comp_indices])
-        # and values row[-1]
-        arr_gen = (
-            (
-                RowKey(row[columns_info.indices]),
-                RowKey(row[columns_info.complimnet_indices]),
-                row[-1],
-            )
-            for row in arr
+        try:
+            store = self._as_store_()
+        except ValueError:  # e.g. Fraction or Decimal values
+            return self._dict_condition_on_(columns_info, normalise)
+        # All the conditionals are computed in one vectorized pass
+        # over the columnar store; the child Tables are made only
+        # when they are accessed
+        groups_store, children_store, starts = store.condition_on(
+            columns_info.indices,
+            columns_info.complimnet_indices,
+            normalise,
+            self.log_space,
         )
-        # Before calling the groupby, we have to sort the generator
-        # by the tuple of columns (index zero in itemgetter)
-        # And since later we will call the group by on group,
-        # for each key we do the inner sort too (index one in itemgetter)
-        sorted_arr = sorted(arr_gen, key=itemgetter(0, 1))
-        # This method convert a group to a dictionary
-
-        def make_dict(group):
-            # since the values in 'group' argument are
-            # (columns, compliment columns, value)
-            # here we group by 'compliment columns' and sum
-            # the values.
-            return {
-                k: sum([item[2] for item in g2])
-                for k, g2 in groupby(group, key=itemgetter(1))
-            }
-
-        # For each group (belongs a unique values), we create
-        # a dictionary in a dictionary comprehension
-        grouped_arr = {
-            k: make_dict(g) for k, g in groupby(sorted_arr, key=itemgetter(0))
-        }
-        # The above dictionary is dictionary of dictionaries
-        # # the first set of names is for parent dictionary
-        # and the second set is for children
-        table = MultiTable(
-            {
-                key: Table(values, columns_info.complimnet_names, _internal_=True)
-                for key, values in grouped_arr.items()
-            },
+        children_names = columns_info.complimnet_names
+        return MultiTable(
+            ConditionalStore(
+                groups_store,
+                children_store,
+                starts,
+                partial(Table, names=children_names, log_space=self.log_space),
+            ),
             columns_info.indices_names,
+            _children_names_=children_names,
+            log_space=self.log_space,
         )
-        if normalise:
-            table.normalise()
-
-        return table
 
+    @cached
     def reduce(self, **kwargs):
         """Reduce the Table by one or more columns.
            P(X, Y) -> P(X = x, Y) or  P(X,  Y = y)
@@ -375,43 +900,31 @@ class Table(dict):
         if len(columns) == self.columns.size:
             raise ValueError("Cannot reduce on all column names.")
         columns_info = self.columns.split_columns(*columns)
-        values = np.array([value for _, value in kwargs.items()], dtype=np.object)
-        #
-        # Convert the key:values to 2D numpy array
-        # the array rows are (keys, value)
-        arr_counter = self.to_2d_array()
-        # filter the 2d array rows by provided values of the reduce
-        # conditioned_arr is a boolean one, and filtering happens
-        # in the second line
-        conditioned_arr = np.all(arr_counter[:, columns_info.indices] == values, axis=1)
-        sliced_arr = arr_counter[conditioned_arr, :]
-        # filter the 2d array columns (the compliment columns)
-        # plus the value column (which is the last column)
-        sliced_arr = sliced_arr[:, columns_info.complimnet_indices + [-1]]
-        # divide the 2d array's rows to a tuple of columns
-        # and value
-        # So, we make a generator that divide the rows to the tuple of
-        # columns (tuple(row[:-1]) and value (row[-1])
-        arr_gen = ((RowKey(row[:-1]), row[-1]) for row in sliced_arr)
-        # Before calling the groupby, we have to sort the generator
-        # by the tuple of column (index zero in itemgetter)
-        sorted_slice_arr = sorted(arr_gen, key=itemgetter(0))
-        # group by the filtered columns (compliment
-        # columns) and sum the value per key
-        # Note that the 'itemgetter' read the first index which
-        # is the tuple of compliment columns
-        return Table(
-            {
-                k: sum([item[1] for item in g])
-                for k, g in groupby(sorted_slice_arr, key=itemgetter(0))
-            },
-            columns_info.complimnet_names,
-            _internal_=True,
+        indices = [self.columns.index_of(name) for name in columns]
+        try:
+            store = self._as_store_()
+        except ValueError:  # e.g. Fraction or Decimal values
+            selected = (
+                (key, value)
+                for key, value in self.items()
+                if all(key[i] == level for i, level in zip(indices, kwargs.values()))
+            )
+            return Table(
+                self._grouped_rows_(columns_info.complimnet_indices, selected),
+                columns_info.complimnet_names,
+                _internal_=True,
+            )
+        # The matching rows are found by the inverted indices of
+        # the columns, which are built once and reused by the
+        # next calls
+        store = store.reduce(
+            indices, list(kwargs.values()), columns_info.complimnet_indices
         )
+        return Table(store, columns_info.complimnet_names, log_space=self.log_space)
 
     def get(self, *args, **kwargs):
         key = self.columns.to_key(*args, **kwargs)
-        return super().__getitem__(key)
+        return self._value_of_(key)
 
     def to_table(self, sort=False, value_title=""):
 
@@ -485,15 +998,20 @@ class Table(dict):
         #  Algorithm
         #
 
+        if self.log_space != that.log_space:
+            raise ValueError("Two adding Table must be both in log space or not.")
+
         def add_internal(this, that, names):
             if that is not None:
                 for key in that.keys():
-                    if key in this:
-                        this[key] += that[key]
-                    else:
+                    if key not in this:
                         this[key] = that[key]
+                    elif self.log_space:
+                        this[key] = np.logaddexp(this[key], that[key])
+                    else:
+                        this[key] += that[key]
 
-            return Table(this, names=names, _internal_=True)
+            return Table(this, names=names, _internal_=True, log_space=self.log_space)
 
         ############################################
         # MultiTable handeling
@@ -505,25 +1023,50 @@ class Table(dict):
                 },
                 self.names,
                 _internal_=True,
+                log_space=self.log_space,
             )
 
         return add_internal(self.copy(), that, self.names)
 
     def total(self):
+        """The sum of values, or the log of the sum in log space."""
         if self.columns.is_multitable():
             return {k: table.total() for k, table in self.items()}
 
+        if self.log_space:
+            if len(self) == 0:
+                return -np.inf
+            values = self._as_store_().values
+            return group_logsumexp(
+                np.zeros(len(values), dtype=np.int64), 1, values
+            )[0].item()
+
+        if self._store_ is not None:
+            return self._store_.values.sum().item()
+
         return sum(self.values())
 
     def normalise(self):
+        self._invalidate_()
         if self.columns.is_multitable():
-            for k, total in self.total().items():
-                if total == 0:
-                    continue
-                table = self[k]
-                for k2 in table:
-                    table[k2] /= total
+            for k, table in self.items():
+                table.normalise()
+
+        elif self.log_space:
+            # The log of the total is subtracted
+            total = self.total()
+            if not np.isfinite(total):
+                return
+            if self._store_ is not None:
+                self._store_.values = self._store_.values - total
+            else:
+                for k, value in list(self.items()):
+                    self[k] = value - total
 
+        elif self._store_ is not None:
+            total = self.total()
+            if total != 0:
+                self._store_.values = self._store_.values / total
         else:
             total = self.total()
             if total != 0:
@@ -546,9 +1089,14 @@ class Table(dict):
 
         if not isinstance(right, Table):
             raise ValueError("The 'right' argument must be a 'Table'.")
+        if self.log_space != right.log_space:
+            raise ValueError("Two Tables must be both in log space or not.")
+
+        if not self.log_space and self._is_dense_product_(right):
+            return Table.from_dense(self.to_dense() * right.to_dense())
 
         (rows, names) = self._product_(right)
-        return Table(rows, names, _internal_=True)
+        return Table(rows, names, _internal_=True, log_space=self.log_space)
 
     def __rmul__(self, left):
         """Multiplies a table with this one.
@@ -565,9 +1113,14 @@ class Table(dict):
         """
         if not isinstance(left, Table):
             raise ValueError("The 'right' argument must be a 'Table'.")
+        if self.log_space != left.log_space:
+            raise ValueError("Two Tables must be both in log space or not.")
+
+        if not self.log_space and left._is_dense_product_(self):
+            return Table.from_dense(left.to_dense() * self.to_dense())
 
         (rows, names) = left._product_(self)
-        return Table(rows, names, _internal_=True)
+        return Table(rows, names, _internal_=True, log_space=self.log_space)
 
     def __add__(self, right):
         return self.add(right)
@@ -577,14 +1130,16 @@ def prod_right(table, key2, value2):
     # Product a table with kay and value
     if value2 is None:
         return {}
-    return {key1 + key2: value1 * value2 for key1, value1 in table.items()}
+    combine = add if table.log_space else mul
+    return {key1 + key2: combine(value1, value2) for key1, value1 in table.items()}
 
 
 def prod_left(table, key2, value2):
     # Product a table with kay and value
     if value2 is None:
         return {}
-    return {key2 + key1: value1 * value2 for key1, value1 in table.items()}
+    combine = add if table.log_space else mul
+    return {key2 + key1: combine(value1, value2) for key1, value1 in table.items()}
 
 
 def multi_table_to_table_product(left, right, all_ordered_names):
@@ -603,6 +1158,7 @@ def multi_table_to_table_product(left, right, all_ordered_names):
             ),
             left.columns.children_names + left.names,
             _internal_=True,
+            log_space=left.log_space,
         )
     # Case P(X, Y | Z, W) * P(Z) -> P(X, Y, Z | W)
     for name in right.names:
@@ -640,6 +1196,7 @@ def multi_table_to_table_product(left, right, all_ordered_names):
             ),
             reduced_names,
             _children_names_=children_names,
+            log_space=left.log_space,
         )
 
     return MultiTable(
@@ -649,6 +1206,7 @@ def multi_table_to_table_product(left, right, all_ordered_names):
         },
         reduced_names,
         _children_names_=children_names,
+        log_space=left.log_space,
     )
 
 
@@ -668,6 +1226,7 @@ def table_to_multi_table_product(left, right, all_ordered_names):
             ),
             right.names + right.columns.children_names,
             _internal_=True,
+            log_space=left.log_space,
         )
     # Case P(Z) * P(X, Y | Z, W) -> P(Z, X, Y | W)
     for name in left.names:
@@ -705,6 +1264,7 @@ def table_to_multi_table_product(left, right, all_ordered_names):
             ),
             reduced_names,
             _children_names_=children_names,
+            log_space=left.log_space,
         )
 
     return MultiTable(
@@ -714,6 +1274,7 @@ def table_to_multi_table_product(left, right, all_ordered_names):
         },
         reduced_names,
         _children_names_=children_names,
+        log_space=left.log_space,
     )
 
 
@@ -750,6 +1311,7 @@ def multi_table_to_multi_table_product(table_main, table_side, all_ordered_names
             ChainMap(*[prod2(key1, table1) for key1, table1 in table_main.items()]),
             reduced_names,
             _children_names_=children_names,
+            log_space=table_main.log_space,
         )
 
     return MultiTable(
@@ -760,6 +1322,7 @@ def multi_table_to_multi_table_product(table_main, table_side, all_ordered_names
         },
         reduced_names,
         _children_names_=children_names,
+        log_space=table_main.log_space,
     )
 
 
@@ -787,6 +1350,8 @@ def multi_table_product(left, right):
     Returns:
         [type]: [description]
     """
+    if left.log_space != right.log_space:
+        raise ValueError("Two Tables must be both in log space or not.")
     # Cases:
     # P(X, Y | Z) * P(Z) -> P(X, Y, Z)
     # P(X, Y | Z, W) * P(Z) -> P(X, Y, Z | W)
@@ -856,12 +1421,149 @@ def multi_table_product(left, right):
         raise ValueError("Columns and conditional names mismatch.")
 
 
+class _ChildFactory_:
+    """Wraps the child factory of a ConditionalStore, so the
+    lazily made children invalidate their MultiTable.
+    """
+
+    def __init__(self, make_child, parent):
+        self.make_child = make_child
+        self.parent_ref = weakref.ref(parent)
+
+    def __call__(self, store):
+        child = self.make_child(store)
+        parent = None if self.parent_ref is None else self.parent_ref()
+        if parent is not None:
+            parent._adopt_(child)
+        return child
+
+    def __getstate__(self):
+        # The weak reference cannot be pickled (e.g. for the
+        # process pools) and the copies have no parent
+        return {"make_child": self.make_child, "parent_ref": None}
+
+
 class MultiTable(Table):
-    def __init__(self, rows, names=None, _children_names_=None):
+    # The executor of the children operations, which
+    # is None for a sequential loop
+    _executor_ = None
+    _executor_batch_size_ = None
+    _executor_max_workers_ = None
+
+    def __init__(self, rows, names=None, _children_names_=None, log_space=False):
         super().__init__(
-            rows, names, _internal_=True, _children_names_=_children_names_
+            rows,
+            names,
+            _internal_=True,
+            _children_names_=_children_names_,
+            log_space=log_space,
+        )
+        self._adopt_children_()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._adopt_children_()
+
+    def _adopt_children_(self):
+        if isinstance(self._store_, ConditionalStore):
+            make_child = getattr(
+                self._store_.make_child, "make_child", self._store_.make_child
+            )
+            self._store_.make_child = _ChildFactory_(make_child, self)
+            children = self._store_.values
+        else:
+            children = dict.values(self)
+        for child in children:
+            self._adopt_(child)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, self._adopt_(value))
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        for child in dict.values(self):
+            self._adopt_(child)
+
+    def _copy_(self):
+        if isinstance(self._store_, ConditionalStore):
+            store = self._store_
+            # The children that are not made yet are made
+            # from the (not shared) slices of the copy
+            children = np.empty(len(store), dtype=object)
+            children[:] = [
+                None if child is None else child._copy_() for child in store.values
+            ]
+            rows = ConditionalStore(
+                ColumnStore(store.codes, store.levels, children),
+                store.children_store,
+                store.starts,
+                getattr(store.make_child, "make_child", store.make_child),
+            )
+        else:
+            rows = {
+                key: child._copy_() if isinstance(child, Table) else child
+                for key, child in dict.items(self)
+            }
+        return self._with_executor_(
+            MultiTable(
+                rows,
+                self.names,
+                _children_names_=self.children_names,
+                log_space=self.log_space,
+            )
         )
 
+    def set_executor(self, executor=None, batch_size=None, max_workers=None):
+        """Sets the executor that runs the operations (marginal,
+           condition_on and reduce) of the children in parallel.
+           The resulting MultiTables use the same executor.
+
+        Args:
+            executor (str or Executor, optional):
+                "thread", "process", an instance of
+                concurrent.futures.Executor or None for the
+                sequential loop. Defaults to None.
+            batch_size (int, optional):
+                Number of children in each task. Defaults to None,
+                which is four tasks per worker.
+            max_workers (int, optional): Number of workers of the
+                created executors. Defaults to None.
+
+        Raises:
+            ValueError: Raises when the executor is not known or
+                        the batch size is less than one.
+        """
+        check_executor(executor)
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("The batch size must be at least one.")
+        self._executor_ = executor
+        self._executor_batch_size_ = batch_size
+        self._executor_max_workers_ = max_workers
+        # The cached results may have been made by another executor
+        self._invalidate_()
+
+    def _map_children_(self, method, *args, **kwargs):
+        # Calls the method on each child, in the order of children
+        children = list(self.items())
+        results = map_ordered(
+            methodcaller(method, *args, **kwargs),
+            [table for _, table in children],
+            self._executor_,
+            self._executor_batch_size_,
+            self._executor_max_workers_,
+        )
+        return [(key, result) for (key, _), result in zip(children, results)]
+
+    def _with_executor_(self, table):
+        if self._executor_ is not None:
+            table.set_executor(
+                self._executor_,
+                self._executor_batch_size_,
+                self._executor_max_workers_,
+            )
+        return table
+
+    @cached
     def marginal(self, *args, normalise=True):
         """[summary]
            P(X, Y | Z) -> P(X | Z) or P(Y | Z)
@@ -880,12 +1582,10 @@ class MultiTable(Table):
                 raise ValueError(f"Cannot marginalize on conditioned columns:'{name}'.")
 
         table = Table(
-            {
-                k: table.marginal(*args, normalise=normalise)
-                for k, table in self.items()
-            },
+            dict(self._map_children_("marginal", *args, normalise=normalise)),
             self.names,
             _internal_=True,
+            log_space=self.log_space,
         )
 
         if normalise:
@@ -893,6 +1593,7 @@ class MultiTable(Table):
 
         return table
 
+    @cached
     def condition_on(self, *args, normalise=True):
         """Creates the conditional based on
            the provided names of columns.
@@ -915,23 +1616,26 @@ class MultiTable(Table):
         for name in args:
             if name in self.names:
                 raise ValueError(f"Cannot condition on conditioned columns:'{name}'.")
-        conditioned_children = (
-            (k, table.condition_on(*args, normalise=normalise))
-            for k, table in self.items()
+        conditioned_children = self._map_children_(
+            "condition_on", *args, normalise=normalise
         )
 
-        return MultiTable(
-            {
-                key2 + key1: table
-                for key1, key2_table in conditioned_children
-                for key2, table in key2_table.items()
-            },
-            # It results in: P(X, Y | Z) -> P(X | Y, Z)
-            # inversing the order turns it P(X, Y | Z) -> P(X | Z, Y)
-            # Maybe more controls is needed here
-            list(args) + self.names,
+        return self._with_executor_(
+            MultiTable(
+                {
+                    key2 + key1: table
+                    for key1, key2_table in conditioned_children
+                    for key2, table in key2_table.items()
+                },
+                # It results in: P(X, Y | Z) -> P(X | Y, Z)
+                # inversing the order turns it P(X, Y | Z) -> P(X | Z, Y)
+                # Maybe more controls is needed here
+                list(args) + self.names,
+                log_space=self.log_space,
+            )
         )
 
+    @cached
     def reduce(self, **kwargs):
         """Reduce the Table by one or more columns.
             P(X, Y | Z) -> P(X = x, Y | Z) or  P(X,  Y = y | Z)
@@ -948,9 +1652,12 @@ class MultiTable(Table):
         Returns:
             [Table]: A reduce Table.
         """
-        return MultiTable(
-            {k: table.reduce(**kwargs) for k, table in self.items()},
-            self.names,
+        return self._with_executor_(
+            MultiTable(
+                dict(self._map_children_("reduce", **kwargs)),
+                self.names,
+                log_space=self.log_space,
+            )
         )
 
     def __mul__(self, right):
@@ -0,0 +1,218 @@
+from math import prod
+import numpy as np
+from probability.columnar import ColumnStore
+from probability.columnar import code_dtype
+
+
+class DenseTable:
+    """A factor that is stored as an N-dimensional array over the
+    Cartesian product of its columns' levels.
+
+    Members:
+        array (numpy.ndarray): The values, one axis per column.
+        levels (list): List of 1D object arrays, one per axis.
+        names (list): The names of the columns (axes).
+        present (numpy.ndarray):
+            A boolean array that marks the cells that are
+            rows of the Table (the other cells are zero).
+    """
+
+    def __init__(self, array, levels, names, present=None):
+        self.array = array
+        self.levels = list(levels)
+        self.names = list(names)
+        if present is None:
+            present = np.ones(array.shape, dtype=bool)
+        self.present = present
+
+    @classmethod
+    def from_store(cls, store, names):
+        """Construct a DenseTable from the columnar store of a Table.
+
+        Args:
+            store (ColumnStore): The rows of the Table.
+            names (list): The names of the columns.
+        """
+        store = store.compact()
+        shape = store.shape
+        array = np.zeros(shape, dtype=store.values.dtype)
+        present = np.zeros(shape, dtype=bool)
+        array[tuple(store.codes)] = store.values
+        present[tuple(store.codes)] = True
+        return cls(array, store.levels, names, present)
+
+    @staticmethod
+    def fill_ratio_of(store):
+        """The ratio of the rows to all the combinations of levels."""
+        if len(store) == 0:
+            return 0.0
+        return len(store) / prod(store.compact().shape)
+
+    def to_store(self):
+        """Convert the present cells to a ColumnStore, sorted by keys."""
+        codes = np.nonzero(self.present)
+        return ColumnStore(
+            [
+                axis_codes.astype(code_dtype(len(levels)))
+                for axis_codes, levels in zip(codes, self.levels)
+            ],
+            self.levels,
+            self.array[self.present],
+        )
+
+    def fill_ratio(self):
+        if self.present.size == 0:
+            return 0.0
+        return np.count_nonzero(self.present) / self.present.size
+
+    def _axis_of_(self, name):
+        if name not in self.names:
+            raise ValueError(f"Column name: '{name}' is not defined.")
+        return self.names.index(name)
+
+    def product(self, right):
+        """Multiplies two dense factors by np.einsum.
+           P(X, Y) * P(Y, Z) -> P(X, Y, Z)
+
+           The common columns are aligned on their common levels
+           (inner join), and the order of columns is the left ones
+           followed by the right compliment ones.
+
+        Args:
+            right (DenseTable): The other factor.
+
+        Raises:
+            ValueError: Raises when the right is not a DenseTable.
+
+        Returns:
+            DenseTable: The product.
+        """
+        if not isinstance(right, DenseTable):
+            raise ValueError("The 'right' argument must be a 'DenseTable'.")
+
+        names = self.names + [name for name in right.names if name not in self.names]
+        if len(names) > 52:
+            raise ValueError("DenseTable product supports up to 52 columns.")
+        left_array, left_present = self.array, self.present
+        right_array, right_present = right.array, right.present
+        levels = list(self.levels) + [
+            right.levels[i] for i, name in enumerate(right.names) if name not in self.names
+        ]
+        for name in self.names:
+            if name not in right.names:
+                continue
+            left_axis = self.names.index(name)
+            right_axis = right.names.index(name)
+            left_levels = self.levels[left_axis].tolist()
+            right_lookup = {
+                level: i for i, level in enumerate(right.levels[right_axis].tolist())
+            }
+            # Keep the common levels in the left order
+            left_indices = [
+                i for i, level in enumerate(left_levels) if level in right_lookup
+            ]
+            right_indices = [right_lookup[left_levels[i]] for i in left_indices]
+            left_array = np.take(left_array, left_indices, axis=left_axis)
+            left_present = np.take(left_present, left_indices, axis=left_axis)
+            right_array = np.take(right_array, right_indices, axis=right_axis)
+            right_present = np.take(right_present, right_indices, axis=right_axis)
+            levels[left_axis] = self.levels[left_axis][left_indices]
+
+        left_axes = list(range(len(self.names)))
+        right_axes = [names.index(name) for name in right.names]
+        out_axes = list(range(len(names)))
+        return DenseTable(
+            np.einsum(left_array, left_axes, right_array, right_axes, out_axes),
+            levels,
+            names,
+            np.einsum(left_present, left_axes, right_present, right_axes, out_axes),
+        )
+
+    def marginal(self, *args, normalise=True):
+        """Marginal of the factor by summing over the axes of 'args'.
+           P(X, Y, Z) -> P(X, Y) or P(X, Z) or P(Y, Z)
+
+        Args:
+            args (list): List of column names to marginalised.
+
+        Raises:
+            ValueError:
+                Raises when one of the column names is not
+                defined or requested for all column names.
+
+        Returns:
+            DenseTable: The marginal factor.
+        """
+        if len(args) == len(self.names):
+            raise ValueError("Cannot marginalize on all column names.")
+        axes = tuple(self._axis_of_(name) for name in args)
+        dense = DenseTable(
+            self.array.sum(axis=axes),
+            [levels for i, levels in enumerate(self.levels) if i not in axes],
+            [name for i, name in enumerate(self.names) if i not in axes],
+            self.present.any(axis=axes),
+        )
+        if normalise:
+            dense.normalise()
+        return dense
+
+    def reduce(self, **kwargs):
+        """Reduce the factor by slicing the axes of the columns.
+           P(X, Y) -> P(X = x, Y) or  P(X,  Y = y)
+
+        Args:
+            kwargs (dict):
+                A dictionary that its 'key' is the name
+                of the column and its 'value'
+                is the value that must be reduced by.
+
+        Raises:
+            ValueError:
+                Raises when one of the column names is not
+                defined or requested for all column names.
+
+        Returns:
+            DenseTable: A reduced factor.
+        """
+        if len(kwargs) == len(self.names):
+            raise ValueError("Cannot reduce on all column names.")
+        index = [slice(None)] * len(self.names)
+        is_missing = False
+        for name, level in kwargs.items():
+            axis = self._axis_of_(name)
+            levels = self.levels[axis].tolist()
+            if level in levels:
+                index[axis] = levels.index(level)
+            else:
+                is_missing = True
+                index[axis] = 0
+        index = tuple(index)
+        names = [name for name in self.names if name not in kwargs]
+        levels = [levels for name, levels in zip(self.names, self.levels) if name in names]
+        if is_missing:
+            shape = tuple(len(level) for level in levels)
+            return DenseTable(
+                np.zeros(shape, dtype=self.array.dtype),
+                levels,
+                names,
+                np.zeros(shape, dtype=bool),
+            )
+        return DenseTable(
+            self.array[index].copy(), levels, names, self.present[index].copy()
+        )
+
+    def total(self):
+        return self.array.sum().item()
+
+    def normalise(self):
+        total = self.total()
+        if total != 0:
+            self.array = self.array / total
+
+    def __mul__(self, right):
+        return self.product(right)
+
+    def __str__(self):
+        return f"Dense Table (columns:{self.names}, shape:{self.array.shape})"
+
+    __repr__ = __str__
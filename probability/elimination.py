@@ -0,0 +1,218 @@
+from operator import add, mul
+import numpy as np
+from probability.core_1 import RowKey
+from probability.core_2 import Table
+
+
+def to_factor(table):
+    """Convert a Table or MultiTable to a flat Table factor.
+       P(X, Y | Z) -> f(X, Y, Z)
+
+    Args:
+        table (Table or MultiTable): A (conditional) table.
+
+    Returns:
+        Table: A factor over all the columns.
+    """
+    if not isinstance(table, Table):
+        raise ValueError("The factors must be Table or MultiTable.")
+    if not table.columns.is_multitable():
+        return table
+
+    return Table(
+        {
+            child_key + key: value
+            for key, child in table.items()
+            for child_key, value in child.items()
+        },
+        list(table.children_names) + list(table.names),
+        _internal_=True,
+        log_space=table.log_space,
+    )
+
+
+def reorder(table, names):
+    """Reorders the columns of a table by 'names'."""
+    if list(table.names) == list(names):
+        return table
+    indices = [list(table.names).index(name) for name in names]
+    return Table(
+        {RowKey([key[i] for i in indices]): value for key, value in table.items()},
+        names,
+        _internal_=True,
+        log_space=table.log_space,
+    )
+
+
+class VariableElimination:
+    """Answers P(query | evidence) from a set of factors by summing
+    out the other variables one by one.
+
+    Each variable is eliminated by multiplying only the factors that
+    contain it and then marginalising it, so the largest intermediate
+    factor is bounded by the induced width of the elimination order,
+    instead of the full joint table.
+    """
+
+    def __init__(self, factors):
+        """Construct the engine.
+
+        Args:
+            factors (list):
+                List of Table or MultiTable factors, e.g.
+                [P(X), P(Y | X), P(Z | X, Y)].
+        """
+        if len(factors) == 0:
+            raise ValueError("At least one factor is needed.")
+        self.factors = [to_factor(factor) for factor in factors]
+        self.names = []
+        for factor in self.factors:
+            self.names += [name for name in factor.names if name not in self.names]
+
+    @staticmethod
+    def _interaction_graph_(factors_names):
+        graph = {}
+        for names in factors_names:
+            for name in names:
+                graph.setdefault(name, set()).update(n for n in names if n != name)
+        return graph
+
+    def elimination_order(self, variables, heuristic="min-fill", factors_names=None):
+        """Finds an elimination order for the variables greedily.
+
+        Args:
+            variables (list): The variables that must be eliminated.
+            heuristic (str, optional):
+                'min-fill' picks the variable that adds the least
+                number of new edges to the interaction graph,
+                'min-degree' picks the one with the least neighbours.
+                Defaults to "min-fill".
+            factors_names (list, optional):
+                List of the columns' names of factors.
+                Defaults to the names of the engine's factors.
+
+        Raises:
+            ValueError: Raises when the heuristic is not known.
+
+        Returns:
+            list: The variables in the elimination order.
+        """
+        if heuristic not in ("min-fill", "min-degree"):
+            raise ValueError(f"Unknown elimination heuristic '{heuristic}'.")
+        if factors_names is None:
+            factors_names = [factor.names for factor in self.factors]
+        graph = self._interaction_graph_(factors_names)
+
+        def cost(name):
+            neighbours = graph[name]
+            if heuristic == "min-degree":
+                return len(neighbours)
+            return sum(
+                1
+                for n1 in neighbours
+                for n2 in neighbours
+                if n1 < n2 and n2 not in graph[n1]
+            )
+
+        remained = [name for name in variables if name in graph]
+        order = []
+        while len(remained) > 0:
+            # ties are broken by the name to be deterministic
+            name = min(remained, key=lambda n: (cost(n), n))
+            neighbours = graph.pop(name)
+            # connect the neighbours (fill edges) and remove the variable
+            for n in neighbours:
+                graph[n].discard(name)
+                graph[n].update(neighbours - {n})
+            remained.remove(name)
+            order.append(name)
+        return order
+
+    def query(self, *args, evidence=None, heuristic="min-fill", normalise=True):
+        """Computes P(args | evidence).
+
+        Args:
+            args (list): Names of the query variables.
+            evidence (dict, optional):
+                A dictionary of (name: observed level).
+                Defaults to None.
+            heuristic (str or list, optional):
+                'min-fill', 'min-degree' or an explicit elimination
+                order. Defaults to "min-fill".
+            normalise (bool, optional):
+                If False, returns P(args, evidence).
+                Defaults to True.
+
+        Raises:
+            ValueError:
+                Raises when a name is not defined, or a query
+                variable is also observed.
+
+        Returns:
+            Table: The table of query variables in the 'args' order.
+        """
+        evidence = {} if evidence is None else evidence
+        if len(args) == 0:
+            raise ValueError("At least one query variable is needed.")
+        for name in list(args) + list(evidence.keys()):
+            if name not in self.names:
+                raise ValueError(f"Column name: '{name}' is not defined.")
+        for name in args:
+            if name in evidence:
+                raise ValueError(f"The query variable '{name}' is observed.")
+        # In log space, the constant is the log and is summed
+        log_space = self.factors[0].log_space
+        combine = add if log_space else mul
+        # Reduce the factors by the evidence. A factor that is
+        # fully observed is a constant
+        constant = 0.0 if log_space else 1
+        factors = []
+        for factor in self.factors:
+            observed = {k: v for k, v in evidence.items() if k in factor.names}
+            if len(observed) == 0:
+                factors.append(factor)
+            elif len(observed) == len(factor.names):
+                value = factor.get(**observed)
+                if value is None:
+                    value = -np.inf if log_space else 0
+                constant = combine(constant, value)
+            else:
+                factors.append(factor.reduce(**observed))
+        # Sum out the hidden variables
+        hidden = [
+            name for name in self.names if name not in args and name not in evidence
+        ]
+        if isinstance(heuristic, str):
+            order = self.elimination_order(
+                hidden, heuristic, [factor.names for factor in factors]
+            )
+        else:
+            order = list(heuristic)
+            if sorted(order) != sorted(hidden):
+                raise ValueError("The elimination order must have all hidden variables.")
+        for name in order:
+            involved = [factor for factor in factors if name in factor.names]
+            factors = [factor for factor in factors if name not in factor.names]
+            product = involved[0]
+            for factor in involved[1:]:
+                product = product * factor
+            if product.columns.size == 1:
+                # total is the log of the sum in log space
+                constant = combine(constant, product.total())
+            else:
+                factors.append(product.marginal(name, normalise=False))
+        # Multiply the remained factors, which are over query variables
+        result = factors[0]
+        for factor in factors[1:]:
+            result = result * factor
+        result = reorder(result, list(args))
+        # The result is mutated below, so it must not be
+        # one of the factors of the caller
+        if any(result is factor for factor in self.factors):
+            result = result._copy_()
+        if normalise:
+            result.normalise()
+        elif constant != (0.0 if log_space else 1):
+            for key, value in list(result.items()):
+                result[key] = combine(value, constant)
+        return result
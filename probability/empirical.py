@@ -1,9 +1,23 @@
 from collections import Counter
+from collections.abc import Mapping
+from multiprocessing import Pool
+from multiprocessing import shared_memory
 import numpy as np
 from probability import RowKey
 from probability import Table
 
 
+def _count_chunk_(shm_name, shape, dtype, start, stop):
+    # Counts the unique rows of samples[start:stop], where
+    # samples is the array in the shared memory 'shm_name'
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        samples = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        return np.unique(samples[start:stop], axis=0, return_counts=True)
+    finally:
+        shm.close()
+
+
 class FrequencyTable(Table):
     def __init__(self, samples, names=None, consistencies=True):
 
@@ -43,6 +57,171 @@ class FrequencyTable(Table):
         # the construct
         return cls(samples=[RowKey(row) for row in samples], names=names)
 
+    @classmethod
+    def from_np_array_parallel(
+        cls, samples, names=None, processes=None, chunk_size=1000000, shm=None
+    ):
+        """Construct a FrequencyTable from a 2d numpy array by counting
+           its chunks in a pool of processes. The workers read the
+           array from a shared memory, and only the unique rows and
+           counts of each chunk (not the rows) are sent back. The
+           result does not depend on the number of processes.
+
+           To avoid a copy, create the array in the buffer of a
+           SharedMemory and pass it as 'shm'. Otherwise, the array
+           is copied to a new SharedMemory, so the peak memory is
+           twice the size of the array.
+
+           Object arrays cannot be shared and are counted by
+           'from_np_array'.
+
+        Args:
+            samples (numpy.ndarray):
+                the observed samples.
+            names (list, optional):
+                List of names of the columns.
+                If it is not provided, it creates as 'Xn'.
+                Defaults to None.
+            processes (int, optional):
+                Number of worker processes. Defaults to None,
+                which is the number of CPUs.
+            chunk_size (int, optional):
+                Number of rows of each chunk. Defaults to 1000000.
+            shm (multiprocessing.shared_memory.SharedMemory, optional):
+                The shared memory that 'samples' is created in, from
+                the start of its buffer. Defaults to None.
+
+        Raises:
+            ValueError: Raises when the samples argument is not a
+                        non-empty numpy.ndarray, or it is not the
+                        array in the buffer of 'shm'.
+        """
+        if not isinstance(samples, np.ndarray) or len(samples) == 0:
+            raise ValueError("'sample' argument must be a non-empty numpy ndarray.")
+        if samples.dtype == object:
+            return cls.from_np_array(samples, names)
+        if samples.ndim == 1:
+            samples = samples.reshape(-1, 1)
+
+        if shm is not None:
+            if (
+                not samples.flags.c_contiguous
+                or samples.nbytes > shm.size
+                or samples.ctypes.data
+                != np.frombuffer(shm.buf, dtype=np.uint8, count=1).ctypes.data
+            ):
+                raise ValueError("'samples' must be the array in the buffer of 'shm'.")
+            partials = cls._count_shared_chunks_(
+                shm.name, samples.shape, samples.dtype, processes, chunk_size
+            )
+        else:
+            samples = np.ascontiguousarray(samples)
+            owned = shared_memory.SharedMemory(
+                create=True, size=max(samples.nbytes, 1)
+            )
+            try:
+                shared = np.ndarray(
+                    samples.shape, dtype=samples.dtype, buffer=owned.buf
+                )
+                shared[:] = samples
+                del shared
+                partials = cls._count_shared_chunks_(
+                    owned.name, samples.shape, samples.dtype, processes, chunk_size
+                )
+            finally:
+                owned.close()
+                owned.unlink()
+        # Merge the partial counts; np.unique sorts the rows,
+        # so the order of the chunks does not matter
+        rows, index = np.unique(
+            np.concatenate([rows for rows, _ in partials]),
+            axis=0,
+            return_inverse=True,
+        )
+        counts = np.bincount(
+            index.ravel(), weights=np.concatenate([counts for _, counts in partials])
+        ).astype(np.int64)
+        return cls(
+            samples={RowKey(row): count for row, count in zip(rows, counts.tolist())},
+            names=names,
+        )
+
+    @staticmethod
+    def _count_shared_chunks_(shm_name, shape, dtype, processes, chunk_size):
+        # The (unique rows, counts) of each chunk of the
+        # array in the shared memory 'shm_name'
+        chunks = [
+            (shm_name, shape, dtype, start, start + chunk_size)
+            for start in range(0, shape[0], chunk_size)
+        ]
+        with Pool(processes) as pool:
+            return pool.starmap(_count_chunk_, chunks)
+
+    def add_samples(self, samples):
+        """Adds the observed samples to the counts in place.
+
+           The samples are counted first, so the memory is bounded
+           by the number of distinct keys, and all the keys are
+           checked before any count is changed.
+
+        Args:
+            samples (Mapping or Iterable):
+                A dictionary of (key:count), like a Counter,
+                or an iterable of the observed keys.
+
+        Raises:
+            ValueError:
+                Raises when the length of the keys is not
+                consistence with the Table.
+        """
+        if not isinstance(samples, Mapping):
+            samples = Counter(samples)
+        self._add_counts_(samples)
+
+    def update_batch(self, samples):
+        """Adds the rows of a 2d numpy array (or a 1d array for
+           single column tables) to the counts in place. The
+           rows are counted by numpy.
+
+        Args:
+            samples (numpy.ndarray): the observed samples.
+
+        Raises:
+            ValueError:
+                Raises when the samples argument is not a numpy
+                array or the number of its columns is wrong.
+        """
+        if not isinstance(samples, np.ndarray):
+            raise ValueError("'sample' argument must be numpy ndarray.")
+        if samples.ndim == 1:
+            samples = samples.reshape(-1, 1)
+        if samples.ndim != 2 or samples.shape[1] != self.columns.size:
+            raise ValueError(
+                f"'sample' argument must be a 2D ndarray with {self.columns.size}"
+                " columns."
+            )
+        if len(samples) == 0:
+            return
+        if samples.dtype == object:
+            self.add_samples(RowKey(row) for row in samples)
+            return
+        rows, counts = np.unique(samples, axis=0, return_counts=True)
+        self._add_counts_(
+            {RowKey(row): count for row, count in zip(rows.tolist(), counts.tolist())}
+        )
+
+    def _add_counts_(self, counter):
+        # All the keys are encoded and checked first, so
+        # a bad key does not leave a partial update
+        rows = [(RowKey(key), count) for key, count in counter.items()]
+        for row, _ in rows:
+            if len(row) != self.columns.size:
+                raise ValueError("The length of the 'factors' are not consistence.")
+        for row, count in rows:
+            current = self._value_of_(row)
+            self[row] = count if current is None else current + count
+            self.total += count
+
     @staticmethod
     def digitize(samples, start, stop, num=10, endpoint=True, right=False, levels=None):
         """[summary]
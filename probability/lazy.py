@@ -0,0 +1,447 @@
+from abc import ABC, abstractmethod
+from functools import reduce as fold
+from probability.core_2 import Table
+from probability.elimination import to_factor
+
+
+class Expression(ABC):
+    """A node of a lazy Table expression.
+
+    The operators (*, +, marginal, condition_on and reduce) build
+    a graph of nodes instead of computing the Tables. Calling
+    'compute' rewrites the graph to a cheaper equivalent one and
+    then evaluates it:
+
+        - reduces are pushed below the products, so the joins
+          run over the selected rows only,
+        - marginals are pushed into the products, so a variable
+          that is only in one side is summed out before the join,
+        - consecutive marginals and reduces are merged.
+    """
+
+    @property
+    @abstractmethod
+    def names(self):
+        pass
+
+    @abstractmethod
+    def levels_count(self, name):
+        """Estimated number of levels of a column."""
+        pass
+
+    @abstractmethod
+    def estimated_rows(self):
+        pass
+
+    def children(self):
+        return []
+
+    @abstractmethod
+    def label(self):
+        pass
+
+    @abstractmethod
+    def evaluate(self):
+        pass
+
+    def rewrite(self):
+        """Returns the equivalent node after one bottom-up pass of rewrites."""
+        return self
+
+    def optimise(self):
+        """Applies the rewrites until the plan does not change."""
+        node = self
+        while True:
+            new_node = node.rewrite()
+            if new_node.explain(optimise=False) == node.explain(optimise=False):
+                return new_node
+            node = new_node
+
+    def compute(self, optimise=True):
+        """Evaluates the expression.
+
+        Args:
+            optimise (bool, optional):
+                Rewrites the expression before evaluation.
+                Defaults to True.
+
+        Returns:
+            Table: The result.
+        """
+        node = self.optimise() if optimise else self
+        return node.evaluate()
+
+    def explain(self, optimise=True):
+        """Describes the plan, one node per line with its estimated rows.
+
+        Args:
+            optimise (bool, optional):
+                Describes the rewritten plan. Defaults to True.
+
+        Returns:
+            str: The plan.
+        """
+        node = self.optimise() if optimise else self
+
+        def lines(node, depth):
+            line = (
+                "".join(["  "] * depth)
+                + f"{node.label()} [~{int(round(node.estimated_rows()))} rows]"
+            )
+            return [line] + [
+                child_line
+                for child in node.children()
+                for child_line in lines(child, depth + 1)
+            ]
+
+        return "\n".join(lines(node, 0))
+
+    def _check_names_(self, args):
+        for name in args:
+            if name not in self.names:
+                raise ValueError(f"Column name: '{name}' is not defined.")
+
+    def marginal(self, *args, normalise=True):
+        self._check_names_(args)
+        if len(args) == len(self.names):
+            raise ValueError("Cannot marginalize on all column names.")
+        return Marginal(self, list(args), normalise)
+
+    def condition_on(self, *args, normalise=True):
+        self._check_names_(args)
+        if len(self.names) == 1:
+            raise ValueError("This is a single column Table and cannot condition on.")
+        if len(args) == len(self.names):
+            raise ValueError("Cannot condition on all columns.")
+        return ConditionOn(self, list(args), normalise)
+
+    def reduce(self, **kwargs):
+        self._check_names_(kwargs.keys())
+        if len(kwargs) == len(self.names):
+            raise ValueError("Cannot reduce on all column names.")
+        return Reduce(self, dict(kwargs))
+
+    def __mul__(self, right):
+        return Product(self, as_expression(right))
+
+    def __rmul__(self, left):
+        return Product(as_expression(left), self)
+
+    def __add__(self, right):
+        right = as_expression(right)
+        if list(self.names) != list(right.names):
+            raise ValueError(
+                "Two adding Table do not have the same columns "
+                "(order must be the same too)."
+            )
+        return Sum(self, right)
+
+    def __str__(self):
+        return self.explain(optimise=False)
+
+    __repr__ = __str__
+
+
+def as_expression(value):
+    if isinstance(value, Expression):
+        if isinstance(value, ConditionOn):
+            raise ValueError("A conditional expression cannot be used as an operand.")
+        return value
+    if isinstance(value, Table):
+        return Leaf(value)
+    raise ValueError("The argument must be a 'Table' or an 'Expression'.")
+
+
+class Leaf(Expression):
+    def __init__(self, table):
+        # MultiTables are used as flat factors, e.g. P(X | Z) -> f(X, Z)
+        self.table = to_factor(table)
+        self._levels_ = None
+
+    @property
+    def names(self):
+        return list(self.table.names)
+
+    def levels_count(self, name):
+        if len(self.table) == 0:
+            return 1
+        if self._levels_ is None:
+            try:
+                self._levels_ = self.table._as_store_().shape
+            except ValueError:  # e.g. Fraction or Decimal values
+                # The estimate must not fail the evaluation
+                self._levels_ = tuple(
+                    len({key[i] for key in self.table.keys()})
+                    for i in range(len(self.names))
+                )
+        return self._levels_[self.names.index(name)]
+
+    def estimated_rows(self):
+        return len(self.table)
+
+    def label(self):
+        return f"Table({', '.join(self.names)})"
+
+    def evaluate(self):
+        return self.table
+
+
+class Product(Expression):
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    @property
+    def names(self):
+        return self.left.names + [
+            name for name in self.right.names if name not in self.left.names
+        ]
+
+    def levels_count(self, name):
+        if name in self.left.names and name in self.right.names:
+            return min(self.left.levels_count(name), self.right.levels_count(name))
+        if name in self.left.names:
+            return self.left.levels_count(name)
+        return self.right.levels_count(name)
+
+    def estimated_rows(self):
+        # The usual join estimate: each common column divides
+        # the cross product by its number of levels
+        rows = self.left.estimated_rows() * self.right.estimated_rows()
+        for name in self.left.names:
+            if name in self.right.names:
+                rows /= max(
+                    self.left.levels_count(name), self.right.levels_count(name), 1
+                )
+        return rows
+
+    def children(self):
+        return [self.left, self.right]
+
+    def label(self):
+        return f"Product({', '.join(self.names)})"
+
+    def evaluate(self):
+        return self.left.evaluate() * self.right.evaluate()
+
+    def rewrite(self):
+        return Product(self.left.rewrite(), self.right.rewrite())
+
+
+class Sum(Expression):
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    @property
+    def names(self):
+        return self.left.names
+
+    def levels_count(self, name):
+        return max(self.left.levels_count(name), self.right.levels_count(name))
+
+    def estimated_rows(self):
+        return max(self.left.estimated_rows(), self.right.estimated_rows())
+
+    def children(self):
+        return [self.left, self.right]
+
+    def label(self):
+        return f"Sum({', '.join(self.names)})"
+
+    def evaluate(self):
+        return self.left.evaluate() + self.right.evaluate()
+
+    def rewrite(self):
+        return Sum(self.left.rewrite(), self.right.rewrite())
+
+
+class Marginal(Expression):
+    def __init__(self, child, args, normalise):
+        self.child = child
+        self.args = args
+        self.normalise = normalise
+
+    @property
+    def names(self):
+        return [name for name in self.child.names if name not in self.args]
+
+    def levels_count(self, name):
+        return self.child.levels_count(name)
+
+    def estimated_rows(self):
+        levels = fold(lambda a, b: a * b, [self.levels_count(n) for n in self.names], 1)
+        return min(self.child.estimated_rows(), levels)
+
+    def children(self):
+        return [self.child]
+
+    def label(self):
+        if len(self.args) == 0:
+            return "Normalise"
+        normalised = "" if self.normalise else ", normalise=False"
+        return f"Marginal({', '.join(self.args)}{normalised})"
+
+    def evaluate(self):
+        table = self.child.evaluate()
+        if len(self.args) == 0:
+            # All the marginalised columns were pushed down
+            table = Table(
+                dict(table.items()),
+                table.names,
+                _internal_=True,
+                log_space=table.log_space,
+            )
+            if self.normalise:
+                table.normalise()
+            return table
+        return table.marginal(*self.args, normalise=self.normalise)
+
+    def rewrite(self):
+        child = self.child.rewrite()
+        # Merge the consecutive marginals. Normalising the inner
+        # one only scales the result, so it is kept when it is
+        # not overridden by the outer one
+        if isinstance(child, Marginal) and (self.normalise or not child.normalise):
+            return Marginal(child.child, child.args + self.args, self.normalise)
+        if len(self.args) == 0 and not self.normalise:
+            return child
+        if isinstance(child, Product):
+            return self._push_into_product_(child)
+        return Marginal(child, self.args, self.normalise)
+
+    def _push_into_product_(self, product):
+        # A column that is only in one side can be summed out
+        # before the join, unless it is the last column of that side
+        def pushed(side, other):
+            args = [
+                name
+                for name in self.args
+                if name in side.names and name not in other.names
+            ]
+            if len(args) == len(side.names):
+                args = args[:-1]
+            return args
+
+        left_args = pushed(product.left, product.right)
+        right_args = pushed(product.right, product.left)
+        if len(left_args) + len(right_args) == 0:
+            return Marginal(product, self.args, self.normalise)
+        left = product.left
+        right = product.right
+        if len(left_args) > 0:
+            left = Marginal(left, left_args, False)
+        if len(right_args) > 0:
+            right = Marginal(right, right_args, False)
+        remained = [
+            name for name in self.args if name not in left_args + right_args
+        ]
+        return Marginal(Product(left, right), remained, self.normalise)
+
+
+class Reduce(Expression):
+    def __init__(self, child, levels):
+        self.child = child
+        self.levels = levels
+
+    @property
+    def names(self):
+        return [name for name in self.child.names if name not in self.levels]
+
+    def levels_count(self, name):
+        return self.child.levels_count(name)
+
+    def estimated_rows(self):
+        rows = self.child.estimated_rows()
+        for name in self.levels:
+            rows /= max(self.child.levels_count(name), 1)
+        return rows
+
+    def children(self):
+        return [self.child]
+
+    def label(self):
+        levels = ", ".join(f"{name}={value!r}" for name, value in self.levels.items())
+        return f"Reduce({levels})"
+
+    def evaluate(self):
+        return self.child.evaluate().reduce(**self.levels)
+
+    def rewrite(self):
+        child = self.child.rewrite()
+        if isinstance(child, Reduce):
+            return Reduce(child.child, {**child.levels, **self.levels})
+        # Reducing an unnormalised marginal is the marginal
+        # of the reduced rows
+        if isinstance(child, Marginal) and not child.normalise:
+            return Marginal(Reduce(child.child, self.levels), child.args, False)
+        if isinstance(child, Product):
+            return self._push_into_product_(child)
+        return Reduce(child, self.levels)
+
+    def _push_into_product_(self, product):
+        def pushed(side):
+            levels = {
+                name: value
+                for name, value in self.levels.items()
+                if name in side.names
+            }
+            if len(levels) == 0 or len(levels) == len(side.names):
+                return side
+            return Reduce(side, levels)
+
+        left = pushed(product.left)
+        right = pushed(product.right)
+        if left is product.left and right is product.right:
+            return Reduce(product, self.levels)
+        product = Product(left, right)
+        # The columns that could not be pushed to all the sides
+        remained = {
+            name: value
+            for name, value in self.levels.items()
+            if name in product.names
+        }
+        if len(remained) == 0:
+            return product
+        return Reduce(product, remained)
+
+
+class ConditionOn(Expression):
+    """The conditional of an expression, which is always its last operation."""
+
+    def __init__(self, child, args, normalise):
+        self.child = child
+        self.args = args
+        self.normalise = normalise
+
+    @property
+    def names(self):
+        return self.child.names
+
+    def levels_count(self, name):
+        return self.child.levels_count(name)
+
+    def estimated_rows(self):
+        return self.child.estimated_rows()
+
+    def children(self):
+        return [self.child]
+
+    def label(self):
+        return f"ConditionOn({', '.join(self.args)})"
+
+    def evaluate(self):
+        return self.child.evaluate().condition_on(*self.args, normalise=self.normalise)
+
+    def rewrite(self):
+        return ConditionOn(self.child.rewrite(), self.args, self.normalise)
+
+    def _operand_error_(self, *args, **kwargs):
+        raise ValueError("A conditional expression cannot be used as an operand.")
+
+    marginal = _operand_error_
+    condition_on = _operand_error_
+    reduce = _operand_error_
+    __mul__ = _operand_error_
+    __rmul__ = _operand_error_
+    __add__ = _operand_error_
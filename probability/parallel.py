@@ -0,0 +1,97 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from math import ceil
+import os
+
+
+def _apply_batch_(func, batch):
+    # A module level function, so the batches of
+    # a process pool can be pickled
+    return [func(item) for item in batch]
+
+
+def check_executor(executor):
+    """Checks that the executor is None, "thread", "process"
+       or an instance of Executor.
+
+    Raises:
+        ValueError: Raises when the executor is not known.
+    """
+    if executor is None or isinstance(executor, Executor):
+        return
+    if executor not in ("thread", "process"):
+        raise ValueError(
+            f"Unknown executor '{executor}'. It must be 'thread', 'process' "
+            "or an instance of concurrent.futures.Executor."
+        )
+
+
+def make_executor(executor, max_workers=None):
+    """Creates an executor by its name.
+
+    Args:
+        executor (str or Executor):
+            "thread", "process" or an instance of Executor,
+            which is returned as it is.
+        max_workers (int, optional): Number of workers of
+            the created executor. Defaults to None.
+
+    Raises:
+        ValueError: Raises when the executor is not known.
+
+    Returns:
+        tuple: (executor, owned) where 'owned' is True when the
+               executor is created here and must be shut down.
+    """
+    check_executor(executor)
+    if isinstance(executor, Executor):
+        return executor, False
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers), True
+    return ProcessPoolExecutor(max_workers=max_workers), True
+
+
+def map_ordered(func, items, executor=None, batch_size=None, max_workers=None):
+    """Applies 'func' to the items, in parallel when an executor is
+       provided, and returns the results in the same order as items.
+
+       The items are sent to the workers in batches, so the small
+       ones do not pay the overhead of a task each. For the process
+       pools, 'func' and the items must be picklable (e.g. a module
+       level function or operator.methodcaller).
+
+    Args:
+        func (callable): The function of one item.
+        items (iterable): The items.
+        executor (str or Executor, optional):
+            "thread", "process", an instance of Executor or None
+            for a sequential map. Defaults to None.
+        batch_size (int, optional):
+            Number of items in each task. When it is None, the items
+            are split to four batches per worker. Defaults to None.
+        max_workers (int, optional): Number of workers of the created
+            executor. Defaults to None.
+
+    Raises:
+        ValueError: Raises when the batch size is less than one.
+
+    Returns:
+        list: The results.
+    """
+    items = list(items)
+    if executor is None or len(items) <= 1:
+        return [func(item) for item in items]
+    if batch_size is None:
+        workers = max_workers or os.cpu_count() or 1
+        batch_size = ceil(len(items) / (4 * workers))
+    elif batch_size < 1:
+        raise ValueError("The batch size must be at least one.")
+
+    batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+    pool, owned = make_executor(executor, max_workers)
+    try:
+        # Executor.map yields the results in the order of batches
+        results = pool.map(_apply_batch_, [func] * len(batches), batches)
+        return [result for batch in results for result in batch]
+    finally:
+        if owned:
+            pool.shutdown()
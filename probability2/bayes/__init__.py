@@ -1,2 +1,4 @@
 from probability2.bayes.bayes_1 import Binomial
 from probability2.bayes.bayes_1 import Multinomial
+from probability2.bayes.bayes_2 import BetaBinomialBatch
+from probability2.bayes.bayes_2 import DirichletMultinomialBatch
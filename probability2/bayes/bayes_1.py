@@ -1,20 +1,22 @@
-from probability2 import Distribution
-from probability2 import DiscreteRV
+from collections import Counter
+from collections.abc import Mapping
 from probability2.empirical_distributions import FrequencyTable
 
 
-class Binomial(Distribution):
+def _count_(samples):
+    # Counts an iterable of observed samples, or
+    # returns a dictionary of (key:count) as it is
+    if isinstance(samples, Mapping):
+        for key, count in samples.items():
+            if count < 0:
+                raise ValueError(f"The count of '{key}' is negative.")
+        return samples
+    return Counter(samples)
+
+
+class Binomial(FrequencyTable):
     def __init__(self, samples, alpha=1, beta=1, level=None, name="X1", consis=True):
-        super().__init__(samples)
-        #
-        # Random varable's details
-        try:
-            first_row = next(iter(self.keys()))
-        except StopIteration:
-            first_row = None
-
-        self.discrete_rv = DiscreteRV(name, first_row)
-        self.name = name
+        super().__init__(samples, name, consis)
         #
         levels = self.levels()
         if len(levels) != 2:
@@ -28,14 +30,69 @@ class Binomial(Distribution):
             self.level = levels[0]
         else:
             self.level = level
-
+        # The counts are kept (not normalised), since they
+        # are the sufficient statistics of the updates
         self.n_level = self.frequency(self.level, normalised=False)
+        self._update_map_()
+
+    def _update_map_(self):
         # (n + \alpha)/ (\alpha + \beta + N)
         self.map = (self.n_level + self.alpha) / (self.alpha + self.beta + self.total)
-        self.normalise()
-        #
-        if consis:
-            self._check_keys_consistencies_()
+
+    def update(self, samples):
+        """Adds the new observations to the counts in place
+           and updates the estimation, in O(new samples).
+
+        Args:
+            samples (Mapping or Iterable):
+                A dictionary of (key:count), like a Counter,
+                or an iterable of the observed keys.
+
+        Raises:
+            ValueError: Raises when a sample is not one of the two
+                        levels or its count is negative.
+        """
+        counts = _count_(samples)
+        for key in counts:
+            if key not in self._counter:
+                raise ValueError(f"'{key}' is not a level of the Binomial distribution.")
+        self._counter.update(counts)
+        self.total += sum(counts.values())
+        self.n_level += counts.get(self.level, 0)
+        self._invalidate_()
+        self._update_map_()
+
+    def merge(self, other):
+        """Combines the counts of two Binomial distributions with
+           the same prior, e.g. the ones of different partitions of
+           samples. The merge is associative and commutative.
+
+        Args:
+            other (Binomial): The other distribution.
+
+        Raises:
+            ValueError: Raises when the other is not a Binomial or its
+                        prior, level or levels are not the same.
+
+        Returns:
+            Binomial: A new distribution of all the samples.
+        """
+        if not isinstance(other, Binomial):
+            raise ValueError("The 'other' argument must be a Binomial.")
+        if (other.alpha, other.beta, other.level) != (self.alpha, self.beta, self.level):
+            raise ValueError("Two Binomial distributions have different priors.")
+        if set(other._counter) != set(self._counter):
+            raise ValueError("Two Binomial distributions have different levels.")
+        merged = Binomial(
+            dict(self._counter),
+            self.alpha,
+            self.beta,
+            self.level,
+            self.name,
+            consis=False,
+        )
+        merged.update(other._counter)
+        return merged
 
     def probability(self, key):
         """Gets the probability of the random variable, when its value is 'key'.
@@ -109,6 +166,58 @@ class Multinomial(FrequencyTable):
         #
         self.alphas = alphas
 
+    def update(self, samples):
+        """Adds the new observations to the counts in place,
+           in O(new samples). The levels that are not observed
+           yet must be in the initial samples with zero counts.
+
+        Args:
+            samples (Mapping or Iterable):
+                A dictionary of (key:count), like a Counter,
+                or an iterable of the observed keys.
+
+        Raises:
+            ValueError: Raises when a sample is not one of the
+                        levels or its count is negative.
+        """
+        counts = _count_(samples)
+        for key in counts:
+            if key not in self._counter:
+                raise ValueError(
+                    f"'{key}' is not a level of the Multinomial distribution."
+                )
+        self._counter.update(counts)
+        self.total += sum(counts.values())
+        self._invalidate_()
+
+    def merge(self, other):
+        """Combines the counts of two Multinomial distributions with
+           the same prior and levels, e.g. the ones of different
+           partitions of samples. The merge is associative and
+           commutative.
+
+        Args:
+            other (Multinomial): The other distribution.
+
+        Raises:
+            ValueError: Raises when the other is not a Multinomial or
+                        its prior or levels are not the same.
+
+        Returns:
+            Multinomial: A new distribution of all the samples.
+        """
+        if not isinstance(other, Multinomial):
+            raise ValueError("The 'other' argument must be a Multinomial.")
+        if list(other.alphas) != list(self.alphas):
+            raise ValueError("Two Multinomial distributions have different priors.")
+        if set(other._counter) != set(self._counter):
+            raise ValueError("Two Multinomial distributions have different levels.")
+        merged = Multinomial(
+            dict(self._counter), self.alphas, self.name, check_keys_consistencies=False
+        )
+        merged.update(other._counter)
+        return merged
+
     def map(self):
         sum_alpha = sum([(alpha - 1) for alpha in self.alphas])
 
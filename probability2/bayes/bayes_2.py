@@ -0,0 +1,446 @@
+from math import lgamma
+import numpy as np
+
+_log_gamma_ = np.vectorize(lgamma, otypes=[np.float64])
+
+
+def _beta_continued_fraction_(a, b, x, max_iterations=10000, eps=1e-12):
+    # The continued fraction of the incomplete beta function,
+    # evaluated by the modified Lentz's method for all elements
+    tiny = 1e-300
+
+    def not_tiny(value):
+        return np.where(np.abs(value) < tiny, tiny, value)
+
+    c = np.ones_like(x)
+    d = 1 / not_tiny(1 - (a + b) * x / (a + 1))
+    h = d
+    for m in range(1, max_iterations + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((a - 1 + m2) * (a + m2))
+        d = 1 / not_tiny(1 + aa * d)
+        c = not_tiny(1 + aa / c)
+        h = h * d * c
+        aa = -(a + m) * (a + b + m) * x / ((a + m2) * (a + 1 + m2))
+        d = 1 / not_tiny(1 + aa * d)
+        c = not_tiny(1 + aa / c)
+        delta = d * c
+        h = h * delta
+        if np.all(np.abs(delta - 1) < eps):
+            break
+    return h
+
+
+def log_beta(a, b):
+    """log(B(a, b)) of arrays, by the log-gamma function."""
+    return _log_gamma_(a) + _log_gamma_(b) - _log_gamma_(a + b)
+
+
+def beta_cdf(x, a, b, log_beta_ab=None):
+    """The cumulative distribution function of Beta(a, b) at x,
+       i.e. the regularized incomplete beta function, for arrays
+       of the same shape.
+
+    Args:
+        x (numpy.ndarray): The points in [0, 1].
+        a (numpy.ndarray): The first shape parameters.
+        b (numpy.ndarray): The second shape parameters.
+        log_beta_ab (numpy.ndarray, optional): The precomputed
+            log(B(a, b)). Defaults to None.
+
+    Returns:
+        numpy.ndarray: The probabilities.
+    """
+    x, a, b = np.broadcast_arrays(
+        *[np.asarray(arg, dtype=np.float64) for arg in (x, a, b)]
+    )
+    inside = (x > 0) & (x < 1)
+    # The points on the boundaries are calculated out of the fraction
+    x_in = np.where(inside, x, 0.5)
+    if log_beta_ab is None:
+        log_beta_ab = log_beta(a, b)
+    front = np.exp(a * np.log(x_in) + b * np.log1p(-x_in) - log_beta_ab)
+    # The continued fraction converges fast for x < (a + 1) / (a + b + 2),
+    # and the symmetry I(x; a, b) = 1 - I(1 - x; b, a) is used for the others
+    lower = x_in < (a + 1) / (a + b + 2)
+    x_cf = np.where(lower, x_in, 1 - x_in)
+    a_cf = np.where(lower, a, b)
+    b_cf = np.where(lower, b, a)
+    value = front * _beta_continued_fraction_(a_cf, b_cf, x_cf) / a_cf
+    cdf = np.where(lower, value, 1 - value)
+    return np.where(inside, cdf, np.where(x <= 0, 0.0, 1.0))
+
+
+def beta_ppf(q, a, b, max_iterations=100, tolerance=1e-12):
+    """The quantile function (inverse of CDF) of Beta(a, b), which is
+       found by Newton's steps on all the elements at once. The steps
+       are kept inside the bracket of the root, and fall back to
+       bisection when they leave it.
+
+    Args:
+        q (numpy.ndarray): The probabilities in [0, 1].
+        a (numpy.ndarray): The first shape parameters.
+        b (numpy.ndarray): The second shape parameters.
+        max_iterations (int, optional): Defaults to 100.
+        tolerance (float, optional): The largest change of the
+            quantiles in the last step. Defaults to 1e-12.
+
+    Returns:
+        numpy.ndarray: The quantiles.
+    """
+    q, a, b = np.broadcast_arrays(
+        *[np.asarray(arg, dtype=np.float64) for arg in (q, a, b)]
+    )
+    shape = q.shape
+    q, a, b = q.ravel(), a.ravel(), b.ravel()
+    log_beta_ab = log_beta(a, b)
+    low = np.zeros(q.shape)
+    high = np.ones(q.shape)
+    # Starts from the mean
+    x = a / (a + b)
+    # The steps are only taken for the elements that are not converged
+    active = np.arange(len(q))
+    for _ in range(max_iterations):
+        q_a, a_a, b_a, x_a = q[active], a[active], b[active], x[active]
+        log_beta_a = log_beta_ab[active]
+        error = beta_cdf(x_a, a_a, b_a, log_beta_a) - q_a
+        low_a = np.where(error < 0, x_a, low[active])
+        high_a = np.where(error < 0, high[active], x_a)
+        with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+            log_pdf = (a_a - 1) * np.log(x_a) + (b_a - 1) * np.log1p(-x_a) - log_beta_a
+            x_new = x_a - error / np.exp(log_pdf)
+        outside = ~((x_new > low_a) & (x_new < high_a))
+        x_new = np.where(outside, (low_a + high_a) / 2, x_new)
+        converged = (np.abs(x_new - x_a) < tolerance) | (high_a - low_a < tolerance)
+        x[active], low[active], high[active] = x_new, low_a, high_a
+        active = active[~converged]
+        if len(active) == 0:
+            break
+    return x.reshape(shape)
+
+
+class DirichletMultinomialBatch:
+    """Dirichlet-Multinomial conjugate models of many independent
+    streams, where the prior parameters and the counts of the
+    streams are kept as 2D arrays of (streams x levels).
+
+    Members:
+        alphas (numpy.ndarray): The prior parameters.
+        counts (numpy.ndarray): The observed counts.
+    """
+
+    def __init__(self, alphas, counts=None, streams=None):
+        """Construct a batch of Dirichlet-Multinomial models.
+
+        Args:
+            alphas (list or numpy.ndarray):
+                The prior parameters, a 2D array of (streams x levels)
+                or one 1D array of levels for all the streams.
+            counts (list or numpy.ndarray, optional):
+                The 2D array of (streams x levels) of the observed counts.
+                Defaults to None, which is no observations.
+            streams (int, optional): Number of streams, when neither
+                alphas nor counts are 2D. Defaults to None.
+
+        Raises:
+            ValueError: Raises when the shapes are not consistent, the
+                        prior parameters are not positive or the
+                        counts are negative.
+        """
+        alphas = np.asarray(alphas, dtype=np.float64)
+        if counts is not None:
+            counts = np.array(counts, dtype=np.float64)
+            if counts.ndim != 2:
+                raise ValueError("The 'counts' must be a 2D array.")
+            streams = counts.shape[0]
+        elif alphas.ndim == 2:
+            streams = alphas.shape[0]
+        elif streams is None:
+            raise ValueError("The number of streams is not provided.")
+        if alphas.ndim == 1:
+            alphas = np.tile(alphas, (streams, 1))
+        if alphas.ndim != 2 or alphas.shape[0] != streams:
+            raise ValueError("The 'alphas' must be a 1D or 2D array.")
+        if counts is None:
+            counts = np.zeros(alphas.shape)
+        if counts.shape != alphas.shape:
+            raise ValueError(
+                f"The shape of counts {counts.shape} is not "
+                f"the same as alphas {alphas.shape}."
+            )
+        if np.any(alphas <= 0):
+            raise ValueError("The prior parameters must be positive.")
+        if np.any(counts < 0):
+            raise ValueError("The counts must not be negative.")
+        self.alphas = alphas
+        self.counts = counts
+
+    @property
+    def shape(self):
+        return self.counts.shape
+
+    def __len__(self):
+        return self.counts.shape[0]
+
+    def update(self, counts, streams=None):
+        """Adds the counts to the streams in place.
+
+        Args:
+            counts (list or numpy.ndarray):
+                The 2D array of counts, one row per stream.
+            streams (list or numpy.ndarray, optional):
+                The indices of the streams of the rows, which can be
+                repeated. Defaults to None, which is all the streams.
+
+        Raises:
+            ValueError: Raises when the shape of counts is not
+                        consistent or a count is negative.
+        """
+        counts = np.asarray(counts, dtype=np.float64)
+        if np.any(counts < 0):
+            raise ValueError("The counts must not be negative.")
+        if streams is None:
+            if counts.shape != self.shape:
+                raise ValueError(
+                    f"The shape of counts {counts.shape} is not {self.shape}."
+                )
+            self.counts += counts
+            return
+        streams = np.asarray(streams)
+        if counts.shape != (len(streams), self.shape[1]):
+            raise ValueError(
+                f"The shape of counts {counts.shape} is not "
+                f"{(len(streams), self.shape[1])}."
+            )
+        # add.at accumulates the repeated streams
+        np.add.at(self.counts, streams, counts)
+
+    def observe(self, streams, levels):
+        """Adds single observations in place, where the i-th one is
+           the level (column index) levels[i] in stream streams[i].
+
+        Args:
+            streams (list or numpy.ndarray): The indices of streams.
+            levels (list or numpy.ndarray): The indices of levels.
+        """
+        np.add.at(self.counts, (np.asarray(streams), np.asarray(levels)), 1)
+
+    def posterior_alphas(self):
+        """The parameters of the posterior Dirichlet distributions."""
+        return self.alphas + self.counts
+
+    def map(self):
+        """The maximum a posteriori estimations of all streams.
+           theta_hat_i = (n_i + alpha_i - 1)/(N + sum_j (alpha_j - 1))
+
+           The mode exists when all the posterior parameters are at
+           least one and one of them is more than one. Otherwise (e.g.
+           the uniform prior without counts), the stream's estimation
+           is its posterior mean.
+
+        Returns:
+            numpy.ndarray: The (streams x levels) array of estimations.
+        """
+        posterior = self.posterior_alphas()
+        numerator = posterior - 1
+        totals = numerator.sum(axis=1, keepdims=True)
+        has_mode = np.all(numerator >= 0, axis=1, keepdims=True) & (totals > 0)
+        modes = np.divide(
+            numerator, totals, out=np.zeros_like(numerator), where=has_mode
+        )
+        means = posterior / posterior.sum(axis=1, keepdims=True)
+        return np.where(has_mode, modes, means)
+
+    def mean(self):
+        """The posterior means of all streams.
+           E[theta_i] = (n_i + alpha_i)/(N + sum_j alpha_j)
+
+        Returns:
+            numpy.ndarray: The (streams x levels) array of means.
+        """
+        posterior = self.posterior_alphas()
+        return posterior / posterior.sum(axis=1, keepdims=True)
+
+    def credible_interval(self, mass=0.95):
+        """The equal-tailed credible intervals of all the
+           parameters, from their marginal Beta posteriors.
+
+        Args:
+            mass (float, optional): The posterior probability
+                                    inside the interval. Defaults to 0.95.
+
+        Raises:
+            ValueError: Raises when the mass is not in (0, 1).
+
+        Returns:
+            tuple: (lower, upper) arrays of (streams x levels).
+        """
+        if not 0 < mass < 1:
+            raise ValueError("The 'mass' must be in (0, 1).")
+        posterior = self.posterior_alphas()
+        a = posterior
+        b = posterior.sum(axis=1, keepdims=True) - posterior
+        tail = (1 - mass) / 2
+        return beta_ppf(tail, a, b), beta_ppf(1 - tail, a, b)
+
+    def sample(self, size=None, random_state=None):
+        """Draws samples from the posteriors of all streams.
+
+        Args:
+            size (int, optional): Number of samples per stream.
+                                  Defaults to None, which is one.
+            random_state (int or numpy.random.Generator, optional):
+                The seed or generator. Defaults to None.
+
+        Returns:
+            numpy.ndarray: An array of (streams x levels) or
+                           (size x streams x levels) when size is provided.
+        """
+        rng = np.random.default_rng(random_state)
+        posterior = self.posterior_alphas()
+        shape = posterior.shape if size is None else (size,) + posterior.shape
+        gammas = rng.gamma(np.broadcast_to(posterior, shape))
+        return gammas / gammas.sum(axis=-1, keepdims=True)
+
+    def __str__(self):
+        return (
+            f"Dirichlet-Multinomial batch (streams:{self.shape[0]}, "
+            f"levels:{self.shape[1]})"
+        )
+
+    __repr__ = __str__
+
+
+class BetaBinomialBatch(DirichletMultinomialBatch):
+    """Beta-Binomial conjugate models of many independent streams
+    (e.g. A/B tests), which is a Dirichlet-Multinomial batch of
+    two levels: success and failure.
+
+    The estimations are of the success probability, so they
+    are 1D arrays of streams.
+    """
+
+    def __init__(self, successes=None, failures=None, alpha=1, beta=1, streams=None):
+        """Construct a batch of Beta-Binomial models.
+
+        Args:
+            successes (list or numpy.ndarray, optional):
+                The number of successes per stream. Defaults to None.
+            failures (list or numpy.ndarray, optional):
+                The number of failures per stream. Defaults to None.
+            alpha (float or numpy.ndarray, optional):
+                The prior alpha, for all or per stream. Defaults to 1.
+            beta (float or numpy.ndarray, optional):
+                The prior beta, for all or per stream. Defaults to 1.
+            streams (int, optional): Number of streams, when there
+                                     is no count. Defaults to None.
+
+        Raises:
+            ValueError: Raises when the shapes are not consistent or
+                        the prior parameters are not positive.
+        """
+        if successes is None and failures is None:
+            if streams is None:
+                raise ValueError("The number of streams is not provided.")
+            counts = np.zeros((streams, 2))
+        else:
+            if successes is None or failures is None:
+                raise ValueError("Both successes and failures must be provided.")
+            successes = np.asarray(successes, dtype=np.float64)
+            failures = np.asarray(failures, dtype=np.float64)
+            if successes.ndim != 1 or successes.shape != failures.shape:
+                raise ValueError(
+                    "The successes and failures must be 1D arrays of the same length."
+                )
+            counts = np.column_stack([successes, failures])
+        alphas = np.column_stack(
+            [
+                np.broadcast_to(np.asarray(alpha, dtype=np.float64), len(counts)),
+                np.broadcast_to(np.asarray(beta, dtype=np.float64), len(counts)),
+            ]
+        )
+        super().__init__(alphas, counts)
+
+    @property
+    def alpha(self):
+        return self.alphas[:, 0]
+
+    @property
+    def beta(self):
+        return self.alphas[:, 1]
+
+    def update(self, successes, failures, streams=None):
+        """Adds the successes and failures to the streams in place.
+
+        Args:
+            successes (list or numpy.ndarray): The number of successes.
+            failures (list or numpy.ndarray): The number of failures.
+            streams (list or numpy.ndarray, optional):
+                The indices of the streams, which can be repeated.
+                Defaults to None, which is all the streams.
+
+        Raises:
+            ValueError: Raises when the shapes are not consistent
+                        or a count is negative.
+        """
+        super().update(np.column_stack([successes, failures]), streams)
+
+    def observe(self, streams, outcomes):
+        """Adds single trials in place, where the i-th one is
+           a success in stream streams[i] when outcomes[i] is True.
+
+        Args:
+            streams (list or numpy.ndarray): The indices of streams.
+            outcomes (list or numpy.ndarray): The boolean outcomes.
+        """
+        super().observe(streams, 1 - np.asarray(outcomes, dtype=np.int64))
+
+    def map(self):
+        """(successes + alpha - 1)/(trials + alpha + beta - 2) of all
+           streams, or the posterior mean where the mode does not exist.
+        """
+        return super().map()[:, 0]
+
+    def mean(self):
+        """(successes + alpha)/(trials + alpha + beta) of all streams."""
+        return super().mean()[:, 0]
+
+    def credible_interval(self, mass=0.95):
+        """The equal-tailed credible intervals of the success
+           probabilities of all streams.
+
+        Args:
+            mass (float, optional): The posterior probability
+                                    inside the interval. Defaults to 0.95.
+
+        Returns:
+            tuple: (lower, upper) 1D arrays.
+        """
+        lower, upper = super().credible_interval(mass)
+        return lower[:, 0], upper[:, 0]
+
+    def sample(self, size=None, random_state=None):
+        """Draws success probabilities from the posteriors of all streams.
+
+        Args:
+            size (int, optional): Number of samples per stream.
+                                  Defaults to None, which is one.
+            random_state (int or numpy.random.Generator, optional):
+                The seed or generator. Defaults to None.
+
+        Returns:
+            numpy.ndarray: An array of (streams) or
+                           (size x streams) when size is provided.
+        """
+        rng = np.random.default_rng(random_state)
+        posterior = self.posterior_alphas()
+        shape = len(self) if size is None else (size, len(self))
+        return rng.beta(
+            np.broadcast_to(posterior[:, 0], shape),
+            np.broadcast_to(posterior[:, 1], shape),
+        )
+
+    def __str__(self):
+        return f"Beta-Binomial batch (streams:{self.shape[0]})"
+
+    __repr__ = __str__
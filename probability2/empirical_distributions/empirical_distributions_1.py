@@ -1,11 +1,129 @@
 from abc import abstractmethod
 from collections import Counter
+from collections.abc import ItemsView, Mapping
 import numpy as np
 from probability2 import Key
 from probability2 import Distribution
 
 
+def to_python(value):
+    # numpy scalars to python numbers
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ProductCounter(Mapping):
+    """The counts of the product of two independent distributions.
+
+    The counts are kept as the outer product matrix of the values
+    of both sides, and the keys as the Cartesian product of both
+    keys lists, so the (k1 + k2) keys are only made when they are
+    iterated. It supports the Counter methods that are used by the
+    distributions; missing keys are counted as zero.
+    """
+
+    def __init__(self, left_keys, left_values, right_keys, right_values):
+        """Construct a product counter.
+
+        Args:
+            left_keys (list): List of Keys of the left side.
+            left_values (list): The counts of the left keys.
+            right_keys (list): List of Keys of the right side.
+            right_values (list): The counts of the right keys.
+        """
+        self.left_keys = left_keys
+        self.right_keys = right_keys
+        left_values = np.array(left_values)
+        right_values = np.array(right_values)
+        if (
+            left_values.dtype.kind in "iu"
+            and right_values.dtype.kind in "iu"
+            and len(left_values) > 0
+            and len(right_values) > 0
+            and int(np.abs(left_values).max()) * int(np.abs(right_values).max())
+            > np.iinfo(np.int64).max
+        ):
+            # Python integers do not overflow, like Counter's counts
+            left_values = left_values.astype(object)
+            right_values = right_values.astype(object)
+        self.matrix = np.outer(left_values, right_values)
+        # The length of the left keys to split a product key
+        self._left_size_ = len(left_keys[0]) if len(left_keys) > 0 else 0
+        self._left_lookup_ = {key: i for i, key in enumerate(left_keys)}
+        self._right_lookup_ = {key: i for i, key in enumerate(right_keys)}
+
+    def _position_(self, key):
+        if not isinstance(key, tuple):
+            return None
+        i = self._left_lookup_.get(key[: self._left_size_])
+        j = self._right_lookup_.get(key[self._left_size_ :])
+        if i is None or j is None:
+            return None
+        return i, j
+
+    def __getitem__(self, key):
+        position = self._position_(key)
+        if position is None:
+            return 0
+        return to_python(self.matrix[position])
+
+    def __setitem__(self, key, value):
+        position = self._position_(key)
+        if position is None:
+            raise KeyError("New keys cannot be added to a product counter.")
+        if self.matrix.dtype.kind in "iu" and not isinstance(value, (int, np.integer)):
+            self.matrix = self.matrix.astype(np.float64)
+        self.matrix[position] = value
+
+    def __contains__(self, key):
+        return self._position_(key) is not None
+
+    def __iter__(self):
+        return (k1 + k2 for k1 in self.left_keys for k2 in self.right_keys)
+
+    def __len__(self):
+        return self.matrix.size
+
+    def items(self):
+        return _ProductItemsView(self)
+
+    def values(self):
+        return self.matrix.ravel().tolist()
+
+    def total(self):
+        return to_python(self.matrix.sum())
+
+    def most_common(self, num=None):
+        # Stable sort, so the ties are in the order of keys
+        order = np.argsort(-self.matrix.ravel(), kind="stable")
+        if num is not None:
+            order = order[:num]
+        right_size = len(self.right_keys)
+        return [
+            (
+                self.left_keys[index // right_size] + self.right_keys[index % right_size],
+                to_python(self.matrix.ravel()[index]),
+            )
+            for index in order.tolist()
+        ]
+
+    def copy(self):
+        return Counter(dict(self.items()))
+
+
+class _ProductItemsView(ItemsView):
+    def __iter__(self):
+        counter = self._mapping
+        # One row of the matrix is converted at a time
+        for k1, row in zip(counter.left_keys, counter.matrix):
+            for k2, value in zip(counter.right_keys, row.tolist()):
+                yield k1 + k2, value
+
+
 class EmpiricalDistribution(Distribution):
+    # The number of changes of the counts, which the arrays
+    # that are built from the counts are checked against
+    _version_ = 0
+
     def __init__(self, samples):
         """Construct an abstract distribution and count the number of
         occurenc of items in the samples.
@@ -22,6 +140,12 @@ class EmpiricalDistribution(Distribution):
         if samples is None:
             raise ValueError("samples argument is None.")
 
+        if isinstance(samples, ProductCounter):
+            # Product counts are kept in their matrix
+            self._counter = samples
+            self.total = samples.total()
+            return
+
         self._counter = Counter(samples)
         # Elements count
         self.total = sum(self._counter.values())
@@ -178,11 +302,17 @@ class EmpiricalDistribution(Distribution):
         levels_extended = np.r_[["less"], levels, ["more"]]
         return levels_extended[indices]
 
+    def _invalidate_(self):
+        # Called on every change of the counts, so the code
+        # that changes '_counter' in place must call it
+        self._version_ += 1
+
     def normalise(self):
         """Normalise the distribution."""
         for k in self._counter:
             self._counter[k] = self._counter[k] / self.total
         self.total = 1.0
+        self._invalidate_()
 
     def probability(self, key):
         """Gets the probability of the random variable, when its value is 'key'.
@@ -1,25 +1,24 @@
 from itertools import groupby
-from itertools import islice
-from itertools import product
 from operator import itemgetter
-from multiprocessing import Pool
+import warnings
 import numpy as np
 from probability2 import Key
 from probability2 import DiscreteRV
 from probability2 import MultiDiscreteRV
 from probability2 import Distribution
+from probability.columnar import ColumnStore
+from probability.columnar import group_codes
 
 from probability2.empirical_distributions import EmpiricalDistribution
+from probability2.empirical_distributions.empirical_distributions_1 import (
+    ProductCounter,
+)
 
 from probability2.empirical_distributions.empirical_distributions_3 import (
     ConditionalDistribution,
 )
 
 
-def to_dist(iterable):
-    return {(k1, k2): v1 * v2 for (k1, v1), (k2, v2) in iterable}
-
-
 class FrequencyTable(EmpiricalDistribution):
     """Provides a frequency table from the number of occurenc of
     observed items as dictionary of (key:frequency) or an iterator
@@ -88,26 +87,35 @@ class FrequencyTable(EmpiricalDistribution):
         else:
             names = [self.discrete_rv.name, right.discrete_rv.name]
         # The multiplication of two FrequencyTable must
-        # be a DiscreteDistribution
+        # be a DiscreteDistribution. The counts are the outer
+        # product of values and the keys are made lazily
         return DiscreteDistribution(
-            {
-                Key(k1) + Key(k2): v1 * v2
-                for k1, v1 in self.items()
-                for k2, v2 in right.items()
-            },
+            ProductCounter(
+                [Key(k) for k in self._counter.keys()],
+                list(self._counter.values()),
+                [Key(k) for k in right._counter.keys()],
+                list(right._counter.values()),
+            ),
             names,
+            consistencies=False,
         )
 
-    def product_multi_proc(self, right, process=4):
+    def product_multi_proc(self, right, process=None):
         """Multiplies a Distribution to this one.
            This is a parall version of product
 
+           The product of two FrequencyTables is kept as the outer
+           product of their values (ProductCounter), which is made
+           in O(n + m) and has nothing left to split between the
+           processes. So it is the same as 'product'.
+
         Args:
             right ([Distribution]):
                 The other Distribution.
 
-            process (int):
-                Number of processes
+            process (int, optional):
+                Deprecated and not used, since there are no
+                processes. Defaults to None.
 
         Raises:
             ValueError:
@@ -117,39 +125,14 @@ class FrequencyTable(EmpiricalDistribution):
         Returns:
             [type]: [description]
         """
-        if not isinstance(right, Distribution):
-            raise ValueError("The 'right' argument must be a Distribution.")
-        # Make sure the right is FrequencyTable table too
-        # otherwise, ask the other type to handel the multiplication
-        if not isinstance(right, FrequencyTable):
-            return right.__rmul__(self)
-        # Here , we can safely assume both sides are FrequencyTable
-        # and Multiply them
-        if right is self:
-            names = [f"{self.discrete_rv.name}1", f"{self.discrete_rv.name}2"]
-        elif self.discrete_rv.name == right.discrete_rv.name:
-            names = [f"{self.discrete_rv.name}1", f"{self.discrete_rv.name}2"]
-        else:
-            names = [self.discrete_rv.name, right.discrete_rv.name]
-        # The multiplication of two FrequencyTable must
-        # be a DiscreteDistribution
-        total_len = len(self.keys()) * len(right.keys())
-        main_iter = product(self.items(), right.items())
-        slices = [
-            islice(
-                main_iter,
-                (i * total_len) // process,
-                ((i + 1) * total_len) // process,
+        if process is not None:
+            warnings.warn(
+                "The 'process' argument of 'product_multi_proc' is deprecated "
+                "and not used; the product is not split between processes.",
+                DeprecationWarning,
+                stacklevel=2,
             )
-            for i in range(process)
-        ]
-
-        with Pool(process) as pool:
-            dicts = pool.map(to_dist, slices)
-            counter = dicts[0]
-            for next_dict in dicts[1:]:
-                counter.update(next_dict)
-            return DiscreteDistribution(counter, names)
+        return self.product(right)
 
     def get_random_variable(self):
         return self.discrete_rv
@@ -270,6 +253,11 @@ class DiscreteDistribution(EmpiricalDistribution):
     in the tuple as a random variable and find its levels.
     """
 
+    # Two distributions with common random variables are joined
+    # by sorting their encoded rows (instead of hashing) when
+    # they have at least this number of rows together
+    sort_merge_min_rows = 64
+
     def __init__(self, samples, names=None, consistencies=True):
         """Construct a DiscreteDistribution from the number of occurenc in samples.
 
@@ -321,10 +309,36 @@ class DiscreteDistribution(EmpiricalDistribution):
             raise ValueError(
                 "'sample' argument must be numpy 2D ndarray or list of list."
             )
+        if isinstance(samples, np.ndarray) and samples.dtype.kind in "biufUS":
+            # Numeric and fixed-width string arrays are counted
+            # by numpy, so only the unique rows become keys
+            rows, counts = cls._unique_rows_(samples)
+            return cls(
+                samples={Key(row): count for row, count in zip(rows, counts.tolist())},
+                names=names,
+            )
         # Convert rows to element, before calling
         # the construct
         return cls(samples=[Key(row) for row in samples], names=names)
 
+    @staticmethod
+    def _unique_rows_(samples):
+        # Same as np.unique(samples, axis=0, return_counts=True),
+        # but the rows are grouped by their combined column codes,
+        # which is much faster than sorting the rows as a whole
+        if samples.ndim == 1 or len(samples) == 0:
+            return np.unique(samples, axis=0, return_counts=True)
+        levels, codes = zip(
+            *[np.unique(column, return_inverse=True) for column in samples.T]
+        )
+        group_index, groups_codes = group_codes(
+            list(codes), tuple(len(level) for level in levels)
+        )
+        rows = np.stack(
+            [level[group] for level, group in zip(levels, groups_codes)], axis=1
+        )
+        return rows, np.bincount(group_index)
+
     def marginal(self, *args):
         """Marginalize the distribution over a set of random variables.
 
@@ -352,30 +366,54 @@ class DiscreteDistribution(EmpiricalDistribution):
         indices = [i for i, name in enumerate(self.rvs.names) if name in by_names]
         # Find the indices of compliment random variables (the other ones that
         # are not part of conditioning)
-        comp_indices = np.array([i for i in range(len(self.rvs)) if i not in indices])
+        comp_indices = [i for i in range(len(self.rvs)) if i not in indices]
+        try:
+            store = self._to_store_()
+        except ValueError:  # e.g. Fraction or Decimal counts
+            grouped = self._grouped_counts_(comp_indices)
+        else:
+            # Dictionary-encode the random variables and group by
+            # the compliment ones in one vectorized pass
+            grouped = self._store_to_dict_(store.marginal(comp_indices))
+        return DiscreteDistribution(grouped, names=self.rvs.names[comp_indices])
+
+    def _grouped_counts_(self, indices):
+        # The dictionary of (variables at indices: sum of counts),
+        # for the counts that cannot be stored in the columnar
+        # store (e.g. Fraction or Decimal)
+        #
         # Convert the self._counter's key:value to 2D numpy array
         # the array rows are (random variables, count)
         arr = self._to_2d_array_()
-        # filter the compliment random variables by columns
-        filtered_arr = np.c_[arr[:, comp_indices], arr[:, -1]]
+        # filter the random variables by columns
+        filtered_arr = np.c_[arr[:, indices], arr[:, -1]]
         # divide the 2d array's rows to a tuple of
-        # compliment variables (row[comp_indices])
-        # and count row[-1]
+        # variables (row[indices]) and count row[-1]
         arr_gen = self._split_matrix_(filtered_arr)
         # Before calling the groupby, we have to sort the generator
-        # by the tuple of compliment variables (index zero in itemgetter)
+        # by the tuple of variables (index zero in itemgetter)
         sorted_arr = sorted(arr_gen, key=itemgetter(0))
-        # since the values in each 'group' are
-        # (compliment variables, count)
-        # here we group by 'compliment variables' and sum
-        # the count. Then the dictionary of
-        # compliment variables:sum_of_counts
-        # is an acceptable argument for DiscreteDistribution
-        grouped_arr = {
+        return {
             k: sum([item[1] for item in g])
             for k, g in groupby(sorted_arr, key=itemgetter(0))
         }
-        return DiscreteDistribution(grouped_arr, names=self.rvs.names[comp_indices])
+
+    def _to_store_(self):
+        # Dictionary-encode the random variables, where the
+        # keys of one random variable are wrapped to tuples
+        return ColumnStore.from_items(
+            ((Key(k), v) for k, v in self.items()), self.rvs.size
+        )
+
+    @staticmethod
+    def _store_to_dict_(store):
+        """Convert a ColumnStore to a dictionary of (key:count)
+        where the key is a tuple, or a single value for
+        one random variable.
+        """
+        columns = [store.column(i).tolist() for i in range(len(store.codes))]
+        keys = columns[0] if len(columns) == 1 else zip(*columns)
+        return dict(zip(keys, store.values_list()))
 
     def reduce(self, **kwargs):
         """Reduce the distribution by one or more factors.
@@ -541,15 +579,18 @@ class DiscreteDistribution(EmpiricalDistribution):
             name for name in self.names if name in (set(self.names) & set(right.names))
         ]
         # When there is no common variable, it is just a simple product
+        # of independent distributions
         if len(commons) == 0:
             names = np.r_[self.names, right.names]
             return DiscreteDistribution(
-                {
-                    Key(k1) + Key(k2): v1 * v2
-                    for k1, v1 in self.items()
-                    for k2, v2 in right.items()
-                },
+                ProductCounter(
+                    [Key(k) for k in self._counter.keys()],
+                    list(self._counter.values()),
+                    [Key(k) for k in right._counter.keys()],
+                    list(right._counter.values()),
+                ),
                 names,
+                consistencies=False,
             )
         # In the case that there is one or more common variables,
         # the operation is similar to SQL inner join
@@ -569,6 +610,28 @@ class DiscreteDistribution(EmpiricalDistribution):
         right_complement_indices = [
             i for i, name in enumerate(right.names) if name not in commons
         ]
+        # names are the combination of [left_names, right_compelements_names]
+        combined_names = np.r_[
+            [name for name in self.names],
+            [name for name in right.names if name not in commons],
+        ]
+        if len(self._counter) + len(right._counter) >= self.sort_merge_min_rows:
+            try:
+                left_store = self._to_store_()
+                right_store = right._to_store_()
+            except ValueError:  # e.g. the values are not numeric
+                left_store = None
+            if left_store is not None:
+                store = left_store.join(
+                    right_store,
+                    left_common_indices,
+                    right_common_indices,
+                    right_complement_indices,
+                    np.multiply,
+                )
+                return DiscreteDistribution(
+                    self._store_to_dict_(store), combined_names, consistencies=False
+                )
         # Methods to split the keys
 
         def l_comm(key):
@@ -610,11 +673,6 @@ class DiscreteDistribution(EmpiricalDistribution):
                     prodcut_dict[Key(left_key) + Key(right_comp)] = (
                         left_value * right_value
                     )
-        # names are the combination of [left_names, right_compelements_names]
-        combined_names = np.r_[
-            [name for name in self.names],
-            [name for name in right.names if name not in commons],
-        ]
         return DiscreteDistribution(prodcut_dict, combined_names)
 
     def get_random_variable(self):
@@ -1,9 +1,18 @@
+from operator import methodcaller
 import numpy as np
 from probability2 import Key
 from probability2 import MultiDiscreteRV
+from probability.columnar import lookup_codes
+from probability.parallel import check_executor, map_ordered
 
 
 class ConditionalDistribution:
+    # The executor of the per conditional key operations,
+    # which is None for a sequential loop
+    _executor_ = None
+    _executor_batch_size_ = None
+    _executor_max_workers_ = None
+
     def __init__(self, distributions, conditional_names):
         """Create a conditional distributions.
 
@@ -24,6 +33,10 @@ class ConditionalDistribution:
         first_example_dist = self.distributions[first_key]
         self.rvs = first_example_dist.rvs
         self.names = first_example_dist.names
+        # The array-backed counts, which are built on the first
+        # batch lookup and rebuilt when the distributions change
+        self._arrays_ = None
+        self._arrays_state_ = None
 
     def probability(self, key, conditional_key):
         if conditional_key not in self.distributions:
@@ -31,12 +44,168 @@ class ConditionalDistribution:
         else:
             return self.distributions[conditional_key].probability(key)
 
+    def _to_arrays_(self):
+        """Builds a table of (conditional levels x levels) of counts.
+
+           When the table is dense enough, it is a 2D array. Otherwise,
+           it is kept in a compressed form: the sorted flat indices of
+           the observed cells and their counts.
+
+        Returns:
+            tuple: (conditional_lookup, lookup, totals, cells, counts) where
+                   'cells' is None for the 2D array of 'counts'.
+        """
+        state = self._state_()
+        if self._arrays_ is not None and self._arrays_state_ == state:
+            return self._arrays_
+        conditional_lookup = {}
+        lookup = {}
+        rows = []
+        columns = []
+        values = []
+        totals = []
+        for conditional_key, distribution in self.distributions.items():
+            row = conditional_lookup.setdefault(conditional_key, len(conditional_lookup))
+            totals.append(distribution.total)
+            for key, value in distribution.items():
+                rows.append(row)
+                columns.append(lookup.setdefault(key, len(lookup)))
+                values.append(value)
+        rows = np.array(rows, dtype=np.int64)
+        columns = np.array(columns, dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        shape = (len(conditional_lookup), len(lookup))
+        if shape[0] * shape[1] <= 2 * len(values):
+            counts = np.zeros(shape, dtype=np.float64)
+            counts[rows, columns] = values
+            cells = None
+        else:
+            cells = rows * shape[1] + columns
+            order = np.argsort(cells, kind="stable")
+            cells = cells[order]
+            counts = values[order]
+        self._arrays_ = (
+            conditional_lookup,
+            lookup,
+            np.array(totals, dtype=np.float64),
+            cells,
+            counts,
+        )
+        self._arrays_state_ = state
+        return self._arrays_
+
+    def _state_(self):
+        # The distributions and their versions, which change when
+        # a distribution is added or replaced, or its counts change
+        return tuple(
+            (conditional_key, id(distribution), distribution._version_)
+            for conditional_key, distribution in self.distributions.items()
+        )
+
+    def probability_batch(self, keys, conditional_keys):
+        """Gets the probabilities of many (key, conditional_key)
+           pairs in one vectorized call.
+
+           The probability is zero if the key or conditional key
+           is not observed. The array-backed counts are built on
+           the first call and are rebuilt when a distribution is
+           added, replaced or changed (e.g. by its normalise).
+
+        Args:
+            keys (list or numpy.ndarray):
+                The values of the random variables, as a list of
+                keys, a 1D array or a 2D array of rows.
+            conditional_keys (list or numpy.ndarray):
+                The values of the conditioned random variables, in
+                the same format as 'keys'.
+
+        Raises:
+            ValueError: Raises when the lengths of keys and
+                        conditional keys are not the same.
+
+        Returns:
+            numpy.ndarray: The probabilities.
+        """
+        if len(keys) != len(conditional_keys):
+            raise ValueError(
+                "The lengths of 'keys' and 'conditional_keys' are not the same."
+            )
+        conditional_lookup, lookup, totals, cells, counts = self._to_arrays_()
+        rows = lookup_codes(conditional_keys, conditional_lookup)
+        columns = lookup_codes(keys, lookup)
+        found = (rows >= 0) & (columns >= 0)
+        rows = rows[found]
+        columns = columns[found]
+        if cells is None:
+            found_counts = counts[rows, columns]
+        else:
+            flat = rows * len(lookup) + columns
+            positions = np.searchsorted(cells, flat)
+            positions[positions == len(cells)] = 0
+            found_counts = np.where(cells[positions] == flat, counts[positions], 0)
+        row_totals = totals[rows]
+        probabilities = np.zeros(len(found))
+        # Like DiscreteDistribution.probability, zero totals give zeros
+        probabilities[found] = np.divide(
+            found_counts,
+            row_totals,
+            out=np.zeros(len(rows)),
+            where=row_totals != 0,
+        )
+        return probabilities
+
     def frequency(self, key, conditional_key, normalised=False):
         if conditional_key not in self.distributions:
             return 0
         else:
             return self.distributions[conditional_key].frequency(key, normalised)
 
+    def set_executor(self, executor=None, batch_size=None, max_workers=None):
+        """Sets the executor that runs the operations (marginal and
+           condition_on) of the distributions in parallel. The
+           resulting ConditionalDistributions use the same executor.
+
+        Args:
+            executor (str or Executor, optional):
+                "thread", "process", an instance of
+                concurrent.futures.Executor or None for the
+                sequential loop. Defaults to None.
+            batch_size (int, optional):
+                Number of distributions in each task. Defaults to None,
+                which is four tasks per worker.
+            max_workers (int, optional): Number of workers of the
+                created executors. Defaults to None.
+
+        Raises:
+            ValueError: Raises when the executor is not known or
+                        the batch size is less than one.
+        """
+        check_executor(executor)
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("The batch size must be at least one.")
+        self._executor_ = executor
+        self._executor_batch_size_ = batch_size
+        self._executor_max_workers_ = max_workers
+
+    def _map_distributions_(self, method, *args):
+        # Calls the method on each distribution, in the
+        # order of conditional keys
+        items = list(self.items())
+        results = map_ordered(
+            methodcaller(method, *args),
+            [distribution for _, distribution in items],
+            self._executor_,
+            self._executor_batch_size_,
+            self._executor_max_workers_,
+        )
+        return [(key, result) for (key, _), result in zip(items, results)]
+
+    def _with_executor_(self, distribution):
+        distribution.set_executor(
+            self._executor_, self._executor_batch_size_, self._executor_max_workers_
+        )
+        return distribution
+
     def summary(self):
         return (
             "Discrete conditional distribution \n"
@@ -66,11 +235,11 @@ class ConditionalDistribution:
                     f"Random variable {name} is not defined."
                     "(Maybe it is a conditional one?)"
                 )
-        new_distributions = {}
-        for conditional_key, distribution in self.items():
-            new_distributions[conditional_key] = distribution.marginal(by_names)
+        new_distributions = dict(self._map_distributions_("marginal", *by_names))
 
-        return ConditionalDistribution(new_distributions, self.conditional_rvs.names)
+        return self._with_executor_(
+            ConditionalDistribution(new_distributions, self.conditional_rvs.names)
+        )
 
     def condition_on(self, on_names):
         for name in on_names:
@@ -82,18 +251,20 @@ class ConditionalDistribution:
         # per each conditional key, we must create a
         # new conditioned distribution
         new_distributions = {}
-        for conditional_key, distribution in self.items():
-            # here, the new conditioned distribution per key is made
-            conditioned_one = distribution.condition_on(on_names)
+        # here, the new conditioned distribution per key is made
+        conditioned = self._map_distributions_("condition_on", *on_names)
+        for conditional_key, conditioned_one in conditioned:
             # loop over all newely conditioned distribution's distributions
             # and combine their conditional keys with the self distribution
             # to create a new distributions dictionary
             for new_key, new_distribution in conditioned_one.items():
-                combined_key = Key(conditional_key) * Key(new_key)
+                combined_key = Key(conditional_key) + Key(new_key)
                 new_distributions[combined_key] = new_distribution
 
-        return ConditionalDistribution(
-            new_distributions, np.r_[self.conditional_rvs.names, on_names]
+        return self._with_executor_(
+            ConditionalDistribution(
+                new_distributions, np.r_[self.conditional_rvs.names, on_names]
+            )
         )
 
     def keys(self):
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import numpy as np
 from probability2 import Distribution
 from probability2.empirical_distributions import EmpiricalDistribution
 from probability2.empirical_distributions import FrequencyTable
@@ -28,6 +29,12 @@ class Inferrer(ABC):
     def probability(self, key):
         pass
 
+    def probability_batch(self, keys):
+        """Gets the probabilities of many keys as a numpy array.
+           The subclasses can override it by a vectorized lookup.
+        """
+        return np.array([self.probability(key) for key in keys], dtype=np.float64)
+
 
 class Multinomial(Distribution):
     def __init__(self, inferrer):
@@ -53,6 +60,19 @@ class Multinomial(Distribution):
     def probability(self, key):
         return self.inferrer.probability(key)
 
+    def probability_batch(self, keys):
+        """Gets the probabilities of many keys in one call.
+
+        Args:
+            keys (list or numpy.ndarray):
+                List of keys, a 1D array of keys or a 2D
+                array of rows for multi-level samples.
+
+        Returns:
+            numpy.ndarray: The probabilities.
+        """
+        return self.inferrer.probability_batch(keys)
+
     def __rmul__(self, that):
         # Always rely on the left-multiplication
         return that.__mul__(self)
@@ -1,3 +1,5 @@
+import numpy as np
+from probability.columnar import lookup_codes
 from probability2.inference import Inferrer
 
 
@@ -5,12 +7,35 @@ class MultinomialMLEInferrer(Inferrer):
     def __init__(self, empirical_distribution):
         super().__init__(empirical_distribution)
         # Maximum Likelihood estimation
-        theta_hats = [self.__ed__.probability(level) for level in self.__ed__.keys()]
+        levels = list(self.__ed__.keys())
+        theta_hats = [self.__ed__.probability(level) for level in levels]
         self.thetas = theta_hats
+        # (level: index) of the levels in thetas
+        self.levels_indices = {level: i for i, level in enumerate(levels)}
+        # (level: theta) for the O(1) lookups
+        self.levels_thetas = dict(zip(levels, theta_hats))
+        # The dense array of thetas for the batch lookups
+        self._thetas_array_ = np.array(theta_hats, dtype=np.float64)
 
     def probability(self, key):
-        indices = [i for i, level in enumerate(self.__ed__.keys()) if level == key]
-        if len(indices) == 0:
+        try:
+            return self.levels_thetas.get(key, 0)
+        except TypeError:
+            # Unhashable keys are never observed levels
             return 0
 
-        return self.thetas[indices[0]]
+    def probability_batch(self, keys):
+        """Gets the probabilities of many keys in one vectorized call.
+           The probability of a level that is not observed is zero.
+
+        Args:
+            keys (list or numpy.ndarray):
+                List of keys, a 1D array of keys or a 2D
+                array of rows for multi-level samples.
+
+        Returns:
+            numpy.ndarray: The probabilities.
+        """
+        indices = lookup_codes(keys, self.levels_indices)
+        # -1 is the index of missing levels
+        return np.where(indices >= 0, self._thetas_array_[indices], 0.0)
@@ -0,0 +1,124 @@
+import pytest
+import numpy as np
+from pytest import approx
+from probability import Table
+from probability import VariableElimination
+from information_theory.chow_liu import ChowLiuTree
+from information_theory.chow_liu import maximum_spanning_tree
+
+
+def _chain_samples_(size=4000, seed=7):
+    # X1 -> X2 -> X3 chain, where X2 is a noisy copy of X1 and
+    # X3 is a noisy copy of X2, so X1 and X3 are not adjacent.
+    rng = np.random.default_rng(seed)
+    x1 = rng.integers(0, 3, size)
+    x2 = np.where(rng.random(size) < 0.9, x1, rng.integers(0, 3, size))
+    x3 = np.where(rng.random(size) < 0.8, x2, rng.integers(0, 3, size))
+    return np.column_stack([x1, x3, x2])
+
+
+def test_maximum_spanning_tree():
+    weights = np.array(
+        [
+            [0.0, 1.0, 5.0, 0.5],
+            [1.0, 0.0, 2.0, 4.0],
+            [5.0, 2.0, 0.0, 0.1],
+            [0.5, 4.0, 0.1, 0.0],
+        ]
+    )
+    assert maximum_spanning_tree(weights) == [(0, 2), (2, 1), (1, 3)]
+    assert maximum_spanning_tree(weights, root=3) == [(3, 1), (1, 2), (2, 0)]
+
+
+def test_chow_liu_structure():
+    tree = ChowLiuTree(_chain_samples_(), names=["X1", "X3", "X2"])
+    assert set(tree.names) == {"X1", "X2", "X3"}
+    assert tree.parent("X1") is None
+    assert tree.parent("X2") == "X1"
+    assert tree.parent("X3") == "X2"
+
+    tree = ChowLiuTree(_chain_samples_(), names=["X1", "X3", "X2"], root="X3")
+    assert tree.parent("X3") is None
+    assert tree.parent("X2") == "X3"
+    assert tree.parent("X1") == "X2"
+
+    with pytest.raises(ValueError):
+        ChowLiuTree(_chain_samples_(), names=["X1", "X2"])
+    with pytest.raises(ValueError):
+        ChowLiuTree(_chain_samples_(), root="X4")
+
+
+def test_chow_liu_probability():
+    samples = _chain_samples_()
+    tree = ChowLiuTree(samples)
+    # The tree is X1 -> X3 -> X2 for the default names,
+    # so P(x1, x3, x2) = P(x1) P(x3 | x1) P(x2 | x3)
+    x1, x2, x3 = samples[:, 0], samples[:, 1], samples[:, 2]
+    for key in [(0, 0, 0), (1, 2, 1), (2, 0, 1)]:
+        p_x1 = np.mean(x1 == key[0])
+        p_x3 = np.sum((x1 == key[0]) & (x3 == key[2])) / np.sum(x1 == key[0])
+        p_x2 = np.sum((x3 == key[2]) & (x2 == key[1])) / np.sum(x3 == key[2])
+        assert tree.probability(key) == approx(p_x1 * p_x3 * p_x2)
+
+    # The probabilities of all the keys sum to one
+    keys = np.array([(i, j, k) for i in range(3) for j in range(3) for k in range(3)])
+    assert np.exp(tree.log_likelihood(keys)).sum() == approx(1)
+
+    # Vectorized log-likelihood is the same as the probability
+    log_likelihoods = tree.log_likelihood(samples[:50])
+    assert log_likelihoods == approx(
+        [np.log(tree.probability(row)) for row in samples[:50].tolist()]
+    )
+    # Unseen levels have zero probability
+    assert tree.log_likelihood([[0, 5, 0], [0, 0, 0]])[0] == -np.inf
+    assert tree.probability((0, 5, 0)) == 0
+    with pytest.raises(ValueError):
+        tree.log_likelihood([[0, 0]])
+
+
+def test_chow_liu_from_table():
+    samples = _chain_samples_().tolist()
+    counts = {}
+    for row in samples:
+        key = tuple(["abc"[v] for v in row])
+        counts[key] = counts.get(key, 0) + 1
+    table = Table(counts, ["X1", "X3", "X2"])
+    tree = ChowLiuTree(table)
+    assert tree.names == ["X1", "X3", "X2"]
+    assert tree.parent("X2") == "X1"
+    assert tree.parent("X3") == "X2"
+
+    samples_tree = ChowLiuTree(np.array(samples), names=["X1", "X3", "X2"])
+    assert tree.probability(("a", "b", "c")) == approx(
+        samples_tree.probability((0, 1, 2))
+    )
+    assert tree.log_likelihood(np.array([["a", "b", "c"], ["b", "b", "b"]])) == approx(
+        samples_tree.log_likelihood(np.array([[0, 1, 2], [1, 1, 1]]))
+    )
+
+
+def test_chow_liu_factors():
+    tree = ChowLiuTree(_chain_samples_(), names=["X1", "X3", "X2"])
+    factors = tree.factors()
+    assert len(factors) == 3
+    assert factors[0].names == ["X1"]
+    assert sum(factors[0].values()) == approx(1)
+
+    # The product of the factors is the joint of the tree
+    ve = VariableElimination(factors)
+    joint = ve.query("X1", "X2", "X3")
+    for (x1, x2, x3), p in joint.items():
+        assert p == approx(tree.probability((x1, x3, x2)))
+    # and the marginals are the marginals of the data
+    x2 = ve.query("X2")
+    assert x2[1] == approx(np.mean(_chain_samples_()[:, 2] == 1))
+
+
+def test_chow_liu_mixed_types():
+    samples = {("a", 1, True): 3.0, ("b", 2, False): 1.0, ("a", 2, True): 2.0}
+    tree = ChowLiuTree(Table(samples, ["A", "B", "C"]))
+    for key in samples:
+        assert tree.probability(key) > 0
+    assert tree.probability(("c", 1, True)) == 0
+    log_likelihoods = tree.log_likelihood([list(key) for key in samples])
+    assert np.all(np.isfinite(log_likelihoods))
@@ -1,8 +1,22 @@
+from collections import Counter
+import pytest
 import numpy as np
 from pytest import approx
+from probability import Table
+from probability import FrequencyTable as FrequencyTableP
 from probability2.empirical_distributions import FrequencyTable
 from probability2.empirical_distributions import DiscreteDistribution
 from information_theory.measures import entropy
+from information_theory.measures import conditional_entropy
+from information_theory.measures import mutual_information
+from information_theory.measures import kl_divergence
+from information_theory.measures import js_divergence
+from information_theory.measures import entropy_batch
+from information_theory.measures import conditional_entropy_batch
+from information_theory.measures import mutual_information_batch
+from information_theory.measures import kl_divergence_batch
+from information_theory.measures import js_divergence_batch
+from information_theory.measures import mutual_information_matrix
 
 
 def test_entropy():
@@ -35,3 +49,154 @@ def test_entropy():
     samples = {(1, 2): 150, (1, 3): 150, (2, 2): 300, (2, 3): 400}
     dd = DiscreteDistribution(samples)
     assert entropy(dd) == approx(1.8709505945)
+
+
+def counts_entropy(counts):
+    probabilities = np.array([c for c in counts if c > 0]) / sum(counts)
+    return -np.sum(probabilities * np.log2(probabilities))
+
+
+samples = {
+    (x, y, z): (x + 1) * (y + 2) * (1 + (x == z))
+    for x in range(3)
+    for y in range(2)
+    for z in range(3)
+}
+
+
+def marginal_counts(*indices):
+    counts = Counter()
+    for key, value in samples.items():
+        counts[tuple(key[i] for i in indices)] += value
+    return list(counts.values())
+
+
+def test_measures_table_and_discrete_distribution():
+    h_xz = counts_entropy(marginal_counts(0, 2))
+    h_x = counts_entropy(marginal_counts(0))
+    h_z = counts_entropy(marginal_counts(2))
+    for dist in [
+        Table(samples, names=["X", "Y", "Z"]),
+        Table(samples, names=["X", "Y", "Z"]).to_log(),
+        DiscreteDistribution(samples, names=["X", "Y", "Z"]),
+    ]:
+        assert entropy(dist, names=["X", "Y", "Z"]) == approx(
+            counts_entropy(samples.values())
+        )
+        assert entropy(dist, names=["Z"]) == approx(h_z)
+        assert conditional_entropy(dist, "Z", "X") == approx(h_xz - h_x)
+        assert conditional_entropy(dist, ["Z"], ["X", "Y"]) == approx(
+            counts_entropy(samples.values()) - counts_entropy(marginal_counts(0, 1))
+        )
+        assert mutual_information(dist, "X", "Z") == approx(h_x + h_z - h_xz)
+        assert mutual_information(dist, "Z", "X") == approx(h_x + h_z - h_xz)
+        # Y is independent of X
+        assert mutual_information(dist, "X", "Y") == approx(0, abs=1e-12)
+        with pytest.raises(ValueError):
+            mutual_information(dist, "X", ["X", "Y"])
+        with pytest.raises(ValueError):
+            conditional_entropy(dist, "X", "W")
+    assert entropy(Table(samples, names=["X", "Y", "Z"])) == approx(
+        counts_entropy(samples.values())
+    )
+
+
+def test_divergences():
+    p = Table({"a": 1, "b": 3}, names=["X"])
+    q = Table({"b": 1, "a": 1, "c": 2}, names=["X"])
+    assert kl_divergence(p, q) == approx(0.25 * np.log2(1) + 0.75 * np.log2(3))
+    assert kl_divergence(q, p) == np.inf
+    assert kl_divergence(p, p) == approx(0)
+    m = {"a": 0.25, "b": 0.5, "c": 0.25}
+    js = counts_entropy(m.values()) - (
+        counts_entropy([1, 3]) + counts_entropy([1, 1, 2])
+    ) / 2
+    assert js_divergence(p, q) == approx(js)
+    assert js_divergence(q, p) == approx(js)
+    # The order of columns and levels do not matter
+    p = DiscreteDistribution({("a", 1): 1, ("b", 2): 3}, names=["X", "Y"])
+    q = Table({(2, "b"): 1, (1, "a"): 3}, names=["Y", "X"])
+    assert kl_divergence(p, q) == approx(0.25 * np.log2(1 / 3) + 0.75 * np.log2(3))
+    with pytest.raises(ValueError):
+        kl_divergence(p, Table({"a": 1}, names=["X"]))
+
+
+def test_batch_measures():
+    rng = np.random.default_rng(0)
+    joints = rng.integers(0, 5, size=(20, 3, 4))
+    joints[0] = 0
+    flat = joints.reshape(20, -1)
+    expected = [counts_entropy(row) if sum(row) else 0 for row in flat.tolist()]
+    assert entropy_batch(flat) == approx(expected)
+    for i, joint in enumerate(joints[1:], 1):
+        table = Table(
+            {(x, y): joint[x, y] for x in range(3) for y in range(4)}, names=["X", "Y"]
+        )
+        assert mutual_information_batch(joints)[i] == approx(
+            mutual_information(table, "X", "Y")
+        )
+        assert conditional_entropy_batch(joints)[i] == approx(
+            conditional_entropy(table, "X", "Y")
+        )
+    p = flat[1:10]
+    q = flat[10:19] + 1
+    p_normalised = p / p.sum(axis=1, keepdims=True)
+    q_normalised = q / q.sum(axis=1, keepdims=True)
+    expected = [
+        np.sum(np.where(a > 0, a * np.log2(a / b), 0))
+        for a, b in zip(p_normalised, q_normalised)
+    ]
+    assert kl_divergence_batch(p, q) == approx(expected)
+    assert js_divergence_batch(p, q) == approx(js_divergence_batch(q, p))
+    assert np.all(js_divergence_batch(p, q) <= 1)
+
+
+def test_mutual_information_matrix():
+    rng = np.random.default_rng(1)
+    data = rng.integers(0, 4, size=(3000, 5))
+    data[:, 3] = (data[:, 0] + rng.integers(0, 2, size=3000)) % 4
+    expected = mutual_information_matrix(data, processes=1)
+    assert expected.shape == (5, 5)
+    assert np.allclose(expected, expected.T)
+    assert np.allclose(mutual_information_matrix(data, processes=2), expected)
+
+    table = FrequencyTableP.from_np_array(data, names=["A", "B", "C", "D", "E"])
+    assert np.allclose(mutual_information_matrix(table, processes=2), expected)
+    assert expected[0, 3] == approx(mutual_information(table, "A", "D"))
+    assert expected[2, 4] == approx(mutual_information(table, "C", "E"))
+    assert expected[1, 1] == approx(entropy(table, names=["B"]))
+    # Not integer samples are encoded by their levels
+    assert np.allclose(
+        mutual_information_matrix(data.astype(str), processes=1), expected
+    )
+    distribution = DiscreteDistribution.from_np_array(data)
+    assert np.allclose(mutual_information_matrix(distribution, processes=1), expected)
+
+    with pytest.raises(ValueError):
+        mutual_information_matrix(data[:, 0])
+
+
+def test_mutual_information_matrix_large_ids():
+    rng = np.random.default_rng(2)
+    data = rng.integers(0, 4, size=(1000, 3))
+    data[:, 2] = data[:, 0]
+    expected = mutual_information_matrix(data, processes=1)
+    # The sparse IDs are encoded by their levels, not used as codes
+    ids = data * 400_000_000 + 12345
+    assert np.allclose(mutual_information_matrix(ids, processes=1), expected)
+    assert expected[0, 2] == approx(expected[0, 0])
+
+
+def test_mutual_information_matrix_high_cardinality():
+    rng = np.random.default_rng(3)
+    size = 200_000
+    x = rng.random(size)
+    z = rng.integers(0, 4, size)
+    # 2 * 10^5 levels in two columns, which would be
+    # 4 * 10^10 cells of the dense contingency counts
+    data = np.column_stack([x, x * 2, z])
+    matrix = mutual_information_matrix(data)
+    assert matrix[0, 1] == approx(np.log2(size))
+    assert matrix[0, 2] == approx(matrix[2, 2])
+    expected = mutual_information_matrix(np.column_stack([z, z]), processes=1)
+    assert matrix[2, 2] == approx(expected[0, 1])
@@ -0,0 +1,67 @@
+from collections import Counter
+import pytest
+import numpy as np
+from pytest import approx
+from probability2.empirical_distributions import DiscreteDistribution
+from information_theory.measures import entropy
+from information_theory.sketches import EntropySketch
+
+
+@pytest.mark.parametrize("levels", [2, 10, 1000, 20000])
+def test_entropy_sketch_accuracy(levels):
+    rng = np.random.default_rng(levels)
+    samples = rng.zipf(1.5, 100000) % levels
+    exact = entropy(DiscreteDistribution(samples.tolist()))
+
+    sketch = EntropySketch(size=2048)
+    sketch.update(samples)
+    assert sketch.total == len(samples)
+    # The standard error is about 1.5 / sqrt(2048) nats
+    assert sketch.entropy() == approx(exact, abs=0.2)
+    assert sketch.entropy(unit=np.e) == approx(exact * np.log(2), abs=0.15)
+
+
+def test_entropy_sketch_inputs():
+    samples = ["a", "a", "b", "c", "c", "c", "d"]
+    exact = entropy(DiscreteDistribution(samples))
+
+    sketch = EntropySketch(size=2048, samples=samples)
+    assert sketch.entropy() == approx(exact, abs=0.2)
+
+    # Counts, arrays and single keys give the same sketch
+    from_counts = EntropySketch(size=2048, samples=Counter(samples))
+    assert from_counts.entropy() == approx(sketch.entropy())
+    from_adds = EntropySketch(size=2048)
+    for key in samples:
+        from_adds.add(key)
+    assert from_adds.entropy() == approx(sketch.entropy())
+
+    integers = np.array([1, 1, 2, 3, 3, 3])
+    from_array = EntropySketch(size=2048, samples=integers)
+    from_list = EntropySketch(size=2048, samples=integers.tolist())
+    assert from_array.entropy() == approx(from_list.entropy())
+
+    assert EntropySketch().entropy() == 0
+    with pytest.raises(ValueError):
+        EntropySketch(size=0)
+
+
+def test_entropy_sketch_merge():
+    rng = np.random.default_rng(3)
+    samples = rng.integers(0, 500, 30000)
+    sketch = EntropySketch(size=512, samples=samples)
+
+    shards = [EntropySketch(size=512, samples=shard) for shard in np.split(samples, 3)]
+    merged = shards[0].merge(shards[1]).merge(shards[2])
+    assert merged.total == sketch.total
+    assert merged.entropy() == approx(sketch.entropy())
+    # associative and commutative
+    other = shards[2].merge(shards[0].merge(shards[1]))
+    assert other.entropy() == approx(merged.entropy())
+
+    with pytest.raises(ValueError):
+        sketch.merge(EntropySketch(size=256))
+    with pytest.raises(ValueError):
+        sketch.merge(EntropySketch(size=512, seed=1))
+    with pytest.raises(ValueError):
+        sketch.merge(Counter(samples.tolist()))
@@ -237,3 +237,70 @@ def test_classification_matrix_matthews_corrcoef():
     # Check the zero denominator
     matrix = ClassificationMatrix([1, 1, 1, 0], [1, 1, 1, 1])
     assert matrix.matthews_corrcoef() == np.inf
+
+
+def test_classification_matrix_numpy():
+    rng = np.random.default_rng(0)
+    classes = np.array(["A", "B", "C", "D"])
+    targets = classes[rng.integers(0, 4, 500)]
+    predictions = np.where(rng.random(500) < 0.7, targets, classes[rng.integers(0, 4, 500)])
+
+    matrix = ClassificationMatrix(predictions, targets)
+    expected = ClassificationMatrix(predictions.tolist(), targets.tolist())
+    assert matrix.class_symbol == targets[0]
+    assert matrix.classes == expected.classes
+    for t in classes:
+        for p in classes:
+            assert (
+                matrix.conf_matrix[matrix.classes_lookup[t], matrix.classes_lookup[p]]
+                == expected.conf_matrix[
+                    expected.classes_lookup[t], expected.classes_lookup[p]
+                ]
+            )
+        assert matrix.precision(t) == expected.precision(t)
+        assert matrix.recall(t) == expected.recall(t)
+        assert matrix.f1(t) == expected.f1(t)
+    assert matrix.accuracy() == expected.accuracy()
+
+    with pytest.raises(ValueError):
+        ClassificationMatrix(predictions[:-1], targets)
+
+
+def test_classification_matrix_from_codes():
+    targets = np.array([1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0])
+    predictions = np.array([1, 1, 1, 1, 1, 0, 0, 1, 0, 0, 1, 0])
+    matrix = ClassificationMatrix.from_codes(predictions, targets, ["no", "yes"])
+    assert matrix.class_symbol == "yes"
+    assert matrix.classes_lookup == {"no": 0, "yes": 1}
+    assert matrix.conf_matrix.tolist() == [[3, 1], [2, 6]]
+    assert matrix.accuracy() == 9 / 12
+    assert matrix.precision() == 6 / 7
+    assert matrix.recall() == 6 / 8
+    assert matrix.specificity() == 3 / 4
+    assert matrix.precision("no") == 3 / 5
+
+    with pytest.raises(ValueError):
+        ClassificationMatrix.from_codes(predictions, targets[:-1], ["no", "yes"])
+    with pytest.raises(ValueError):
+        ClassificationMatrix.from_codes(predictions + 1, targets, ["no", "yes"])
+    with pytest.raises(ValueError):
+        ClassificationMatrix.from_codes(predictions * 0.5, targets, ["no", "yes"])
+    with pytest.raises(ValueError):
+        ClassificationMatrix.from_codes([], [], ["no", "yes"])
+
+
+def test_classification_matrix_numpy_integers():
+    targets = np.array([7, 7, 7, -1, -1, 3])
+    predictions = np.array([7, -1, 7, -1, 3, 3])
+    matrix = ClassificationMatrix(predictions, targets)
+    assert matrix.class_symbol == 7
+    assert matrix.classes_lookup == {-1: 0, 3: 1, 7: 2}
+    assert matrix.conf_matrix.tolist() == [[1, 1, 0], [0, 1, 0], [1, 0, 2]]
+    assert matrix.accuracy() == 4 / 6
+
+
+def test_classification_matrix_numpy_different_dtypes():
+    # '1' and 1 are different classes
+    matrix = ClassificationMatrix(np.array(["1", "2"]), np.array([1, 2]))
+    assert matrix.accuracy() == 0
+    assert len(matrix.classes) == 4
@@ -0,0 +1,106 @@
+import pytest
+from pytest import approx
+from probability import Table
+from probability import DenseTable
+from tests.helpers import compare
+
+sample_1 = {
+    ("a", "x", 1): 1,
+    ("a", "x", 2): 2,
+    ("a", "y", 1): 3,
+    ("a", "y", 2): 4,
+    ("b", "x", 1): 5,
+    ("b", "x", 2): 6,
+    ("b", "y", 1): 7,
+    # ("b", "y", 2): 8,
+}
+
+sample_2 = {
+    (1, "high"): 1,
+    (1, "low"): 2,
+    (2, "high"): 3,
+    # (2, "low"): 4,
+    (3, "high"): 5,
+}
+
+
+def sparse_product(left, right):
+    (rows, names) = left._product_(right)
+    return Table(rows, names, _internal_=True)
+
+
+def test_to_dense_table():
+    table = Table(sample_1, names=["X1", "X2", "X3"])
+    assert table.fill_ratio() == 7 / 8
+    dense = table.to_dense()
+    assert isinstance(dense, DenseTable)
+    assert dense.array.shape == (2, 2, 2)
+    assert all(compare(dense.names, ["X1", "X2", "X3"]))
+    assert dense.total() == 28
+    assert dense.fill_ratio() == 7 / 8
+
+    table2 = Table.from_dense(dense)
+    assert table2 == table
+    assert table2["b", "y", 2] is None
+
+
+def test_product_dense_table():
+    table1 = Table(sample_1, names=["X1", "X2", "X3"])
+    table2 = Table(sample_2, names=["X3", "X4"])
+
+    dense_product = Table.from_dense(table1.to_dense() * table2.to_dense())
+    assert all(compare(dense_product.names, ["X1", "X2", "X3", "X4"]))
+    assert dense_product == sparse_product(table1, table2)
+    assert dense_product["a", "y", 2, "high"] == 12
+    assert dense_product["a", "y", 2, "low"] is None
+    # The level 3 is not in the left
+    assert dense_product["a", "y", 3, "high"] is None
+
+    # without common columns
+    table2 = Table(sample_2, names=["Y1", "Y2"])
+    dense_product = Table.from_dense(table1.to_dense() * table2.to_dense())
+    assert dense_product == sparse_product(table1, table2)
+
+
+def test_automatic_dense_product_table():
+    table1 = Table(sample_1, names=["X1", "X2", "X3"])
+    table2 = Table(sample_2, names=["X3", "X4"])
+    # dense enough
+    product = table1 * table2
+    assert product.is_columnar()
+    assert product == sparse_product(table1, table2)
+    product = table2 * table1
+    assert product.is_columnar()
+    assert product == sparse_product(table2, table1)
+    # sparse
+    table1.dense_fill_ratio = 0.9
+    product = table1 * table2
+    assert not product.is_columnar()
+    assert product == sparse_product(table1, table2)
+
+
+def test_marginal_and_reduce_dense_table():
+    table = Table(sample_1, names=["X1", "X2", "X3"])
+    dense = table.to_dense()
+
+    with pytest.raises(ValueError):
+        dense.marginal("X1", "X2", "X3")
+
+    with pytest.raises(ValueError):
+        dense.marginal("X5")
+
+    with pytest.raises(ValueError):
+        dense.reduce(X1="a", X2="x", X3=1)
+
+    marginal = Table.from_dense(dense.marginal("X2", normalise=False))
+    assert marginal == table.marginal("X2", normalise=False)
+    marginal = Table.from_dense(dense.marginal("X1", "X3"))
+    assert marginal["x"] == approx(14 / 28)
+    assert marginal["y"] == approx(14 / 28)
+
+    reduced = Table.from_dense(dense.reduce(X2="y"))
+    assert reduced == table.reduce(X2="y")
+    assert reduced["b", 2] is None
+
+    reduced = Table.from_dense(dense.reduce(X2="z"))
+    assert len(reduced) == 0
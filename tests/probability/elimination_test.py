@@ -0,0 +1,142 @@
+import pytest
+import numpy as np
+from pytest import approx
+from probability import Table
+from probability import VariableElimination
+from probability.elimination import to_factor
+from tests.helpers import compare
+
+# A -> B -> C, A -> D <- C
+p_a = Table({"a0": 0.6, "a1": 0.4}, names=["A"])
+p_b_a = Table(
+    {("b0", "a0"): 0.7, ("b1", "a0"): 0.3, ("b0", "a1"): 0.2, ("b1", "a1"): 0.8},
+    names=["B", "A"],
+).condition_on("A")
+p_c_b = Table(
+    {("c0", "b0"): 0.9, ("c1", "b0"): 0.1, ("c0", "b1"): 0.4, ("c1", "b1"): 0.6},
+    names=["C", "B"],
+).condition_on("B")
+p_d_ac = Table(
+    {
+        ("d0", "a0", "c0"): 0.5,
+        ("d1", "a0", "c0"): 0.5,
+        ("d0", "a0", "c1"): 0.1,
+        ("d1", "a0", "c1"): 0.9,
+        ("d0", "a1", "c0"): 0.3,
+        ("d1", "a1", "c0"): 0.7,
+        ("d0", "a1", "c1"): 0.8,
+        ("d1", "a1", "c1"): 0.2,
+    },
+    names=["D", "A", "C"],
+).condition_on("A", "C")
+
+
+def joint():
+    table = p_a * to_factor(p_b_a)
+    table = table * to_factor(p_c_b)
+    return table * to_factor(p_d_ac)
+
+
+def test_elimination_exceptions():
+    engine = VariableElimination([p_a, p_b_a, p_c_b, p_d_ac])
+    with pytest.raises(ValueError):
+        VariableElimination([])
+    with pytest.raises(ValueError):
+        engine.query()
+    with pytest.raises(ValueError):
+        engine.query("E")
+    with pytest.raises(ValueError):
+        engine.query("A", evidence={"A": "a0"})
+    with pytest.raises(ValueError):
+        engine.query("A", heuristic="max-fill")
+    with pytest.raises(ValueError):
+        engine.query("A", heuristic=["B"])
+
+
+def test_elimination_order():
+    engine = VariableElimination([p_a, p_b_a, p_c_b, p_d_ac])
+    assert all(compare(engine.elimination_order(["B"]), ["B"]))
+    order = engine.elimination_order(["A", "B", "C", "D"], heuristic="min-degree")
+    assert all(compare(order, ["B", "A", "C", "D"]))
+    order = engine.elimination_order(["A", "B", "C", "D"], heuristic="min-fill")
+    assert all(compare(order, ["B", "A", "C", "D"]))
+    # a chain must be eliminated from its ends
+    order = engine.elimination_order(
+        ["X2", "X3", "X4"], factors_names=[["X1", "X2"], ["X2", "X3"], ["X3", "X4"]]
+    )
+    assert all(compare(order, ["X4", "X3", "X2"]))
+
+
+@pytest.mark.parametrize("heuristic", ["min-fill", "min-degree", ["C", "B", "A"]])
+def test_elimination_query(heuristic):
+    engine = VariableElimination([p_a, p_b_a, p_c_b, p_d_ac])
+    full = joint()
+
+    if isinstance(heuristic, list):
+        evidence = {}
+        result = engine.query("D", heuristic=heuristic)
+        expected = full.marginal("A", "B", "C")
+    else:
+        evidence = {"D": "d1"}
+        result = engine.query("B", evidence=evidence, heuristic=heuristic)
+        expected = full.reduce(D="d1").marginal("A", "C")
+    assert len(result) == len(expected)
+    for key, value in expected.items():
+        assert result[key] == approx(value)
+
+    # The order of the query columns is kept
+    result = engine.query("C", "A", evidence={"D": "d0"}, heuristic="min-fill")
+    assert all(compare(result.names, ["C", "A"]))
+    expected = full.reduce(D="d0").marginal("B")
+    for key, value in expected.items():
+        assert result[key[1], key[0]] == approx(value)
+
+
+def test_elimination_unnormalised_query():
+    engine = VariableElimination([p_a, p_b_a, p_c_b, p_d_ac])
+    # P(A, D=d1)
+    result = engine.query("A", evidence={"D": "d1"}, normalise=False)
+    expected = joint().reduce(D="d1").marginal("B", "C", normalise=False)
+    for key, value in expected.items():
+        assert result[key] == approx(value)
+    # Fully observed factors become constants: P(B, A=a1, C=c1, D=d0)
+    result = engine.query("B", evidence={"A": "a1", "C": "c1", "D": "d0"}, normalise=False)
+    assert result["b0"] == approx(0.4 * 0.2 * 0.1 * 0.8)
+    assert result["b1"] == approx(0.4 * 0.8 * 0.6 * 0.8)
+
+
+def test_elimination_does_not_mutate_factors():
+    p_x = Table({"x0": 2.0, "x1": 6.0}, names=["X"])
+    result = VariableElimination([p_x]).query("X")
+    assert result is not p_x
+    assert result["x0"] == approx(0.25)
+    assert p_x["x0"] == 2.0
+    p_y = Table({"y0": 0.25, "y1": 0.5}, names=["Y"])
+    result = VariableElimination([p_x, p_y]).query("X", normalise=False)
+    assert result["x1"] == approx(6.0 * 0.75)
+    assert p_x["x1"] == 6.0
+
+
+def test_elimination_log_space_query():
+    factors = [p_a.to_log(), p_b_a.to_log(), p_c_b.to_log(), p_d_ac.to_log()]
+    engine = VariableElimination(factors)
+    linear = VariableElimination([p_a, p_b_a, p_c_b, p_d_ac])
+
+    result = engine.query("A", evidence={"D": "d1"}, normalise=False)
+    expected = linear.query("A", evidence={"D": "d1"}, normalise=False)
+    assert result.log_space
+    for key, value in expected.items():
+        assert np.exp(result[key]) == approx(value)
+
+    result = engine.query("B", evidence={"A": "a1", "C": "c1", "D": "d0"}, normalise=False)
+    assert np.exp(result["b0"]) == approx(0.4 * 0.2 * 0.1 * 0.8)
+    assert np.exp(result["b1"]) == approx(0.4 * 0.8 * 0.6 * 0.8)
+
+    # The summed out single variable factors are constants
+    p_x = Table({"x0": 0.2, "x1": 0.6}, names=["X"]).to_log()
+    p_y = Table({"y0": 0.25, "y1": 0.5}, names=["Y"]).to_log()
+    result = VariableElimination([p_x, p_y]).query("X", normalise=False)
+    assert np.exp(result["x1"]) == approx(0.6 * 0.75)
+    assert np.exp(p_x["x1"]) == approx(0.6)
+    result = VariableElimination([p_x, p_y]).query("X")
+    assert np.exp(result["x1"]) == approx(0.75)
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from probability import Table
+from probability.parallel import map_ordered
+
+samples = {
+    (x, y, z, w): x + y * z + len(w)
+    for x in range(20)
+    for y in range(3)
+    for z in range(4)
+    for w in ["a", "bb"]
+}
+
+
+def square(x):
+    return x * x
+
+
+def test_map_ordered():
+    items = list(range(103))
+    expected = [x * x for x in items]
+    assert map_ordered(square, items) == expected
+    for executor in ["thread", "process"]:
+        for batch_size in [None, 1, 10, 500]:
+            assert map_ordered(square, items, executor, batch_size, 2) == expected
+    with ThreadPoolExecutor(2) as executor:
+        assert map_ordered(square, items, executor, 7) == expected
+
+    with pytest.raises(ValueError):
+        map_ordered(square, items, "fiber")
+    with pytest.raises(ValueError):
+        map_ordered(square, items, "thread", batch_size=0)
+
+
+def test_executor_multi_table():
+    table = Table(samples, names=["X", "Y", "Z", "W"])
+    conditional = table.condition_on("X")
+    expected = [
+        conditional.marginal("Y"),
+        conditional.condition_on("Z"),
+        conditional.reduce(W="a"),
+    ]
+    for executor in ["thread", "process"]:
+        conditional = table.condition_on("X")
+        conditional.set_executor(executor, batch_size=3, max_workers=2)
+        results = [
+            conditional.marginal("Y"),
+            conditional.condition_on("Z"),
+            conditional.reduce(W="a"),
+        ]
+        for result, expected_one in zip(results, expected):
+            # The same rows in the same order
+            assert list(result.items()) == list(expected_one.items())
+        assert results[1]._executor_ == executor
+        assert list(results[1].marginal("Y").items()) == list(
+            expected[1].marginal("Y").items()
+        )
+
+    with pytest.raises(ValueError):
+        conditional.set_executor("fiber")
+    with pytest.raises(ValueError):
+        conditional.set_executor("thread", batch_size=0)
@@ -0,0 +1,98 @@
+import pytest
+from probability import Table
+
+samples = {(x, y, z): x + y + 1 for x in range(3) for y in range(4) for z in "ab"}
+
+
+def test_cache_exceptions():
+    table = Table(samples, names=["X", "Y", "Z"])
+    with pytest.raises(ValueError):
+        table.enable_cache(maxsize=0)
+
+
+def test_cache_hits_and_misses():
+    table = Table(samples, names=["X", "Y", "Z"])
+    # Disabled by default
+    assert table.marginal("X") is not table.marginal("X")
+    assert table.cache_info() == (0, 0, 0, 0)
+
+    table.enable_cache(maxsize=2)
+    marginal = table.marginal("X")
+    # The calls return the copies of the cached Table
+    assert table.marginal("X") is not marginal
+    assert table.marginal("X") == marginal
+    assert table.marginal("X", normalise=False) != marginal
+    conditional = table.condition_on("Z")
+    assert table.condition_on("Z")["a"] == conditional["a"]
+    assert table.cache_info() == (3, 3, 2, 2)
+    # The least recently used is dropped
+    table.marginal("X")
+    assert table.cache_info() == (3, 4, 2, 2)
+    reduced = table.reduce(Y=1, Z="a")
+    assert table.reduce(Z="a", Y=1) == reduced
+    assert table.cache_info() == (4, 5, 2, 2)
+
+    table.disable_cache()
+    assert table.cache_info().currsize == 0
+    assert table.reduce(Z="a", Y=1) == reduced
+
+
+def test_cache_invalidation():
+    for columnar in [False, True]:
+        table = Table(samples, names=["X", "Y", "Z"], columnar=columnar)
+        table.enable_cache()
+        marginal = table.marginal("X", "Y", normalise=False)
+        assert marginal["a"] == sum(x + y + 1 for x in range(3) for y in range(4))
+        table[0, 0, "a"] = 100
+        assert table.cache_info().currsize == 0
+        marginal = table.marginal("X", "Y", normalise=False)
+        assert marginal["a"] == 99 + sum(x + y + 1 for x in range(3) for y in range(4))
+
+        reduced = table.reduce(X=0, Y=0)
+        table.normalise()
+        assert table.reduce(X=0, Y=0) is not reduced
+        assert table.reduce(X=0, Y=0)["a"] == pytest.approx(100 / table_total(samples))
+
+        reduced = table.reduce(X=0, Y=0)
+        del table[0, 0, "b"]
+        assert table.reduce(X=0, Y=0) is not reduced
+        assert len(table.reduce(X=0, Y=0)) == 1
+
+
+def table_total(samples):
+    return sum(samples.values()) - samples[0, 0, "a"] + 100
+
+
+def test_cache_returns_copies():
+    for columnar in [False, True]:
+        table = Table(samples, names=["X", "Y", "Z"], columnar=columnar)
+        table.enable_cache()
+        marginal = table.marginal("X", "Y", normalise=False)
+        marginal["a"] = 100
+        marginal.normalise()
+        assert table.marginal("X", "Y", normalise=False)["a"] == 42
+
+        conditional = table.condition_on("Z", normalise=False)
+        conditional["a"][0, 0] = 100
+        conditional["b"].normalise()
+        conditional = table.condition_on("Z", normalise=False)
+        assert conditional["a"][0, 0] == 1
+        assert conditional["b"][0, 0] == 1
+
+
+def test_cache_invalidation_by_children():
+    for columnar in [False, True]:
+        table = Table(samples, names=["X", "Y", "Z"], columnar=columnar)
+        conditional = table.condition_on("Z", normalise=False)
+        conditional.enable_cache()
+        assert conditional.marginal("X", normalise=False)["a"][0] == 1 + 2 + 3
+        assert conditional.reduce(X=0)["a"][0] == 1
+        # A mutation of a child invalidates its parent
+        conditional["a"][0, 0] = 50
+        assert conditional.cache_info().currsize == 0
+        assert conditional.marginal("X", normalise=False)["a"][0] == 50 + 2 + 3
+        assert conditional.reduce(X=0)["a"][0] == 50
+        conditional["b"].setdefault((0, 9), 3)
+        assert conditional.reduce(X=0)["b"][9] == 3
+        conditional["b"].clear()
+        assert len(conditional.reduce(X=0)["b"]) == 0
@@ -0,0 +1,165 @@
+import pytest
+import numpy as np
+from probability import Table
+from probability.columnar import lookup_codes
+from tests.helpers import compare
+
+samples = {
+    ("a", "x", 1, 33): 1,
+    ("a", "x", 2, 33): 2,
+    ("a", "x", 1, 44): 3,
+    ("a", "x", 2, 44): 4,
+    ("a", "y", 1, 33): 5,
+    ("a", "y", 2, 33): 6,
+    ("a", "y", 1, 44): 7,
+    ("a", "y", 2, 44): 8,
+    ("b", "x", 1, 33): 9,
+    ("b", "x", 2, 33): 10,
+    ("b", "x", 1, 44): 11,
+    ("b", "x", 2, 44): 12,
+    ("b", "y", 1, 33): 13,
+    ("b", "y", 2, 33): 14,
+    ("b", "y", 1, 44): 15,
+    ("b", "y", 2, 44): 16,
+}
+
+
+def test_exceptions_columnar_table():
+    with pytest.raises(ValueError):
+        Table({"a": "one", "b": "two"}, columnar=True)
+
+    with pytest.raises(ValueError):
+        Table.from_columns([["a", "b"], ["x"]], [1, 2])
+
+    with pytest.raises(ValueError):
+        Table.from_columns([["a", "a"], ["x", "x"]], [1, 2])
+
+    table = Table(samples, names=["X1", "X2", "X3", "X4"])
+    with pytest.raises(ValueError):
+        Table({"t1": table, "t2": table}, names=["t"], columnar=True)
+
+
+def test_constructor_columnar_table():
+    table = Table(samples, names=["X1", "X2", "X3", "X4"], columnar=True)
+    assert table.is_columnar()
+    assert len(table) == 16
+    assert table["a", "x", 1, 33] == 1
+    assert table["b", "y", 2, 44] == 16
+    assert table["b", "z", 2, 44] is None
+    assert table.get("a", X2="y", X3=2, X4=33) == 6
+    assert ("a", "x", 1, 33) in table
+    assert ("a", "x", 3, 33) not in table
+    assert "a" not in table
+    assert all(compare(table.keys(), samples.keys()))
+    assert all(compare(table.values(), samples.values()))
+    assert table == Table(samples, names=["X1", "X2", "X3", "X4"])
+    assert dict(table) == samples
+
+    table = Table({"one": 1, "two": 2, "three": 3}, names=["Y1"], columnar=True)
+    assert table["one"] == 1
+    assert table["three"] == 3
+    assert table.get(Y1="two") == 2
+
+
+def test_from_columns_table():
+    x1 = np.array(["a", "a", "b", "b"])
+    x2 = np.array([1, 2, 1, 2])
+    table = Table.from_columns([x1, x2], np.array([1, 2, 3, 4]), names=["X1", "X2"])
+    assert table.is_columnar()
+    assert table["a", 1] == 1
+    assert table["a", 2] == 2
+    assert table["b", 1] == 3
+    assert table["b", 2] == 4
+    assert table.total() == 10
+    assert all(compare(table.names, ["X1", "X2"]))
+    assert all(compare(table.columns["X1"].levels(), ["a", "b"]))
+
+
+def test_mutation_columnar_table():
+    table = Table(samples, names=["X1", "X2", "X3", "X4"], columnar=True)
+    table.normalise()
+    assert table.is_columnar()
+    assert table["a", "x", 1, 33] == 1 / 136
+    assert table.total() == pytest.approx(1)
+
+    table = Table(samples, names=["X1", "X2", "X3", "X4"], columnar=True)
+    table["a", "x", 1, 33] = 0.5
+    assert table.is_columnar()
+    assert table["a", "x", 1, 33] == 0.5
+    # A new key moves the rows to the dictionary
+    table["c", "x", 1, 33] = 20
+    assert not table.is_columnar()
+    assert table["c", "x", 1, 33] == 20
+    assert table["a", "x", 1, 33] == 0.5
+    assert len(table) == 17
+
+
+def test_dict_methods_columnar_table():
+    table = Table(samples, names=["X1", "X2", "X3", "X4"], columnar=True)
+    keys, values, items = table.keys(), table.values(), table.items()
+    assert len(keys) == len(values) == len(items) == 16
+    assert ("a", "x", 1, 33) in keys
+    assert (("a", "x", 1, 33), 1) in items
+    assert (("a", "x", 1, 33), 2) not in items
+    assert sorted(values) == list(range(1, 17))
+    assert list(reversed(table))[0] == ("b", "y", 2, 44)
+    # The views are live
+    table["a", "x", 1, 33] = 100
+    assert 100 in values
+    assert (("a", "x", 1, 33), 100) in items
+
+    assert table.setdefault(("a", "x", 1, 33), 7) == 100
+    assert table.is_columnar()
+    assert len(table) == 16
+    assert table.setdefault(("c", "x", 1, 33), 7) == 7
+    assert len(table) == 17
+    assert table["c", "x", 1, 33] == 7
+
+    table = Table(samples, names=["X1", "X2", "X3", "X4"], columnar=True)
+    key, value = table.popitem()
+    assert table[key] is None
+    assert samples[key] == value
+    assert len(table) == 15
+
+    table = Table(samples, names=["X1", "X2", "X3", "X4"], columnar=True)
+    merged = table | {("c", "x", 1, 33): 20}
+    assert len(merged) == 17
+    assert merged[("a", "x", 1, 33)] == 1
+    table |= {("c", "x", 1, 33): 20}
+    assert len(table) == 17
+    assert table["c", "x", 1, 33] == 20
+
+    table.clear()
+    assert len(table) == 0
+    assert list(table.items()) == []
+    table = Table(samples, names=["X1", "X2", "X3", "X4"], columnar=True)
+    table.clear()
+    assert len(table) == 0
+    assert table["a", "x", 1, 33] is None
+
+
+def test_operations_columnar_table():
+    table = Table(samples, names=["X1", "X2", "X3", "X4"])
+    columnar = table.to_columnar()
+
+    assert columnar.marginal("X1", "X2") == table.marginal("X1", "X2")
+    assert columnar.reduce(X1="a", X3=1) == table.reduce(X1="a", X3=1)
+    assert columnar + columnar == table + table
+
+    con_1 = columnar.condition_on("X1")
+    con_2 = table.condition_on("X1")
+    assert con_1["a"] == con_2["a"]
+    assert con_1["b"] == con_2["b"]
+
+    product_1 = columnar.marginal("X3") * columnar.marginal("X1", "X2")
+    product_2 = table.marginal("X3") * table.marginal("X1", "X2")
+    assert product_1 == product_2
+
+
+def test_lookup_codes():
+    lookup = {"a": 0, "b": 1, ("x", 1): 2}
+    assert lookup_codes(["b", "c", ["a"], "a"], lookup).tolist() == [1, -1, -1, 0]
+    assert lookup_codes(np.array(["a", "c", "a"]), lookup).tolist() == [0, -1, 0]
+    rows = np.array([["x", 1], ["y", 1]], dtype=object)
+    assert lookup_codes(rows, lookup).tolist() == [2, -1]
+    assert lookup_codes(np.array([[1, 2]]), {(1, 2): 5}).tolist() == [5]
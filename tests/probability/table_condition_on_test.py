@@ -1,3 +1,4 @@
+from fractions import Fraction
 import pytest
 from pytest import approx
 from probability import Table
@@ -153,3 +154,44 @@ def test_conditional_on_conditional_table():
     assert con_2["b", 44, 2]["x"] == approx(12 / 28)
     assert con_2["b", 44, 1]["y"] == approx(15 / 26)
     assert con_2["b", 44, 2]["y"] == approx(16 / 28)
+
+
+def test_conditional_on_lazy_children_table():
+    table1 = Table(samples, names=["X1", "X2", "X3", "X4"])
+    con_1 = table1.condition_on("X2", "X1", normalise=False)
+    assert con_1.is_columnar()
+    assert all(compare(con_1.names, ["X1", "X2"]))
+    assert all(compare(con_1.children_names, ["X3", "X4"]))
+    assert all(compare(con_1.keys(), [("a", "x"), ("a", "y"), ("b", "x"), ("b", "y")]))
+    # Children are made on access
+    assert all(child is None for child in con_1._store_.values)
+    child = con_1["a", "y"]
+    assert child is con_1["a", "y"]
+    assert all(compare(child.keys(), [(1, 33), (1, 44), (2, 33), (2, 44)]))
+    assert all(compare(child.values(), [5, 7, 6, 8]))
+    assert con_1.total() == {("a", "x"): 10, ("a", "y"): 26, ("b", "x"): 42, ("b", "y"): 58}
+    # Mutations of a child are kept
+    con_1.normalise()
+    assert con_1["a", "y"][1, 33] == 5 / 26
+    assert con_1["b", "x"][2, 44] == 12 / 42
+
+
+def test_conditional_on_non_float_values_table():
+    table = Table(
+        {
+            ("a", "x"): Fraction(1, 3),
+            ("a", "y"): Fraction(1, 6),
+            ("b", "x"): Fraction(1, 4),
+            ("b", "y"): Fraction(1, 4),
+        }
+    )
+    conditional = table.condition_on("X1")
+    assert conditional["a"]["x"] == Fraction(2, 3)
+    assert conditional["a"]["y"] == Fraction(1, 3)
+    assert conditional["b"]["x"] == Fraction(1, 2)
+    assert isinstance(conditional["a"]["x"], Fraction)
+    assert conditional.children_names == ["X2"]
+
+    conditional = table.condition_on("X2", normalise=False)
+    assert conditional["x"]["a"] == Fraction(1, 3)
+    assert conditional["y"]["b"] == Fraction(1, 4)
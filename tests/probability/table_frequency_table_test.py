@@ -1,4 +1,6 @@
 from collections import Counter
+from multiprocessing import shared_memory
+import pytest
 import numpy as np
 from probability import FrequencyTable
 
@@ -73,3 +75,118 @@ def test_from_np_array_frequency_table():
 
     assert table.prob(X1=0, X2=0) == 0.40
     assert table.prob(X1=1, X2=1) == 0.60
+
+
+def test_add_samples_frequency_table():
+    table = FrequencyTable(["a", "b", "b"], names=["X1"])
+    table.add_samples(item for item in ["a", "c", "c", "c"])
+    assert table["a"] == 2
+    assert table["b"] == 2
+    assert table["c"] == 3
+    assert table.total == 7
+    assert table.probability("c") == 3 / 7
+
+    table.add_samples({"a": 3, "d": 1})
+    assert table["a"] == 5
+    assert table["d"] == 1
+    assert table.total == 11
+
+    table.add_samples("b" for _ in range(25))
+    assert table["b"] == 27
+    assert table.total == 36
+
+    table = FrequencyTable([("x", 1), ("y", 2)])
+    table.add_samples([("x", 1), ("z", 3)])
+    assert table["x", 1] == 2
+    assert table["z", 3] == 1
+    # marginals reflect the new counts
+    assert table.marginal("X2", normalise=False)["x"] == 2
+    with pytest.raises(ValueError):
+        table.add_samples([("x", 1, 1)])
+
+    # A bad key in the middle of a batch changes nothing
+    with pytest.raises(ValueError):
+        table.add_samples({("x", 1): 5, ("y", 2, 2): 1, ("z", 3): 5})
+    with pytest.raises(ValueError):
+        table.add_samples([("x", 1), ("y",), ("z", 3)])
+    assert table["x", 1] == 2
+    assert table["z", 3] == 1
+    assert table.total == 4
+
+
+def test_update_replaces_frequency_table():
+    table = FrequencyTable(["a", "b", "b"], names=["X1"])
+    # The dict update (and |=) replaces the counts
+    table |= {("a",): 5}
+    assert table["a"] == 5
+    table.update({("b",): 1})
+    assert table["b"] == 1
+
+
+def test_update_batch_frequency_table():
+    arr = np.r_[np.zeros((40, 2)), np.ones((60, 2))]
+    table = FrequencyTable.from_np_array(arr, ["X1", "X2"])
+    table.update_batch(np.array([[0, 0], [0, 1], [0, 1]]))
+    assert table[0, 0] == 41
+    assert table[0, 1] == 2
+    assert table[1, 1] == 60
+    assert table.total == 103
+
+    table = FrequencyTable.from_np_array(np.zeros(4), ["X1"])
+    table.update_batch(np.array([0, 1, 1]))
+    assert table[0] == 5
+    assert table[1] == 2
+    assert table.total == 7
+
+    with pytest.raises(ValueError):
+        table.update_batch([[0, 1]])
+    with pytest.raises(ValueError):
+        table.update_batch(np.zeros((3, 2)))
+
+
+def test_from_np_array_parallel_frequency_table():
+    rng = np.random.default_rng(5)
+    arr = rng.integers(0, 4, size=(1000, 2))
+    expected = FrequencyTable.from_np_array(arr, ["X1", "X2"])
+    for processes, chunk_size in [(1, 1000), (2, 100), (3, 7)]:
+        table = FrequencyTable.from_np_array_parallel(
+            arr, ["X1", "X2"], processes=processes, chunk_size=chunk_size
+        )
+        assert table == expected
+        assert list(table.keys()) == sorted(expected.keys())
+        assert table.total == 1000
+
+    arr = np.r_[np.zeros(40), np.ones(60)]
+    table = FrequencyTable.from_np_array_parallel(arr, ["X1"], processes=2, chunk_size=30)
+    assert table[0] == 40
+    assert table[1] == 60
+
+    arr = np.array([["a", 1], ["b", 2], ["a", 1]], dtype=object)
+    table = FrequencyTable.from_np_array_parallel(arr, ["X1", "X2"])
+    assert table["a", 1] == 2
+
+    with pytest.raises(ValueError):
+        FrequencyTable.from_np_array_parallel([[0, 1]])
+
+
+def test_from_np_array_parallel_shared_memory_frequency_table():
+    rng = np.random.default_rng(6)
+    arr = rng.integers(0, 4, size=(1000, 2))
+    expected = FrequencyTable.from_np_array(arr, ["X1", "X2"])
+    shm = shared_memory.SharedMemory(create=True, size=arr.nbytes)
+    try:
+        # The caller creates the samples in the shared memory
+        samples = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+        samples[:] = arr
+        table = FrequencyTable.from_np_array_parallel(
+            samples, ["X1", "X2"], processes=2, chunk_size=100, shm=shm
+        )
+        assert table == expected
+        with pytest.raises(ValueError):
+            FrequencyTable.from_np_array_parallel(arr, ["X1", "X2"], shm=shm)
+        with pytest.raises(ValueError):
+            FrequencyTable.from_np_array_parallel(samples[1:], ["X1", "X2"], shm=shm)
+        del samples
+    finally:
+        shm.close()
+        shm.unlink()
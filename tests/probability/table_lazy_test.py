@@ -0,0 +1,115 @@
+from fractions import Fraction
+import pytest
+from pytest import approx
+from probability import Table
+from probability.lazy import Leaf, Marginal, Product, Reduce
+from probability.elimination import to_factor
+
+xy_z = Table(
+    {
+        (x, y, z): (x + 1) * (y + 2) * (z + 3)
+        for x in range(4)
+        for y in range(5)
+        for z in range(3)
+    },
+    names=["X", "Y", "Z"],
+).condition_on("Z")
+z = Table({0: 0.2, 1: 0.3, 2: 0.5}, names=["Z"])
+zw = Table({(z, w): z + len(w) for z in range(3) for w in ["a", "bb"]}, names=["Z", "W"])
+
+
+def assert_tables(table1, table2):
+    assert list(table1.names) == list(table2.names)
+    assert len(table1) == len(table2)
+    for key, value in table2.items():
+        assert table1[key] == approx(value)
+
+
+def test_lazy_exceptions():
+    with pytest.raises(ValueError):
+        z.lazy() * 2
+    with pytest.raises(ValueError):
+        z.lazy().marginal("Z")
+    with pytest.raises(ValueError):
+        z.lazy().marginal("X")
+    with pytest.raises(ValueError):
+        (xy_z.lazy() * z).reduce(X=1, Y=1, Z=1)
+    with pytest.raises(ValueError):
+        z.lazy() + zw
+    with pytest.raises(ValueError):
+        zw.lazy().condition_on("Z") * z
+    with pytest.raises(ValueError):
+        zw.lazy().condition_on("Z").marginal("W")
+
+
+def test_lazy_compute():
+    joint = to_factor(xy_z) * z
+    assert_tables((xy_z.lazy() * z).compute(), joint)
+    assert_tables((xy_z.lazy() * z).marginal("Y").compute(), joint.marginal("Y"))
+    assert_tables(
+        (xy_z.lazy() * z).marginal("Y", normalise=False).marginal("X").compute(),
+        joint.marginal("X", "Y"),
+    )
+    assert_tables(
+        (xy_z.lazy() * z).marginal("Y", normalise=False).reduce(X=1).compute(),
+        joint.marginal("Y", normalise=False).reduce(X=1),
+    )
+    assert_tables(
+        (xy_z.lazy() * z * zw).reduce(Z=1, X=2).marginal("Y", normalise=False).compute(),
+        (joint * zw).reduce(Z=1, X=2).marginal("Y", normalise=False),
+    )
+    assert_tables((z.lazy() + z).compute(), z + z)
+    conditional = (zw.lazy() * z).condition_on("Z").compute()
+    expected = (zw * z).condition_on("Z")
+    for key, table in expected.items():
+        assert_tables(conditional[key], table)
+
+
+def test_lazy_rewrites():
+    # Consecutive marginals are merged
+    node = xy_z.lazy().marginal("X", normalise=False).marginal("Y").optimise()
+    assert isinstance(node, Marginal)
+    assert node.args == ["X", "Y"]
+    assert node.normalise
+    assert isinstance(node.child, Leaf)
+    # Reduces are pushed below the products
+    node = (xy_z.lazy() * zw).reduce(X=1).optimise()
+    assert isinstance(node, Product)
+    assert isinstance(node.left, Reduce)
+    assert isinstance(node.right, Leaf)
+    # Marginals are pushed into the products
+    node = (xy_z.lazy() * zw).marginal("W").optimise()
+    assert isinstance(node, Marginal)
+    assert len(node.args) == 0
+    assert isinstance(node.child.right, Marginal)
+    assert node.child.right.args == ["W"]
+
+
+def test_lazy_explain():
+    plan = (xy_z.lazy() * z).reduce(X=1).explain(optimise=False)
+    assert plan.split("\n") == [
+        "Reduce(X=1) [~15 rows]",
+        "  Product(X, Y, Z) [~60 rows]",
+        "    Table(X, Y, Z) [~60 rows]",
+        "    Table(Z) [~3 rows]",
+    ]
+    plan = (xy_z.lazy() * z).reduce(X=1).explain()
+    assert plan.split("\n") == [
+        "Product(Y, Z) [~15 rows]",
+        "  Reduce(X=1) [~15 rows]",
+        "    Table(X, Y, Z) [~60 rows]",
+        "  Table(Z) [~3 rows]",
+    ]
+
+
+def test_lazy_fraction_values():
+    xz = Table(
+        {(x, z): Fraction(x + 1, z + 2) for x in range(3) for z in range(2)},
+        names=["X", "Z"],
+    )
+    zf = Table({0: Fraction(1, 3), 1: Fraction(2, 3)}, names=["Z"])
+    expression = (xz.lazy() * zf).marginal("Z", normalise=False)
+    assert "Table(X, Z)" in expression.explain()
+    assert_tables(expression.compute(), (xz * zf).marginal("Z", normalise=False))
+    assert Leaf(xz).levels_count("X") == 3
+    assert Leaf(zf).levels_count("Z") == 2
@@ -0,0 +1,88 @@
+import pytest
+from pytest import approx
+import numpy as np
+from probability import Table
+
+samples = {(x, y): (x + 1) * (i + 2) for x in range(3) for i, y in enumerate("abcd")}
+
+
+def assert_tables(log_table, table):
+    assert log_table.log_space
+    assert len(log_table) == len(table)
+    for key, value in table.items():
+        assert np.exp(log_table[key]) == approx(value)
+
+
+def test_log_space_exceptions():
+    table = Table(samples, names=["X", "Y"])
+    with pytest.raises(ValueError):
+        table.to_linear()
+    with pytest.raises(ValueError):
+        table.to_log().to_log()
+    with pytest.raises(ValueError):
+        table.to_log() * table.marginal("X")
+    with pytest.raises(ValueError):
+        table.marginal("X") * table.to_log()
+    with pytest.raises(ValueError):
+        table.to_log() + table
+
+
+def test_log_space_operations():
+    for columnar in [False, True]:
+        table = Table(samples, names=["X", "Y"], columnar=columnar)
+        log_table = table.to_log()
+        assert_tables(log_table, table)
+        assert log_table.total() == approx(np.log(table.total()))
+        assert_tables(log_table.to_linear().to_log(), table)
+        # marginal
+        assert_tables(log_table.marginal("X"), table.marginal("X"))
+        assert_tables(
+            log_table.marginal("Y", normalise=False), table.marginal("Y", normalise=False)
+        )
+        # normalise
+        log_table.normalise()
+        table.normalise()
+        assert_tables(log_table, table)
+        assert log_table.total() == approx(0)
+        # reduce
+        assert_tables(log_table.reduce(Y="b"), table.reduce(Y="b"))
+        # product
+        assert_tables(
+            log_table.marginal("X") * log_table.marginal("Y"),
+            table.marginal("X") * table.marginal("Y"),
+        )
+        # add
+        assert_tables(log_table + log_table, table + table)
+
+
+def test_log_space_conditional():
+    table = Table(samples, names=["X", "Y"])
+    table.normalise()
+    log_table = table.to_log()
+    conditional = log_table.condition_on("Y")
+    expected = table.condition_on("Y")
+    assert conditional.log_space
+    for key, child in expected.items():
+        assert_tables(conditional[key], child)
+    # P(X | Y) * P(Y) -> P(X, Y)
+    assert_tables(conditional * log_table.marginal("X"), table)
+    product = log_table.marginal("X") * conditional
+    assert product.log_space
+    for (x, y), value in table.items():
+        assert np.exp(product.get(X=x, Y=y)) == approx(value)
+    assert_tables(conditional.to_linear().to_log()["b"], expected["b"])
+
+
+def test_log_space_long_product_chain():
+    table = Table({x: 1e-200 for x in range(3)}, names=["X"])
+    log_table = table.to_log()
+    product = table * table
+    log_product = log_table * log_table
+    for _ in range(3):
+        product = product * table
+        log_product = log_product * log_table
+    # The values underflow to zero in the linear space
+    assert product.total() == 0
+    assert log_product.total() == approx(np.log(3) + 5 * np.log(1e-200))
+    log_product.normalise()
+    assert all(np.exp(value) == approx(1 / 3) for value in log_product.values())
@@ -1,4 +1,7 @@
+from decimal import Decimal
+from fractions import Fraction
 import pytest
+import numpy as np
 from pytest import approx
 from probability import Table
 from tests.helpers import compare
@@ -490,3 +493,50 @@ def test_marginal_if_table_of_table():
     con_3 = table1.condition_on("X1", "X3", "X4")
     with pytest.raises(ValueError):
         con_3.marginal("X2")
+
+
+def test_marginal_vectorized_table():
+    # The vectorized marginal is the same as a loop over the rows,
+    # for the dictionary and the columnar Tables
+    rng = np.random.default_rng(0)
+    rows = {}
+    for x1, x2, x3 in rng.integers(0, 7, (500, 3)).tolist():
+        rows[("abcdefg"[x1], x2, x3 * 10)] = float(x1 + x2 + x3 + 1)
+    expected = {}
+    for (x1, x2, x3), value in rows.items():
+        expected[(x1, x3)] = expected.get((x1, x3), 0) + value
+
+    for columnar in [False, True]:
+        table = Table(rows, names=["X1", "X2", "X3"], columnar=columnar)
+        marginal = table.marginal("X2", normalise=False)
+        assert marginal.names == ["X1", "X3"]
+        assert len(marginal) == len(expected)
+        for key, value in expected.items():
+            assert marginal[key] == approx(value)
+        # The keys are in the sorted order
+        assert list(marginal.keys()) == sorted(expected.keys())
+        normalised = table.marginal("X2", "X3")
+        assert sum(normalised.values()) == approx(1)
+
+
+def test_marginal_non_float_values_table():
+    # The values that cannot be stored in the columnar
+    # store are summed by the dictionary
+    table = Table(
+        {
+            ("a", "x"): Fraction(1, 3),
+            ("a", "y"): Fraction(1, 6),
+            ("b", "x"): Fraction(1, 4),
+            ("b", "y"): Fraction(1, 4),
+        }
+    )
+    marginal = table.marginal("X2", normalise=False)
+    assert marginal["a"] == Fraction(1, 2)
+    assert marginal["b"] == Fraction(1, 2)
+    assert isinstance(marginal["a"], Fraction)
+    marginal = table.marginal("X1")
+    assert marginal["x"] == Fraction(7, 12)
+    assert marginal["y"] == Fraction(5, 12)
+
+    table = Table({("a", 1): Decimal("0.1"), ("a", 2): Decimal("0.2")})
+    assert table.marginal("X2", normalise=False)["a"] == Decimal("0.3")
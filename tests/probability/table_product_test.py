@@ -1,5 +1,7 @@
+from fractions import Fraction
 import pytest
 from pytest import approx
+import numpy as np
 from probability import Table
 from tests.helpers import compare
 
@@ -340,3 +342,50 @@ def test_product_with_table_of_table_column_table():
     # P(X4, X5 | X1, X2, X3) * P(X1 | X2, X3) -> P(X4, X5, X1| X2, X3)
     product_1 = table2 * con_1
     assert_all(product_1, table1)
+
+
+def test_sort_merge_product_table():
+    samples_1 = {(x, y, z): x + 2 * z + 1 for x in range(4) for y in "abc" for z in range(5)}
+    # 'd' has no match and z = 0 is missing in the left
+    samples_2 = {(z, y, w): z * w + 1 for z in range(1, 7) for y in "abd" for w in (1, 2)}
+    for columnar in [False, True]:
+        table1 = Table(samples_1, names=["X", "Y", "Z"], columnar=columnar)
+        table2 = Table(samples_2, names=["Z", "Y", "W"])
+        # Keep them sparse, so they are not multiplied as dense
+        table1.dense_fill_ratio = table2.dense_fill_ratio = 2
+        table1.sort_merge_min_rows = 10 ** 9
+        hash_product = table1 * table2
+        table1.sort_merge_min_rows = 0
+        merge_product = table1 * table2
+        assert merge_product.is_columnar()
+        assert all(compare(merge_product.names, ["X", "Y", "Z", "W"]))
+        assert merge_product == hash_product
+        assert len(merge_product) == 4 * 2 * 4 * 2
+        assert merge_product[3, "b", 4, 2] == 12 * 9
+
+        log_product = table1.to_log() * table2.to_log()
+        for key, value in hash_product.items():
+            assert log_product[key] == approx(np.log(value))
+
+
+
+def test_product_non_float_values_table():
+    # The dense and sort-merge products need numeric
+    # values, so the others take the dictionary join
+    table1 = Table(
+        {("a", "x"): Fraction(1, 2), ("a", "y"): Fraction(1, 4), ("b", "x"): Fraction(1, 4)},
+        names=["X1", "X2"],
+    )
+    table2 = Table({"x": Fraction(1, 3), "y": Fraction(2, 3)}, names=["X2"])
+    product = table1 * table2
+    assert product["a", "x"] == Fraction(1, 6)
+    assert product["a", "y"] == Fraction(1, 6)
+    assert product["b", "x"] == Fraction(1, 12)
+    assert isinstance(product["a", "x"], Fraction)
+
+    table3 = Table({"u": Fraction(1, 5), "v": Fraction(4, 5)}, names=["X3"])
+    product = table2 * table3
+    assert len(product) == 4
+    assert product["y", "v"] == Fraction(8, 15)
+    product = table3.__rmul__(table2)
+    assert product["y", "v"] == Fraction(8, 15)
@@ -1,3 +1,4 @@
+from fractions import Fraction
 import pytest
 from probability import Table
 from tests.helpers import compare
@@ -133,3 +134,65 @@ def test_reduce_by_name_on_conditioned_table():
     assert all(compare(reduced_table.columns.children_names, ["X4"]))
     assert reduced_table["a", 1][33] == 5 / 16
     assert reduced_table["b", 2][44] == 16 / 52
+
+
+def test_reduce_repeated_and_mutated_table():
+    table = Table(samples, names=["X1", "X2", "X3", "X4"])
+    for _ in range(3):
+        reduced_table = table.reduce(X2="y", X3=1)
+        assert all(compare(reduced_table.keys(), [("a", 33), ("a", 44), ("b", 33), ("b", 44)]))
+        assert all(compare(reduced_table.values(), [5, 7, 13, 15]))
+    # Not existing levels
+    assert len(table.reduce(X2="z")) == 0
+    assert len(table.reduce(X2="y", X3=3)) == 0
+    # Mutations must be reflected in the next reduce
+    table["a", "y", 1, 33] = 50
+    table["c", "y", 1, 33] = 60
+    reduced_table = table.reduce(X2="y", X3=1)
+    assert reduced_table["a", 33] == 50
+    assert reduced_table["c", 33] == 60
+
+    columnar = Table(samples, names=["X1", "X2", "X3", "X4"], columnar=True)
+    reduced_table = columnar.reduce(X4=44, X1="b")
+    assert all(compare(reduced_table.keys(), [("x", 1), ("x", 2), ("y", 1), ("y", 2)]))
+    assert all(compare(reduced_table.values(), [11, 12, 15, 16]))
+
+
+def test_reduce_after_dict_mutations_table():
+    # Every mutating dict method drops the cached encoding
+    table = Table(samples, names=["X1", "X2", "X3", "X4"])
+    assert table.reduce(X2="y", X3=1)["a", 33] == 5
+    assert table.setdefault(("a", "y", 1, 33), 100) == 5
+    assert table.setdefault(("c", "y", 1, 33), 100) == 100
+    assert table.reduce(X2="y", X3=1)["c", 33] == 100
+
+    table |= {("a", "y", 1, 33): 70}
+    assert table.reduce(X2="y", X3=1)["a", 33] == 70
+    assert table.marginal("X1", "X3", "X4", normalise=False)["y"] == 70 + 6 + 7 + 8 + 13 + 14 + 15 + 16 + 100
+
+    key, _ = table.popitem()
+    assert key == ("c", "y", 1, 33)
+    assert table.reduce(X2="y", X3=1)["c", 33] is None
+
+    table.clear()
+    assert len(table.reduce(X2="y")) == 0
+    assert len(table.marginal("X1", normalise=False)) == 0
+
+
+def test_reduce_non_float_values_table():
+    table = Table(
+        {
+            ("a", "x", 1): Fraction(1, 3),
+            ("a", "y", 1): Fraction(1, 6),
+            ("b", "x", 2): Fraction(1, 4),
+            ("b", "y", 2): Fraction(1, 4),
+        }
+    )
+    reduced_table = table.reduce(X2="x")
+    assert reduced_table["a", 1] == Fraction(1, 3)
+    assert reduced_table["b", 2] == Fraction(1, 4)
+    assert len(reduced_table) == 2
+    reduced_table = table.reduce(X1="b", X3=2)
+    assert reduced_table["y"] == Fraction(1, 4)
+    assert isinstance(reduced_table["y"], Fraction)
+    assert len(table.reduce(X1="c")) == 0
@@ -0,0 +1,109 @@
+import pytest
+from pytest import approx
+import numpy as np
+from probability2.bayes import BetaBinomialBatch
+from probability2.bayes import DirichletMultinomialBatch
+
+
+def test_exceptions_batch():
+    with pytest.raises(ValueError):
+        DirichletMultinomialBatch([1, 1])
+    with pytest.raises(ValueError):
+        DirichletMultinomialBatch([1, 0], [[1, 2]])
+    with pytest.raises(ValueError):
+        DirichletMultinomialBatch([1, 1, 1], [[1, 2]])
+    with pytest.raises(ValueError):
+        BetaBinomialBatch([1, 2], [1])
+    with pytest.raises(ValueError):
+        BetaBinomialBatch(streams=2).update([1, 2, 3], [1, 2, 3])
+    with pytest.raises(ValueError):
+        BetaBinomialBatch(streams=2).credible_interval(1)
+
+
+def test_estimates_beta_binomial_batch():
+    successes = np.array([15, 35, 0, 100])
+    failures = np.array([35, 15, 10, 0])
+    batch = BetaBinomialBatch(successes, failures, alpha=2, beta=[2, 2, 1, 3])
+    assert batch.map() == approx((successes + 1) / (successes + failures + [2, 2, 1, 3]))
+    assert batch.mean() == approx(
+        (successes + 2) / (successes + failures + [4, 4, 3, 5])
+    )
+    # In place updates, where the streams can be repeated
+    batch.update([1, 2], [3, 4], streams=[0, 0])
+    assert batch.counts[0].tolist() == [18, 42]
+    batch.observe([1, 1, 3], [True, False, True])
+    assert batch.counts[1].tolist() == [36, 16]
+    assert batch.counts[3].tolist() == [101, 0]
+    batch.update(np.ones(4), np.zeros(4))
+    assert batch.counts[:, 0].tolist() == [19, 37, 1, 102]
+
+
+def test_credible_interval_beta_binomial_batch():
+    # Beta(1, 1) is uniform
+    batch = BetaBinomialBatch(streams=3)
+    lower, upper = batch.credible_interval(0.9)
+    assert lower == approx([0.05] * 3)
+    assert upper == approx([0.95] * 3)
+    # The CDF of Beta(a, 1) is x^a
+    batch = BetaBinomialBatch([2, 9], [0, 0])
+    lower, upper = batch.credible_interval()
+    assert lower == approx(0.025 ** (1 / np.array([3, 10])))
+    assert upper == approx(0.975 ** (1 / np.array([3, 10])))
+    # The same as the quantiles of the samples
+    rng = np.random.default_rng(7)
+    batch = BetaBinomialBatch(rng.integers(0, 200, 50), rng.integers(0, 200, 50))
+    lower, upper = batch.credible_interval()
+    samples = batch.sample(20000, random_state=3)
+    assert samples.shape == (20000, 50)
+    assert np.quantile(samples, 0.025, axis=0) == approx(lower, abs=0.01)
+    assert np.quantile(samples, 0.975, axis=0) == approx(upper, abs=0.01)
+    assert batch.sample().shape == (50,)
+
+
+def test_dirichlet_multinomial_batch():
+    counts = np.array([[15, 35, 0], [1, 2, 3]])
+    batch = DirichletMultinomialBatch([21, 21, 1], counts)
+    # The same as bayes Multinomial.map
+    assert batch.map()[0] == approx([35 / 90, 55 / 90, 0])
+    assert batch.mean()[1] == approx([22 / 49, 23 / 49, 4 / 49])
+    batch.observe([1, 1, 0], [2, 2, 1])
+    assert batch.counts.tolist() == [[15, 36, 0], [1, 2, 5]]
+
+    lower, upper = batch.credible_interval()
+    assert lower.shape == upper.shape == (2, 3)
+    assert np.all(lower < batch.mean()) and np.all(batch.mean() < upper)
+    samples = batch.sample(10000, random_state=1)
+    assert samples.shape == (10000, 2, 3)
+    assert samples.sum(axis=2) == approx(np.ones((10000, 2)))
+    assert np.quantile(samples, 0.025, axis=0) == approx(lower, abs=0.01)
+    # A Dirichlet of two levels is Beta
+    beta_batch = BetaBinomialBatch([3, 4], [5, 6], alpha=[1, 2], beta=3)
+    dirichlet_batch = DirichletMultinomialBatch([[1, 3], [2, 3]], [[3, 5], [4, 6]])
+    assert beta_batch.credible_interval()[1] == approx(
+        dirichlet_batch.credible_interval()[1][:, 0]
+    )
+
+
+def test_map_without_mode_batch():
+    # The uniform prior without counts has no mode
+    batch = BetaBinomialBatch(streams=2)
+    assert batch.map().tolist() == [0.5, 0.5]
+    batch.update([3, 0], [1, 0])
+    assert batch.map().tolist() == [0.75, 0.5]
+    # A prior less than one has no interior mode either
+    batch = DirichletMultinomialBatch([[0.5, 1, 1], [2, 2, 3]])
+    assert batch.map() == approx(np.array([[0.2, 0.4, 0.4], [0.25, 0.25, 0.5]]))
+    assert not np.any(np.isnan(DirichletMultinomialBatch([1, 1, 1], streams=3).map()))
+
+
+def test_negative_counts_batch():
+    batch = BetaBinomialBatch([1, 2], [3, 4])
+    with pytest.raises(ValueError):
+        batch.update([1, -1], [0, 0])
+    with pytest.raises(ValueError):
+        batch.update([-1], [0], streams=[1])
+    assert batch.counts.tolist() == [[1, 3], [2, 4]]
+    with pytest.raises(ValueError):
+        DirichletMultinomialBatch([1, 1], [[1, -2]])
+    with pytest.raises(ValueError):
+        DirichletMultinomialBatch([1, 1], streams=1).update([[0, -1]])
@@ -1,29 +1,31 @@
+import pytest
+from pytest import approx
 from probability2.bayes import Binomial
 
 
-# def test_map_estimate_binomial():
-#     sample = {"A": 15, "B": 35}
-#     binomial = Binomial(sample, alpha=1, beta=1, level="A")
-#     assert binomial.map == 16 / 52
-#     binomial = Binomial(sample, alpha=1, beta=1, level="B")
-#     assert binomial.map == 36 / 52
+def test_map_estimate_binomial():
+    sample = {"A": 15, "B": 35}
+    binomial = Binomial(sample, alpha=1, beta=1, level="A")
+    assert binomial.map == 16 / 52
+    binomial = Binomial(sample, alpha=1, beta=1, level="B")
+    assert binomial.map == 36 / 52
 
 
-# def test_probability_binomial():
-#     sample = {"A": 15, "B": 35}
-#     binomial = Binomial(sample, alpha=1, beta=1, level="A")
-#     assert binomial.probability("A") == 16 / 52
-#     assert binomial.probability("B") == 36 / 52
-#     assert binomial["A"] == 16 / 52
-#     assert binomial["B"] == 36 / 52
-#     assert binomial[0:2] == [16 / 52, 36 / 52]
+def test_probability_binomial():
+    sample = {"A": 15, "B": 35}
+    binomial = Binomial(sample, alpha=1, beta=1, level="A")
+    assert binomial.probability("A") == 16 / 52
+    assert binomial.probability("B") == 36 / 52
+    assert binomial["A"] == 16 / 52
+    assert binomial["B"] == 36 / 52
+    assert binomial[0:2] == [16 / 52, 36 / 52]
 
 
-# def test_probability_no_key_binomial():
-#     sample = {"A": 15, "B": 35}
-#     binomial = Binomial(sample, alpha=1, beta=1, level="A")
-#     assert binomial.probability("AB") == 0
-#     assert binomial["AB"] == 0
+def test_probability_no_key_binomial():
+    sample = {"A": 15, "B": 35}
+    binomial = Binomial(sample, alpha=1, beta=1, level="A")
+    assert binomial.probability("AB") == 0
+    assert binomial["AB"] == 0
 
 
 # def test_product_binomial():
@@ -39,3 +41,40 @@ from probability2.bayes import Binomial
 #     binomial4 = binomial1 * binomial2 * binomial3
 #     for k in binomial4:
 #         print(k, binomial4[k])
+
+
+def test_update_binomial():
+    binomial = Binomial({"A": 15, "B": 35}, alpha=1, beta=1, level="A")
+    binomial.update(["A", "B", "A"])
+    assert binomial.total == 53
+    assert binomial.n_level == 17
+    assert binomial.map == 18 / 55
+    binomial.update({"B": 10})
+    assert binomial.map == 18 / 65
+    assert binomial.probability("B") == 1 - 18 / 65
+    with pytest.raises(ValueError):
+        binomial.update(["C"])
+    with pytest.raises(ValueError):
+        binomial.update({"A": -20})
+    assert binomial.total == 63
+    assert binomial.n_level == 17
+
+
+def test_merge_binomial():
+    partitions = [{"A": 1, "B": 2}, {"A": 3, "B": 4}, {"A": 5, "B": 0}]
+    binomials = [Binomial(p, alpha=2, beta=3, level="A") for p in partitions]
+    left = binomials[0].merge(binomials[1]).merge(binomials[2])
+    right = binomials[0].merge(binomials[1].merge(binomials[2]))
+    for merged in [left, right, binomials[2].merge(binomials[0]).merge(binomials[1])]:
+        assert merged.total == 15
+        assert merged.n_level == 9
+        assert merged.map == approx((9 + 2) / (2 + 3 + 15))
+    # The partitions are not changed
+    assert binomials[0].total == 3
+
+    with pytest.raises(ValueError):
+        binomials[0].merge(Binomial(partitions[0], alpha=1, beta=3, level="A"))
+    with pytest.raises(ValueError):
+        binomials[0].merge(Binomial(partitions[0], alpha=2, beta=3, level="B"))
+    with pytest.raises(ValueError):
+        binomials[0].merge(Binomial({"A": 1, "C": 2}, alpha=2, beta=3, level="A"))
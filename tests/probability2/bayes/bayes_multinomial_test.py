@@ -1,8 +1,40 @@
+import pytest
+from pytest import approx
 from probability2.bayes import Multinomial
 
 
-# def test_map_estimate_multinomial():
-#    sample = {"A": 15, "B": 35}
-#    multinomial = Multinomial(sample, alphas=[21, 21])
-#    assert multinomial.map()["A"] == (15 + 20) / (50 + 40)
-#    assert multinomial.map()["B"] == (35 + 20) / (50 + 40)
+def test_map_estimate_multinomial():
+    sample = {"A": 15, "B": 35}
+    multinomial = Multinomial(sample, alphas=[21, 21])
+    assert multinomial.map()["A"] == (15 + 20) / (50 + 40)
+    assert multinomial.map()["B"] == (35 + 20) / (50 + 40)
+
+
+def test_update_multinomial():
+    multinomial = Multinomial({"A": 15, "B": 35, "C": 0}, alphas=[21, 21, 1])
+    multinomial.update(["A", "C", "A"])
+    multinomial.update({"B": 5})
+    assert multinomial.total == 58
+    assert multinomial.map()["A"] == (17 + 20) / (58 + 40)
+    assert multinomial.map()["C"] == 1 / (58 + 40)
+    with pytest.raises(ValueError):
+        multinomial.update(["D"])
+    with pytest.raises(ValueError):
+        multinomial.update({"A": 1, "B": -5})
+    assert multinomial.total == 58
+
+
+def test_merge_multinomial():
+    partitions = [{"A": 1, "B": 2}, {"A": 3, "B": 0}, {"A": 5, "B": 7}]
+    multinomials = [Multinomial(p, alphas=[2, 3]) for p in partitions]
+    left = multinomials[0].merge(multinomials[1]).merge(multinomials[2])
+    right = multinomials[0].merge(multinomials[1].merge(multinomials[2]))
+    for merged in [left, right]:
+        assert merged.total == 18
+        assert merged.map()["A"] == approx((9 + 1) / (18 + 3))
+    assert multinomials[0].total == 3
+
+    with pytest.raises(ValueError):
+        multinomials[0].merge(Multinomial(partitions[0], alphas=[1, 1]))
+    with pytest.raises(ValueError):
+        multinomials[0].merge(Multinomial({"A": 1, "C": 2}, alphas=[2, 3]))
@@ -1,3 +1,5 @@
+import pytest
+import numpy as np
 from probability2.empirical_distributions import DiscreteDistribution
 from tests.helpers import compare
 
@@ -91,3 +93,111 @@ def test_conditional_operator_discrete_distribution():
     assert all(compare(con_disc_dist.distributions[("y", 2)].names, ["X1", "X4"]))
     assert con_disc_dist.frequency(("a", 33), ("x", 1)) == 1
     assert con_disc_dist.probability(("a", 33), ("x", 1)) == 1 / 24
+
+
+def test_probability_batch_conditional_discrete_distribution():
+    samples = {
+        (x1, x2, x3, x4): i + 1
+        for i, (x1, x2, x3, x4) in enumerate(
+            (x1, x2, x3, x4)
+            for x1 in "ab"
+            for x2 in "xy"
+            for x3 in [1, 2]
+            for x4 in [33, 44]
+        )
+    }
+    disc_dist = DiscreteDistribution(samples)
+    con_disc_dist = disc_dist.condition_on("X2")
+    keys = [("a", 1, 33), ("b", 2, 44), ("c", 1, 33), ("a", 1, 33)]
+    conditional_keys = ["x", "y", "x", "z"]
+    probabilities = con_disc_dist.probability_batch(keys, conditional_keys)
+    assert probabilities.tolist() == [
+        con_disc_dist.probability(key, conditional_key)
+        for key, conditional_key in zip(keys, conditional_keys)
+    ]
+    assert probabilities[2] == probabilities[3] == 0
+    # numpy arrays of rows
+    con_disc_dist = disc_dist.condition_on("X1", "X3")
+    probabilities = con_disc_dist.probability_batch(
+        np.array([["x", 33], ["y", 44], ["z", 44]], dtype=object),
+        np.array([["a", 1], ["b", 2], ["b", 2]], dtype=object),
+    )
+    assert probabilities.tolist() == [1 / 14, 16 / 54, 0]
+
+    with pytest.raises(ValueError):
+        con_disc_dist.probability_batch([("x", 33)], [])
+
+
+def test_probability_batch_sparse_conditional_discrete_distribution():
+    rng = np.random.default_rng(0)
+    samples = rng.integers(0, 40, size=(200, 3))
+    con_disc_dist = DiscreteDistribution.from_np_array(samples).condition_on("X1")
+    keys = rng.integers(0, 40, size=(500, 2))
+    conditional_keys = rng.integers(0, 41, size=500)
+    probabilities = con_disc_dist.probability_batch(keys, conditional_keys)
+    # Few observed cells are kept in the compressed form
+    assert con_disc_dist._arrays_[3] is not None
+    assert probabilities.tolist() == [
+        pytest.approx(con_disc_dist.probability(tuple(key), conditional_key))
+        for key, conditional_key in zip(keys.tolist(), conditional_keys.tolist())
+    ]
+    # All the samples are observed
+    probabilities = con_disc_dist.probability_batch(samples[:, 1:], samples[:, 0])
+    assert np.all(probabilities > 0)
+
+
+def test_probability_batch_after_mutation_conditional_discrete_distribution():
+    samples = {("a", "x"): 1, ("b", "x"): 3, ("a", "y"): 2, ("b", "y"): 2}
+    con_disc_dist = DiscreteDistribution(samples).condition_on("X2")
+    keys, conditional_keys = ["a", "b", "a"], ["x", "x", "z"]
+
+    def check():
+        assert con_disc_dist.probability_batch(keys, conditional_keys).tolist() == [
+            pytest.approx(con_disc_dist.probability(key, conditional_key))
+            for key, conditional_key in zip(keys, conditional_keys)
+        ]
+
+    check()
+    # The counts of a distribution are changed
+    con_disc_dist["x"]._counter["a"] = 5
+    con_disc_dist["x"].total = 8
+    con_disc_dist["x"]._invalidate_()
+    check()
+    # The counts are swapped, so their sum is the same
+    counter = con_disc_dist["x"]._counter
+    counter["a"], counter["b"] = counter["b"], counter["a"]
+    con_disc_dist["x"]._invalidate_()
+    check()
+    con_disc_dist["x"].normalise()
+    check()
+    # A distribution is replaced and added
+    con_disc_dist.distributions["x"] = DiscreteDistribution({"a": 1, "b": 9})
+    check()
+    con_disc_dist.distributions["z"] = DiscreteDistribution({"a": 1, "c": 1})
+    check()
+    assert con_disc_dist.probability_batch(["a"], ["z"]).tolist() == [0.5]
+
+
+def test_executor_conditional_discrete_distribution():
+    samples = {
+        (x1, x2, x3, x4): x1 + x2 * x3 + len(x4)
+        for x1 in range(20)
+        for x2 in range(3)
+        for x3 in range(4)
+        for x4 in ["a", "bb"]
+    }
+    con_disc_dist = DiscreteDistribution(samples).condition_on("X1")
+    expected = [con_disc_dist.marginal(["X2"]), con_disc_dist.condition_on(["X3"])]
+    for executor in ["thread", "process"]:
+        con_disc_dist.set_executor(executor, batch_size=3, max_workers=2)
+        results = [con_disc_dist.marginal(["X2"]), con_disc_dist.condition_on(["X3"])]
+        for result, expected_one in zip(results, expected):
+            assert list(result.keys()) == list(expected_one.keys())
+            for key in result:
+                assert dict(result[key].items()) == dict(expected_one[key].items())
+        assert results[1]._executor_ == executor
+        assert all(compare(results[1].conditional_rvs.names, ["X1", "X3"]))
+        assert results[1].probability((1, "a"), (0, 2)) == 3 / 21
+
+    with pytest.raises(ValueError):
+        con_disc_dist.set_executor("fiber")
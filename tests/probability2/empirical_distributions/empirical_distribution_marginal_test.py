@@ -1,3 +1,4 @@
+from fractions import Fraction
 import pytest
 from probability2.empirical_distributions import DiscreteDistribution
 from tests.helpers import compare
@@ -564,3 +565,18 @@ def test_marginals_operator_discrete_distribution():
             [("a", 33), ("a", 44), ("b", 33), ("b", 44)],
         )
     )
+
+
+def test_marginals_fraction_counts_discrete_distribution():
+    samples = {
+        ("a", "x", 1): Fraction(1, 3),
+        ("a", "y", 1): Fraction(1, 6),
+        ("b", "x", 2): Fraction(1, 2),
+    }
+    disc_dist = DiscreteDistribution(samples, names=["X", "Y", "Z"])
+    marginal = disc_dist.marginal("Y")
+    assert marginal[("a", 1)] == Fraction(1, 2)
+    assert marginal[("b", 2)] == Fraction(1, 2)
+    marginal = disc_dist.marginal("X", "Z")
+    assert marginal.frequency("x", normalised=False) == Fraction(5, 6)
+    assert marginal.frequency("y", normalised=False) == Fraction(1, 6)
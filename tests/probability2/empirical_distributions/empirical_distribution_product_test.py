@@ -252,3 +252,62 @@ def test_statistical_independence_frequency_table():
             joint_dist2.probability(k1), abs=1e-16
         )
         assert joint_dist[k1] == approx(joint_dist2[k1], abs=1e-16)
+
+
+def test_lazy_product_of_independent_distributions():
+    freq_table1 = FrequencyTable({"A": 3, "B": 4, "C": 7}, name="X")
+    freq_table2 = FrequencyTable({1: 4, 2: 6}, name="Y")
+    dist = freq_table1 * freq_table2
+    # The keys are not materialized
+    assert len(dist._counter.matrix.shape) == 2
+    assert len(dist.keys()) == 6
+    assert dist.total == 14 * 10
+    assert dist["B", 2] == 24
+    assert dist["D", 2] == 0
+    assert ("C", 1) in dist
+    assert ("C", 3) not in dist
+    assert all(
+        compare(
+            dist.keys_as_list(),
+            [("A", 1), ("A", 2), ("B", 1), ("B", 2), ("C", 1), ("C", 2)],
+        )
+    )
+    assert dict(dist.items()) == {
+        (k1, k2): v1 * v2 for k1, v1 in freq_table1.items() for k2, v2 in freq_table2.items()
+    }
+    assert dist.most_common(2) == [(("C", 2), 42), (("C", 1), 28)]
+    assert dist.prob(X="A", Y=1) == approx(12 / 140)
+    marginal = dist.marginal("X")
+    assert marginal[2] == 6 * 14
+
+    dist2 = DiscreteDistribution({("a", "x"): 1, ("b", "y"): 3}, names=["Z1", "Z2"])
+    dist3 = dist * dist2
+    assert dist3.total == 140 * 4
+    assert dist3["A", 1, "b", "y"] == 36
+    assert all(compare(dist3.names, ["X", "Y", "Z1", "Z2"]))
+
+    dist.normalise()
+    assert dist.total == 1
+    assert dist["B", 2] == approx(24 / 140)
+
+
+def test_sort_merge_product_discrete_distribution():
+    samples_1 = {(x, y, z): x + 2 * z + 1 for x in range(4) for y in "abc" for z in range(5)}
+    samples_2 = {(z, y, w): z * w + 1 for z in range(1, 7) for y in "abd" for w in (1, 2)}
+    dist1 = DiscreteDistribution(samples_1, names=["X", "Y", "Z"])
+    dist2 = DiscreteDistribution(samples_2, names=["Z", "Y", "W"])
+    dist1.sort_merge_min_rows = 10 ** 9
+    hash_product = dist1 * dist2
+    dist1.sort_merge_min_rows = 0
+    merge_product = dist1 * dist2
+    assert all(compare(merge_product.names, ["X", "Y", "Z", "W"]))
+    assert dict(merge_product.items()) == dict(hash_product.items())
+    assert merge_product.total == hash_product.total
+    assert merge_product[3, "b", 4, 2] == 12 * 9
+    # One random variable on the left
+    dist3 = DiscreteDistribution({z: z + 1 for z in range(5)}, names=["Z"])
+    dist3.sort_merge_min_rows = 0
+    product = dist3 * dist2
+    assert all(compare(product.names, ["Z", "Y", "W"]))
+    assert product[4, "a", 1] == 5 * 5
+    assert len(list(product.keys())) == 4 * 3 * 2
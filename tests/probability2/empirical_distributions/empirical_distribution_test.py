@@ -139,6 +139,25 @@ def test_numpy_array_discrete_distribution():
     assert dist.probability(("A",)) == 0.24
     assert dist.prob(X1=("A",)) == 0.24
 
+    # numeric and fixed-width string arrays are counted by numpy
+    samples = np.array([[1, 2], [3, 4], [1, 2], [1, 4]] * 25)
+    dist = DiscreteDistribution.from_np_array(samples, names=["X", "Y"])
+    assert dist.total == 100
+    assert dist.rvs.size == 2
+    assert dist.prob(X=1, Y=2) == 0.5
+    assert dist.prob(X=3, Y=4) == 0.25
+    assert dist.prob(X=3, Y=2) == 0
+
+    samples = np.array([["a", "x"], ["b", "y"], ["a", "x"], ["a", "y"]])
+    dist = DiscreteDistribution.from_np_array(samples)
+    assert dist.probability(("a", "x")) == 0.5
+    assert dist.probability(("a", "y")) == 0.25
+
+    samples = np.array([["a", 1], ["b", 2], ["a", 1], ["a", 2]], dtype=object)
+    dist = DiscreteDistribution.from_np_array(samples)
+    assert dist.probability(("a", 1)) == 0.5
+    assert dist.probability(("a", 2)) == 0.25
+
 
 def test_one_levels_discrete_distribution():
     dist = DiscreteDistribution({"Dog": 2})
@@ -1,9 +1,13 @@
+import warnings
 import pytest
 from pytest import approx
 import numpy as np
 from probability2 import Distribution
 from probability2.empirical_distributions import FrequencyTable
 from probability2.empirical_distributions import EmpiricalDistribution
+from probability2.empirical_distributions.empirical_distributions_1 import (
+    ProductCounter,
+)
 from tests.helpers import compare
 
 
@@ -387,27 +391,53 @@ def test_product_multi_proc_frequency_table():
 
     prod_1 = freq_table1 * freq_table2
 
-    prod_2 = freq_table1.product_multi_proc(freq_table2, 2)
+    with pytest.deprecated_call():
+        prod_2 = freq_table1.product_multi_proc(freq_table2, 2)
     for key, value in prod_1.items():
         assert prod_2[key] == value
 
-    prod_2 = freq_table1.product_multi_proc(freq_table2, 3)
+    with pytest.deprecated_call():
+        prod_2 = freq_table1.product_multi_proc(freq_table2, 3)
     for key, value in prod_1.items():
         assert prod_2[key] == value
 
-    prod_2 = freq_table1.product_multi_proc(freq_table2, 4)
+    with pytest.deprecated_call():
+        prod_2 = freq_table1.product_multi_proc(freq_table2, 4)
     for key, value in prod_1.items():
         assert prod_2[key] == value
 
-    prod_2 = freq_table1.product_multi_proc(freq_table2, 5)
+    with pytest.deprecated_call():
+        prod_2 = freq_table1.product_multi_proc(freq_table2, 5)
     for key, value in prod_1.items():
         assert prod_2[key] == value
 
-    prod_2 = freq_table1.product_multi_proc(freq_table2, 6)
+    with pytest.deprecated_call():
+        prod_2 = freq_table1.product_multi_proc(freq_table2, 6)
     for key, value in prod_1.items():
         assert prod_2[key] == value
 
 
+def test_product_multi_proc_outer_product_frequency_table():
+    freq_table1 = FrequencyTable({"A": 1, "B": 2, "C": 3}, "X")
+    freq_table2 = FrequencyTable({11: 4, 22: 5}, "Y")
+    with pytest.deprecated_call():
+        product = freq_table1.product_multi_proc(freq_table2, 2)
+    assert isinstance(product._counter, ProductCounter)
+    assert list(product.names) == ["X", "Y"]
+    assert len(product._counter) == 6
+    assert product.total == 6 * 9
+    assert product[("C", 22)] == 15
+    assert product.probability(("B", 11)) == approx(8 / 54)
+    # The same random variable names are numbered
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        product = freq_table1.product_multi_proc(freq_table1)
+    assert list(product.names) == ["X1", "X2"]
+    assert product[("A", "C")] == 3
+    with pytest.raises(ValueError):
+        freq_table1.product_multi_proc({"A": 1})
+
+
 def test_statistical_independence_frequency_table():
     # P(x,y,z) = P(x)P(y)P(z)
     # to check that, first, create a joint dist. by product
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from probability2.inference import Multinomial
 from probability2.inference import MultinomialMLEInferrer as MLE
 
@@ -62,3 +63,35 @@ def test_mle_estimate_multilevels_multinomial():
     assert ("a", "x", 1, 33, 1.5) in multinomial
     assert ("b", "x", 2, 44, 2.5) in multinomial
     assert ("b", "x", 2, 445, 2.5) not in multinomial
+
+
+def test_mle_probability_batch_multinomial():
+    sample = {"A": 15, "B": 35}
+    multinomial = Multinomial(MLE.from_sample(sample))
+    assert multinomial.probability("C") == 0
+    keys = ["A", "B", "C", "B"]
+    assert multinomial.probability_batch(keys).tolist() == [0.3, 0.7, 0, 0.7]
+    assert multinomial.probability_batch(np.array(keys)).tolist() == [0.3, 0.7, 0, 0.7]
+
+    samples = {(x, y): x + 1 for x in range(3) for y in "ab"}
+    mle = MLE.from_multilevels_sample(samples)
+    multinomial = Multinomial(mle)
+    keys = np.array([[0, "a"], [2, "b"], [5, "a"]], dtype=object)
+    assert multinomial.probability_batch(keys).tolist() == [1 / 12, 3 / 12, 0]
+    assert multinomial.probability_batch([(1, "b"), (1, "c")]).tolist() == [2 / 12, 0]
+    assert mle.levels_thetas[1, "b"] == mle.thetas[mle.levels_indices[1, "b"]]
+
+
+def test_mle_public_types_and_misses_multinomial():
+    mle = MLE.from_sample({"A": 15, "B": 35})
+    assert isinstance(mle.thetas, list)
+    assert mle.thetas == [0.3, 0.7]
+    multinomial = Multinomial(mle)
+    # Unhashable keys are not observed
+    assert multinomial.probability(["A"]) == 0
+    assert multinomial.probability_batch([["A"], "B"]).tolist() == [0, 0.7]
+
+    samples = {(x, y): x + 1 for x in range(3) for y in range(2)}
+    multinomial = Multinomial(MLE.from_multilevels_sample(samples))
+    keys = np.array([[0, 1], [2, 0], [5, 0], [0, 1]])
+    assert multinomial.probability_batch(keys).tolist() == [1 / 12, 3 / 12, 0, 1 / 12]